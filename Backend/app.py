@@ -1 +1,74 @@
 # Flask entry point
+from flask import Flask
+from flask_jwt_extended import JWTManager
+
+from config import Config
+from db import mongo
+from middleware.error_handler import register_error_handlers
+from middleware.request_profiler import register_profiler
+from routes.auth_routes import auth_bp
+from routes.emergency_routes import emergency_bp
+from routes.metrics_routes import metrics_bp
+from routes.ngo_routes import ngo_bp
+from routes.public_routes import public_bp
+from routes.shelter_routes import shelter_bp
+from services import (
+    cache_service,
+    emergency_service,
+    job_service,
+    metrics_service,
+    revocation_service,
+    search_service,
+    shelter_service,
+    snapshot_service
+)
+from utils import password
+from utils.response import MongoJSONProvider
+
+
+# ---------------------------------------------------
+# APP FACTORY
+# ---------------------------------------------------
+def create_app(config_class=Config):
+    """
+    Build the Flask app.
+
+    MongoDB is bound lazily: the client is only created on first use
+    inside a worker, never in the gunicorn master before fork.
+    """
+
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    app.json = MongoJSONProvider(app)
+
+    jwt = JWTManager(app)
+    revocation_service.init_app(app, jwt)
+
+    # First hooks in, last out: the profile covers the other hooks too
+    register_profiler(app)
+    metrics_service.init_app(app)
+    mongo.init_app(app)
+    cache_service.init_app(app)
+    shelter_service.init_app(app)
+    search_service.init_app(app)
+    emergency_service.init_app(app)
+    snapshot_service.init_app(app)
+    job_service.init_app(app)
+    password.init_app(app)
+
+    app.register_blueprint(auth_bp, url_prefix="/auth")
+    app.register_blueprint(shelter_bp, url_prefix="/shelters")
+    app.register_blueprint(ngo_bp, url_prefix="/ngo")
+    app.register_blueprint(public_bp, url_prefix="/public")
+    app.register_blueprint(emergency_bp, url_prefix="/emergency")
+
+    if app.config.get("METRICS_ENABLED", True):
+        app.register_blueprint(metrics_bp)
+
+    register_error_handlers(app)
+
+    return app
+
+
+if __name__ == "__main__":
+    create_app().run(debug=True)
@@ -0,0 +1,5 @@
+# Async read path entry (public search, emergency status and live bed-update GETs)
+# uvicorn asgi:app --workers 4
+from async_app import create_async_app
+
+app = create_async_app()
@@ -0,0 +1,250 @@
+# ASGI entry point for the async read path
+import asyncio
+import logging
+import re
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import MultiDict
+
+from config import Config
+from db import mongo
+from routes.async_routes import ROUTES, StreamResponse
+from services import cache_service, search_service
+from services.realtime_service import broker
+from utils.response import dumps_bytes
+
+
+logger = logging.getLogger(__name__)
+
+PATH_PARAM = re.compile(r"<(\w+)>")
+
+
+class AsyncRequest:
+    """
+    What an async handler sees of the request
+    """
+
+    __slots__ = ("method", "path", "args", "path_params")
+
+    def __init__(self, method, path, args, path_params):
+        self.method = method
+        self.path = path
+        self.args = args
+        self.path_params = path_params
+
+
+# ---------------------------------------------------
+# ASGI APP
+# ---------------------------------------------------
+class AsyncReadApp:
+    """
+    Minimal ASGI app for the read-heavy public search and emergency
+    status endpoints and the live bed-update stream. A worker awaits
+    Mongo instead of blocking on it, so one process serves as many
+    concurrent reads as its connection pool allows, and holds idle SSE
+    connections as coroutines, where a gunicorn sync worker holds one.
+
+    Writes and auth stay on the Flask app (wsgi.py); the proxy sends
+    only the GET paths in routes/async_routes.py here.
+    """
+
+    def __init__(self, routes, config):
+        self.config = config
+        self._routes = [
+            (method, re.compile("^" + PATH_PARAM.sub(r"(?P<\1>[^/]+)", path) + "$"), handler)
+            for method, path, handler in routes
+        ]
+
+        self._feed = None
+        self._refresh_task = None
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    async def startup(self):
+        """
+        Load the search index off the event loop, then keep it current
+        from the IndexFeed, with a periodic full reload as a backstop
+        """
+
+        await asyncio.to_thread(search_service.rebuild_index)
+
+        self._feed = search_service.IndexFeed()
+        self._feed.start()
+
+        self._refresh_task = asyncio.create_task(self._refresh_index())
+
+    async def shutdown(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+        if self._feed is not None:
+            self._feed.stop()
+            self._feed = None
+
+        broker.stop()
+
+    async def _refresh_index(self):
+        interval = self.config["SEARCH_INDEX_REFRESH_SECONDS"]
+
+        while True:
+            await asyncio.sleep(interval)
+
+            try:
+                await asyncio.to_thread(search_service.rebuild_index)
+            except Exception:
+                logger.exception("search index refresh failed")
+
+    # -------------------------------
+    # ASGI
+    # -------------------------------
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.exception("startup failed")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+
+                await send({"type": "lifespan.startup.complete"})
+
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        payload, status = await self.dispatch(
+            scope["method"],
+            scope["path"],
+            scope.get("query_string", b"").decode("latin-1")
+        )
+
+        if isinstance(payload, StreamResponse):
+            await self._stream(payload, status, receive, send)
+            return
+
+        body = dumps_bytes(payload)
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _stream(self, response, status, receive, send):
+        """
+        Send chunks until the iterator ends or the client goes away,
+        then close the iterator so its cleanup runs
+        """
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", response.content_type.encode()),
+                *((name.encode(), value.encode()) for name, value in response.headers.items())
+            ]
+        })
+
+        async def pump():
+            async for chunk in response.chunks:
+                await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+
+            await send({"type": "http.response.body", "body": b""})
+
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        sender = asyncio.ensure_future(pump())
+        tasks = [sender, asyncio.ensure_future(disconnected())]
+
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+            # OSError: the client went away mid-write
+            if sender.done() and not isinstance(sender.exception(), (type(None), OSError)):
+                logger.error("stream failed", exc_info=sender.exception())
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await response.chunks.aclose()
+
+    async def dispatch(self, method, path, query_string=""):
+        """
+        Route one request. Returns (payload, status).
+        """
+
+        path_matched = False
+
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+
+            if match is None:
+                continue
+
+            path_matched = True
+
+            if route_method != method:
+                continue
+
+            request = AsyncRequest(
+                method,
+                path,
+                MultiDict(parse_qsl(query_string, keep_blank_values=True)),
+                match.groupdict()
+            )
+
+            try:
+                return await handler(request)
+            except Exception:
+                logger.exception("%s %s failed", method, path)
+                return {"error": "Internal server error"}, 500
+
+        if path_matched:
+            return {"error": "Method not allowed"}, 405
+
+        return {"error": "Not found"}, 404
+
+
+# ---------------------------------------------------
+# APP FACTORY
+# ---------------------------------------------------
+def create_async_app(config_class=Config):
+    """
+    Build the ASGI read app. Mongo and the cache are configured the
+    same way as in create_app.
+    """
+
+    config = {
+        key: getattr(config_class, key)
+        for key in dir(config_class)
+        if key.isupper()
+    }
+
+    mongo.configure(**{
+        key: value
+        for key, value in config.items()
+        if key.startswith("MONGO_")
+    })
+    cache_service.configure(config)
+
+    return AsyncReadApp(ROUTES, config)
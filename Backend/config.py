@@ -1 +1,180 @@
 # Config
+import os
+from datetime import timedelta
+
+
+def _env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+class Config:
+    """
+    Application settings, read from environment variables
+    """
+
+    SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-me-in-production")
+    JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev-jwt-secret-key-change-me-in-production")
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=_env_int("JWT_ACCESS_TOKEN_MINUTES", 15))
+
+    # How often each worker pulls new token revocations (seconds)
+    REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", 5))
+
+    # -------------------------------
+    # MONGODB
+    # -------------------------------
+    # Use "mongomock://" to run against an in-memory mongomock client
+    MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+    MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "shelter_connect")
+
+    # Connections per worker process (pymongo default is 100)
+    MONGO_MAX_POOL_SIZE = _env_int("MONGO_MAX_POOL_SIZE", 50)
+    MONGO_MIN_POOL_SIZE = _env_int("MONGO_MIN_POOL_SIZE", 0)
+
+    # Requests waiting for a pooled connection fail after this long
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = _env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000)
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)
+    MONGO_CONNECT_TIMEOUT_MS = _env_int("MONGO_CONNECT_TIMEOUT_MS", 5000)
+    MONGO_SOCKET_TIMEOUT_MS = _env_int("MONGO_SOCKET_TIMEOUT_MS", 10000)
+    MONGO_MAX_IDLE_TIME_MS = _env_int("MONGO_MAX_IDLE_TIME_MS", 60000)
+
+    # Read preference for public search paths (primary | secondaryPreferred)
+    MONGO_SEARCH_READ_PREFERENCE = os.getenv("MONGO_SEARCH_READ_PREFERENCE", "secondaryPreferred")
+
+    # -------------------------------
+    # PASSWORD HASHING (argon2id)
+    # -------------------------------
+    # Changing the costs rehashes each password on its next login
+    ARGON2_TIME_COST = _env_int("ARGON2_TIME_COST", 2)
+    ARGON2_MEMORY_COST_KIB = _env_int("ARGON2_MEMORY_COST_KIB", 19456)
+    ARGON2_PARALLELISM = _env_int("ARGON2_PARALLELISM", 1)
+
+    # Hashing threads per worker process (default: one per core)
+    PASSWORD_POOL_WORKERS = _env_int("PASSWORD_POOL_WORKERS", 0) or None
+    # Logins queued beyond this get 503 + Retry-After
+    PASSWORD_POOL_MAX_PENDING = _env_int("PASSWORD_POOL_MAX_PENDING", 64)
+    PASSWORD_POOL_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_POOL_TIMEOUT_SECONDS", 10))
+
+    # -------------------------------
+    # BED UPDATE COALESCING
+    # -------------------------------
+    # "off" | "wait" (merge, ack after the write) | "write_behind" (ack when queued)
+    BED_UPDATE_COALESCING = os.getenv("BED_UPDATE_COALESCING", "off")
+    BED_UPDATE_COALESCE_WINDOW_MS = _env_int("BED_UPDATE_COALESCE_WINDOW_MS", 100)
+
+    # -------------------------------
+    # SEARCH INDEX
+    # -------------------------------
+    # Each worker (Flask and asgi.py) keeps its own in-memory index,
+    # kept current from the change feed. Full reload interval, as a
+    # backstop for anything the feed missed
+    SEARCH_INDEX_REFRESH_SECONDS = float(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", 60))
+
+    # Change feed + periodic reload in Flask workers
+    SEARCH_INDEX_LIVE_UPDATES = os.getenv("SEARCH_INDEX_LIVE_UPDATES", "true").lower() == "true"
+
+    # -------------------------------
+    # EMERGENCY REQUESTS
+    # -------------------------------
+    # POST /emergency/request per client IP, and per phone number, per window
+    EMERGENCY_RATE_LIMIT = _env_int("EMERGENCY_RATE_LIMIT", 5)
+    EMERGENCY_RATE_LIMIT_WINDOW_SECONDS = _env_int("EMERGENCY_RATE_LIMIT_WINDOW_SECONDS", 600)
+
+    # Beds held for a dispatched request are released if its NGO has not
+    # accepted it within this many seconds
+    EMERGENCY_HOLD_SECONDS = _env_int("EMERGENCY_HOLD_SECONDS", 1800)
+
+    # -------------------------------
+    # SHELTER EXPORT
+    # -------------------------------
+    # Full exports (GET /shelters/export) per NGO per window
+    EXPORT_RATE_LIMIT = _env_int("EXPORT_RATE_LIMIT", 6)
+    EXPORT_RATE_LIMIT_WINDOW_SECONDS = _env_int("EXPORT_RATE_LIMIT_WINDOW_SECONDS", 3600)
+
+    # -------------------------------
+    # METRICS
+    # -------------------------------
+    # Request / MongoDB / cache metrics and the /metrics endpoint.
+    # Under gunicorn also set PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # -------------------------------
+    # REQUEST PROFILER
+    # -------------------------------
+    # Requests sent with "X-Profile: <token>" are profiled; empty disables it
+    PROFILER_ADMIN_TOKEN = os.getenv("PROFILER_ADMIN_TOKEN", "")
+    # Fraction of all requests profiled at random (0 = none)
+    PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", 0))
+    PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", 2))
+    # "speedscope" (JSON for speedscope.app) or "collapsed" (flamegraph.pl)
+    PROFILER_FORMAT = os.getenv("PROFILER_FORMAT", "speedscope")
+    PROFILER_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR", "profiles")
+    # Only the newest profiles are kept on disk
+    PROFILER_KEEP = _env_int("PROFILER_KEEP", 200)
+
+    # -------------------------------
+    # RESPONSE CACHE
+    # -------------------------------
+    # "local" (per-process LRU) or "redis" (shared across workers)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+    # Max staleness of cached public reads, including bed counts
+    CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 5))
+    CACHE_MAX_ENTRIES = _env_int("CACHE_MAX_ENTRIES", 10000)
+
+    # Cache-Control for public tile responses (/public/shelters/tiles/...):
+    # shared caches may serve a tile this long, then stale while revalidating
+    PUBLIC_TILE_MAX_AGE_SECONDS = _env_int("PUBLIC_TILE_MAX_AGE_SECONDS", 5)
+    PUBLIC_TILE_STALE_SECONDS = _env_int("PUBLIC_TILE_STALE_SECONDS", 30)
+
+    # -------------------------------
+    # OFFLINE SNAPSHOTS
+    # -------------------------------
+    # Built by scripts/build_snapshot.py; the newest SNAPSHOT_KEEP are kept
+    SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+    SNAPSHOT_KEEP = _env_int("SNAPSHOT_KEEP", 3)
+
+    # Deltas are served for snapshots up to this old (deletion tombstones expire)
+    SNAPSHOT_TOMBSTONE_RETENTION_DAYS = _env_int("SNAPSHOT_TOMBSTONE_RETENTION_DAYS", 30)
+
+    # Snapshot / delta versions trail the newest updated_at by this much,
+    # so writes that commit out of order still reach the next delta
+    SNAPSHOT_WATERMARK_MARGIN_SECONDS = _env_int("SNAPSHOT_WATERMARK_MARGIN_SECONDS", 5)
+
+    # -------------------------------
+    # BACKGROUND JOBS (worker.py)
+    # -------------------------------
+    # Pool processes per worker (default: one per core)
+    JOB_WORKER_PROCESSES = _env_int("JOB_WORKER_PROCESSES", os.cpu_count() or 1)
+
+    # A job whose worker stops heartbeating is re-queued after the lease
+    JOB_LEASE_SECONDS = _env_int("JOB_LEASE_SECONDS", 60)
+    JOB_HEARTBEAT_SECONDS = _env_int("JOB_HEARTBEAT_SECONDS", 15)
+    JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", 1))
+
+    # Jobs still running after this long stop heartbeating, so their lease
+    # expires and they are retried or failed (per type overrides below)
+    JOB_MAX_RUNTIME_SECONDS = _env_int("JOB_MAX_RUNTIME_SECONDS", 3600)
+    JOB_MAX_RUNTIME_BY_TYPE = {"seed": 4 * 3600, "migrate_indexes": 4 * 3600}
+
+    # Retries back off exponentially from JOB_BACKOFF_SECONDS (with jitter)
+    JOB_MAX_ATTEMPTS = _env_int("JOB_MAX_ATTEMPTS", 5)
+    JOB_BACKOFF_SECONDS = _env_int("JOB_BACKOFF_SECONDS", 10)
+    JOB_BACKOFF_MAX_SECONDS = _env_int("JOB_BACKOFF_MAX_SECONDS", 600)
+
+    # Finished jobs stay in the queue collection this long
+    JOB_RETENTION_DAYS = _env_int("JOB_RETENTION_DAYS", 7)
+
+
+class TestConfig(Config):
+    TESTING = True
+    MONGO_URI = "mongomock://localhost"
+    MONGO_DB_NAME = "shelter_connect_test"
+    CACHE_BACKEND = "local"
+
+    # Tests drive the index directly; no background reloads
+    SEARCH_INDEX_LIVE_UPDATES = False
+
+    # Cheap hashes keep the auth tests fast
+    ARGON2_TIME_COST = 1
+    ARGON2_MEMORY_COST_KIB = 64
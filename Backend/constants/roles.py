@@ -0,0 +1,4 @@
+# Roles carried in the "role" claim of access tokens
+NGO = "ngo"
+
+ROLES = (NGO,)
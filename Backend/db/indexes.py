@@ -0,0 +1,139 @@
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from pymongo.errors import OperationFailure
+
+from db import mongo
+
+
+# ---------------------------------------------------
+# REQUIRED INDEXES
+# ---------------------------------------------------
+# Every service query must be served by one of these.
+# tests/test_query_plans.py fails if any of them falls back to COLLSCAN.
+INDEXES = {
+    mongo.SHELTERS: [
+        # get_shelters_by_ngo (keyset pages ordered by _id)
+        IndexModel([("ngo_id", ASCENDING), ("_id", ASCENDING)], name="ngo_id_1__id_1"),
+
+        # Geo search ($near / $geoWithin)
+        IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+
+        # Incremental exports (updated_since, ordered for checkpointing)
+        IndexModel([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_1__id_1"),
+
+        # Open emergency shelters with free beds
+        IndexModel(
+            [("emergency_mode", ASCENDING), ("available_beds", DESCENDING)],
+            name="emergency_mode_1_available_beds_-1"
+        ),
+
+        # db.seed re-runs delete their own documents (sparse: real data has no tag)
+        IndexModel([("seed_run", ASCENDING)], name="seed_run_1", sparse=True)
+    ],
+    mongo.EMERGENCY_REQUESTS: [
+        # Re-queue unassigned requests after a restart
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_1_created_at_1"),
+
+        # Expire bed holds no NGO accepted in time
+        IndexModel([("status", ASCENDING), ("assigned_at", ASCENDING)], name="status_1_assigned_at_1"),
+
+        # NGO request inbox, newest first
+        IndexModel([("ngo_id", ASCENDING), ("created_at", DESCENDING)], name="ngo_id_1_created_at_-1"),
+
+        # db.seed re-runs delete their own documents (sparse: real data has no tag)
+        IndexModel([("seed_run", ASCENDING)], name="seed_run_1", sparse=True)
+    ],
+    mongo.REVOKED_TOKENS: [
+        # Denylist refresh (entries revoked since the last sync)
+        IndexModel([("revoked_at", ASCENDING)], name="revoked_at_1"),
+
+        # Entries expire with the last token they revoke
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+    ],
+    mongo.SHELTER_TOMBSTONES: [
+        # Snapshot deltas (shelters deleted since a version)
+        IndexModel([("deleted_at", ASCENDING)], name="deleted_at_1"),
+
+        # Tombstones outlive the oldest snapshot deltas are served for
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+    ],
+    mongo.JOBS: [
+        # job_service.claim (oldest due queued job)
+        IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="status_1_run_at_1"),
+
+        # job_service.reap_expired (running jobs past their lease)
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_1_lease_expires_at_1"),
+
+        # Finished jobs are kept for JOB_RETENTION_DAYS
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+    ],
+    mongo.NGOS: [
+        # get_ngo_by_email / login; one account per email
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+
+        # db.seed re-runs delete their own documents (sparse: real data has no tag)
+        IndexModel([("seed_run", ASCENDING)], name="seed_run_1", sparse=True)
+    ]
+}
+
+
+# ---------------------------------------------------
+# APPLY INDEXES
+# ---------------------------------------------------
+def _existing_index_names(collection):
+    return {index["name"] for index in collection.list_indexes()}
+
+
+def ensure_indexes(db=None, dry_run=False):
+    """
+    Create any missing indexes. Safe to run repeatedly.
+
+    Indexes are built with background=True so pre-4.2 servers do not
+    block the collection (4.2+ always builds without a long lock).
+
+    Returns {collection: {"created": [...], "existing": [...], "failed": {...}}}
+    """
+
+    if db is None:
+        db = mongo.get_db()
+
+    report = {}
+
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = _existing_index_names(collection)
+
+        result = {"created": [], "existing": [], "failed": {}}
+
+        for model in models:
+            name = model.document["name"]
+
+            if name in existing:
+                result["existing"].append(name)
+                continue
+
+            if dry_run:
+                result["created"].append(name)
+                continue
+
+            options = {
+                key: value
+                for key, value in model.document.items()
+                if key not in ("key", "name")
+            }
+
+            try:
+                collection.create_index(
+                    list(model.document["key"].items()),
+                    name=name,
+                    background=True,
+                    **options
+                )
+                result["created"].append(name)
+
+            except OperationFailure as e:
+                # e.g. duplicate emails blocking the unique index
+                result["failed"][name] = str(e)
+
+        report[collection_name] = result
+
+    return report
@@ -0,0 +1,351 @@
+import asyncio
+import os
+import threading
+
+from pymongo import MongoClient, ReadPreference
+
+from config import Config
+
+
+SHELTERS = "shelters"
+NGOS = "ngos"
+EMERGENCY_REQUESTS = "emergency_requests"
+NGO_STATS = "ngo_stats"
+REVOKED_TOKENS = "revoked_tokens"
+SHELTER_TOMBSTONES = "shelter_tombstones"
+JOBS = "jobs"
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST
+}
+
+_settings = {
+    key: getattr(Config, key)
+    for key in dir(Config)
+    if key.startswith("MONGO_")
+}
+
+# pymongo monitoring listeners attached to every client created
+_event_listeners = []
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_handles = {}
+
+_async_client = None
+_async_client_pid = None
+_async_handles = {}
+
+
+# ---------------------------------------------------
+# CONFIGURATION
+# ---------------------------------------------------
+def configure(**settings):
+    """
+    Override MONGO_* settings. Drops any existing client so the
+    next access reconnects with the new settings.
+    """
+
+    global _client, _client_pid, _async_client, _async_client_pid
+
+    with _lock:
+        _settings.update(settings)
+
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+
+        _client = None
+        _client_pid = None
+        _handles.clear()
+
+        _async_client = None
+        _async_client_pid = None
+        _async_handles.clear()
+
+
+def add_event_listener(listener):
+    """
+    Attach a pymongo monitoring listener (e.g. a CommandListener) to
+    clients created from now on. mongomock clients emit no events.
+    """
+
+    with _lock:
+        if listener not in _event_listeners:
+            _event_listeners.append(listener)
+
+
+def init_app(app):
+    """
+    Bind MongoDB settings from the Flask config.
+    No connection is opened here, so this is safe to call in the
+    gunicorn master before workers are forked.
+    """
+
+    configure(**{
+        key: value
+        for key, value in app.config.items()
+        if key.startswith("MONGO_")
+    })
+
+    app.db = LazyDatabase()
+
+
+# ---------------------------------------------------
+# CLIENT (ONE PER WORKER PROCESS)
+# ---------------------------------------------------
+def _create_client():
+    uri = _settings["MONGO_URI"]
+
+    if uri.startswith("mongomock://"):
+        import mongomock
+
+        return mongomock.MongoClient()
+
+    return MongoClient(
+        uri,
+        maxPoolSize=_settings["MONGO_MAX_POOL_SIZE"],
+        minPoolSize=_settings["MONGO_MIN_POOL_SIZE"],
+        waitQueueTimeoutMS=_settings["MONGO_WAIT_QUEUE_TIMEOUT_MS"],
+        serverSelectionTimeoutMS=_settings["MONGO_SERVER_SELECTION_TIMEOUT_MS"],
+        connectTimeoutMS=_settings["MONGO_CONNECT_TIMEOUT_MS"],
+        socketTimeoutMS=_settings["MONGO_SOCKET_TIMEOUT_MS"],
+        maxIdleTimeMS=_settings["MONGO_MAX_IDLE_TIME_MS"],
+        retryWrites=True,
+        event_listeners=list(_event_listeners),
+        connect=False
+    )
+
+
+def get_client():
+    """
+    Shared MongoClient for the current process.
+
+    Created lazily on first use and re-created when the pid changes,
+    so a client opened before a fork is never shared with children.
+    """
+
+    global _client, _client_pid
+
+    pid = os.getpid()
+
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _handles.clear()
+            _client = _create_client()
+            _client_pid = pid
+
+        return _client
+
+
+def _reset_after_fork():
+    """
+    Forget the parent's client in a forked child.
+    The child must not close it: the sockets still belong to the parent.
+    """
+
+    global _client, _client_pid, _async_client, _async_client_pid, _lock
+
+    _lock = threading.Lock()
+    _client = None
+    _client_pid = None
+    _handles.clear()
+
+    _async_client = None
+    _async_client_pid = None
+    _async_handles.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_db():
+    return get_client()[_settings["MONGO_DB_NAME"]]
+
+
+# ---------------------------------------------------
+# COLLECTION HANDLES
+# ---------------------------------------------------
+def get_collection(name, read_preference=None):
+    """
+    Pre-bound collection handle, cached per process.
+    read_preference is one of the READ_PREFERENCES keys (default primary).
+    """
+
+    key = (name, read_preference)
+    handle = _handles.get(key)
+
+    if handle is not None and _client_pid == os.getpid():
+        return handle
+
+    db = get_db()
+
+    if read_preference:
+        handle = db.get_collection(name, read_preference=READ_PREFERENCES[read_preference])
+    else:
+        handle = db.get_collection(name)
+
+    _handles[key] = handle
+
+    return handle
+
+
+def shelters():
+    return get_collection(SHELTERS)
+
+
+def ngos():
+    return get_collection(NGOS)
+
+
+def emergency_requests():
+    return get_collection(EMERGENCY_REQUESTS)
+
+
+def ngo_stats():
+    return get_collection(NGO_STATS)
+
+
+def revoked_tokens():
+    return get_collection(REVOKED_TOKENS)
+
+
+def shelter_tombstones():
+    return get_collection(SHELTER_TOMBSTONES)
+
+
+def jobs():
+    return get_collection(JOBS)
+
+
+def shelters_for_search():
+    """
+    Shelters handle for public search reads, which tolerate
+    replica lag and can be served from secondaries
+    """
+
+    return get_collection(SHELTERS, _settings["MONGO_SEARCH_READ_PREFERENCE"])
+
+
+# ---------------------------------------------------
+# ASYNC CLIENT (ASGI READ PATH)
+# ---------------------------------------------------
+class ThreadedAsyncCollection:
+    """
+    Async facade over a sync collection: every call runs in a worker
+    thread. Used for mongomock, which has no async driver.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        return call
+
+
+def _create_async_client():
+    # pymongo's native asyncio driver (4.10+), imported here so the sync
+    # paths keep working on older installs
+    from pymongo import AsyncMongoClient
+
+    return AsyncMongoClient(
+        _settings["MONGO_URI"],
+        maxPoolSize=_settings["MONGO_MAX_POOL_SIZE"],
+        minPoolSize=_settings["MONGO_MIN_POOL_SIZE"],
+        waitQueueTimeoutMS=_settings["MONGO_WAIT_QUEUE_TIMEOUT_MS"],
+        serverSelectionTimeoutMS=_settings["MONGO_SERVER_SELECTION_TIMEOUT_MS"],
+        connectTimeoutMS=_settings["MONGO_CONNECT_TIMEOUT_MS"],
+        socketTimeoutMS=_settings["MONGO_SOCKET_TIMEOUT_MS"],
+        maxIdleTimeMS=_settings["MONGO_MAX_IDLE_TIME_MS"],
+        retryWrites=True,
+        event_listeners=list(_event_listeners)
+    )
+
+
+def get_async_client():
+    """
+    Shared AsyncMongoClient for the current process.
+
+    Must first be called from inside the event loop that serves
+    requests (the client binds to the running loop). Same pool
+    settings as the sync client.
+    """
+
+    global _async_client, _async_client_pid
+
+    pid = os.getpid()
+
+    if _async_client is not None and _async_client_pid == pid:
+        return _async_client
+
+    with _lock:
+        if _async_client is None or _async_client_pid != pid:
+            _async_handles.clear()
+            _async_client = _create_async_client()
+            _async_client_pid = pid
+
+        return _async_client
+
+
+def get_async_collection(name, read_preference=None):
+    """
+    Async counterpart of get_collection: an AsyncCollection, or a
+    ThreadedAsyncCollection over mongomock
+    """
+
+    if _settings["MONGO_URI"].startswith("mongomock://"):
+        return ThreadedAsyncCollection(get_collection(name, read_preference))
+
+    key = (name, read_preference)
+    handle = _async_handles.get(key)
+
+    if handle is not None and _async_client_pid == os.getpid():
+        return handle
+
+    db = get_async_client()[_settings["MONGO_DB_NAME"]]
+
+    if read_preference:
+        handle = db.get_collection(name, read_preference=READ_PREFERENCES[read_preference])
+    else:
+        handle = db.get_collection(name)
+
+    _async_handles[key] = handle
+
+    return handle
+
+
+def async_shelters_for_search():
+    return get_async_collection(SHELTERS, _settings["MONGO_SEARCH_READ_PREFERENCE"])
+
+
+def async_emergency_requests():
+    return get_async_collection(EMERGENCY_REQUESTS)
+
+
+# ---------------------------------------------------
+# FLASK COMPATIBILITY
+# ---------------------------------------------------
+class LazyDatabase:
+    """
+    Stand-in for current_app.db that resolves the per-process
+    database on every access instead of capturing a client
+    """
+
+    def __getitem__(self, name):
+        return get_collection(name)
+
+    def __getattr__(self, name):
+        return getattr(get_db(), name)
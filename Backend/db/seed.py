@@ -0,0 +1,291 @@
+"""
+Synthetic NGO / shelter / emergency request data for benchmarks and
+load tests. Deterministic for a given seed.
+
+Shelters cluster around Indian cities, weighted by population, with a
+gaussian spread of ~10-25 km, so geo queries see dense urban areas and
+sparse gaps like production does.
+
+Usage (from Backend/):
+    python -m db.seed --shelters 100000 [--ngos 5000] [--requests 20000] \\
+        [--uri mongodb://localhost:27017] [--drop | --seed-run NAME]
+"""
+
+import argparse
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from db import mongo
+from db.indexes import ensure_indexes
+from services import dashboard_service
+from schemas.emergency_schema import PRIORITIES
+from utils.geo_helpers import make_point
+
+
+# (city, state, pincode prefix, lat, lng, relative population)
+CITIES = (
+    ("Mumbai", "Maharashtra", "400", 19.076, 72.878, 20.7),
+    ("Delhi", "Delhi", "110", 28.704, 77.102, 31.2),
+    ("Kolkata", "West Bengal", "700", 22.573, 88.364, 15.1),
+    ("Chennai", "Tamil Nadu", "600", 13.083, 80.271, 11.5),
+    ("Bengaluru", "Karnataka", "560", 12.972, 77.595, 13.2),
+    ("Hyderabad", "Telangana", "500", 17.385, 78.487, 10.5),
+    ("Ahmedabad", "Gujarat", "380", 23.023, 72.571, 8.4),
+    ("Pune", "Maharashtra", "411", 18.520, 73.857, 6.9),
+    ("Surat", "Gujarat", "395", 21.170, 72.831, 7.5),
+    ("Jaipur", "Rajasthan", "302", 26.912, 75.787, 4.1),
+    ("Lucknow", "Uttar Pradesh", "226", 26.847, 80.946, 3.8),
+    ("Patna", "Bihar", "800", 25.594, 85.138, 2.5),
+    ("Guwahati", "Assam", "781", 26.144, 91.736, 1.2),
+    ("Bhubaneswar", "Odisha", "751", 20.296, 85.825, 1.1),
+    ("Kochi", "Kerala", "682", 9.931, 76.267, 2.2),
+    ("Visakhapatnam", "Andhra Pradesh", "530", 17.686, 83.218, 2.3)
+)
+
+CITY_WEIGHTS = tuple(city[5] for city in CITIES)
+
+NAME_PREFIXES = ("Harbor", "Hope", "Safe", "Sahara", "Asha", "Seva", "Aashray", "Shanti", "Relief", "Community")
+NAME_SUFFIXES = ("Haven", "Home", "Shelter", "Centre", "Camp", "Bhavan", "Night Shelter", "Relief Point")
+STREETS = ("MG Road", "Station Road", "Market Street", "Gandhi Nagar", "Nehru Road", "Temple Street", "Lake View")
+GENDERS = (("all", 0.6), ("men", 0.15), ("women", 0.15), ("family", 0.1))
+REQUEST_GENDERS = ("men", "women", "family")
+REQUEST_STATUSES = (("assigned", 0.7), ("queued", 0.2), ("unassigned", 0.1))
+
+BATCH_SIZE = 10_000
+
+# Collections a seed writes (and --drop drops)
+SEEDED_COLLECTIONS = (mongo.NGOS, mongo.SHELTERS, mongo.EMERGENCY_REQUESTS)
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _city(rng):
+    return rng.choices(CITIES, CITY_WEIGHTS)[0]
+
+
+def _near(rng, city, spread_km):
+    # ~111 km per degree; good enough away from the poles
+    lat = city[3] + rng.gauss(0, spread_km / 111)
+    lng = city[4] + rng.gauss(0, spread_km / 111)
+
+    return max(-90.0, min(90.0, lat)), max(-180.0, min(180.0, lng))
+
+
+# ---------------------------------------------------
+# GENERATORS
+# ---------------------------------------------------
+def generate_ngos(count, rng, now=None):
+    now = now or datetime.utcnow()
+
+    for i in range(count):
+        city = _city(rng)
+
+        yield {
+            "ngo_name": f"{rng.choice(NAME_PREFIXES)} Foundation {city[0]} {i}",
+            "email": f"ngo{i}@seed.shelter-connect.org",
+            "phone": f"9{rng.randrange(10 ** 9):09d}",
+            "city": city[0],
+            "created_at": now - timedelta(days=rng.randint(30, 1500))
+        }
+
+
+def generate_shelters(count, ngo_ids, rng, now=None):
+    """
+    Shelters spread over ngo_ids (a few large NGOs own many shelters,
+    most own a handful)
+    """
+
+    now = now or datetime.utcnow()
+    cumulative = list(itertools.accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(ngo_ids))))
+
+    for i in range(count):
+        city = _city(rng)
+        lat, lng = _near(rng, city, rng.choice((8, 15, 25)))
+        total_beds = rng.choice((10, 20, 25, 40, 50, 80, 120, 200))
+        created_at = now - timedelta(days=rng.randint(0, 1500))
+
+        yield {
+            "ngo_id": rng.choices(ngo_ids, cum_weights=cumulative)[0],
+            "name": f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_SUFFIXES)} {i}",
+            "address": f"{rng.randint(1, 999)} {rng.choice(STREETS)}, {city[0]}",
+            "city": city[0],
+            "state": city[1],
+            "pincode": f"{city[2]}{rng.randrange(1000):03d}",
+            "location": make_point(lat, lng),
+            "total_beds": total_beds,
+            "available_beds": int(total_beds * rng.betavariate(2, 3)),
+            "gender": _weighted(rng, GENDERS),
+            "pet_friendly": rng.random() < 0.15,
+            "accessibility": rng.random() < 0.4,
+            "is_24_hour": rng.random() < 0.5,
+            "emergency_mode": rng.random() < 0.05,
+            "version": rng.randint(0, 200),
+            "created_at": created_at,
+            "updated_at": created_at + (now - created_at) * rng.random()
+        }
+
+
+def generate_emergency_requests(count, shelters, rng, now=None):
+    """
+    Help requests placed near cities; assigned ones point at one of
+    `shelters` ((shelter_id, ngo_id) pairs)
+    """
+
+    now = now or datetime.utcnow()
+
+    for _ in range(count):
+        lat, lng = _near(rng, _city(rng), 20)
+        status = _weighted(rng, REQUEST_STATUSES)
+        people = rng.choice((1, 1, 1, 2, 3, 4, 5))
+
+        document = {
+            "user_name": None,
+            "user_phone": f"8{rng.randrange(10 ** 9):09d}",
+            "user_location_lat": lat,
+            "user_location_lng": lng,
+            "message": None,
+            "priority": rng.choices(PRIORITIES, (0.1, 0.3, 0.6))[0],
+            "people": people,
+            "gender": rng.choice(REQUEST_GENDERS),
+            "pet_friendly": rng.random() < 0.05,
+            "accessibility": rng.random() < 0.1,
+            "status": status,
+            "shelter_id": None,
+            "ngo_id": None,
+            "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        }
+
+        if status == "assigned" and shelters:
+            shelter_id, ngo_id = rng.choice(shelters)
+            document["shelter_id"] = shelter_id
+            document["ngo_id"] = ngo_id
+
+        yield document
+
+
+# ---------------------------------------------------
+# INSERT
+# ---------------------------------------------------
+def _insert_batches(collection, documents, batch_size, tag=None):
+    inserted = []
+    batch = []
+
+    for document in documents:
+        if tag:
+            document.update(tag)
+
+        batch.append(document)
+
+        if len(batch) >= batch_size:
+            inserted.extend(collection.insert_many(batch, ordered=False).inserted_ids)
+            batch = []
+
+    if batch:
+        inserted.extend(collection.insert_many(batch, ordered=False).inserted_ids)
+
+    return inserted
+
+
+def seed(shelters, ngos=None, requests=None, rng_seed=42, drop=False, batch_size=BATCH_SIZE, seed_run=None):
+    """
+    Insert a synthetic dataset through db.mongo and build the indexes.
+    Defaults: one NGO per 20 shelters, one request per 5 shelters.
+
+    drop empties the seeded collections first (real data included).
+    seed_run tags every inserted document instead, and first deletes
+    the documents of an earlier run with the same tag, so re-running
+    it replaces its own data and leaves everything else alone.
+
+    Returns the counts and the elapsed seconds per collection.
+    """
+
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+
+    ngos = max(1, shelters // 20) if ngos is None else ngos
+    requests = shelters // 5 if requests is None else requests
+
+    if drop:
+        for name in (*SEEDED_COLLECTIONS, mongo.NGO_STATS):
+            mongo.get_db().drop_collection(name)
+
+    ensure_indexes()
+
+    tag = {"seed_run": seed_run} if seed_run else None
+
+    if tag:
+        for name in SEEDED_COLLECTIONS:
+            mongo.get_collection(name).delete_many(tag)
+
+    report = {}
+
+    started = time.perf_counter()
+    ngo_ids = [str(_id) for _id in _insert_batches(mongo.ngos(), generate_ngos(ngos, rng, now), batch_size, tag)]
+    report[mongo.NGOS] = {"count": len(ngo_ids), "seconds": round(time.perf_counter() - started, 2)}
+
+    # Owners are tracked alongside the ids for assigned requests
+    owners = []
+
+    def shelters_with_owner():
+        for document in generate_shelters(shelters, ngo_ids, rng, now):
+            owners.append(document["ngo_id"])
+            yield document
+
+    started = time.perf_counter()
+    shelter_ids = _insert_batches(mongo.shelters(), shelters_with_owner(), batch_size, tag)
+    report[mongo.SHELTERS] = {"count": len(shelter_ids), "seconds": round(time.perf_counter() - started, 2)}
+
+    assignable = [(str(_id), owner) for _id, owner in zip(shelter_ids, owners)]
+
+    started = time.perf_counter()
+    request_ids = _insert_batches(
+        mongo.emergency_requests(),
+        generate_emergency_requests(requests, assignable, rng, now),
+        batch_size,
+        tag
+    )
+    report[mongo.EMERGENCY_REQUESTS] = {"count": len(request_ids), "seconds": round(time.perf_counter() - started, 2)}
+
+    # Shelters were inserted directly, so build the dashboard aggregates
+    started = time.perf_counter()
+    report[mongo.NGO_STATS] = {"count": dashboard_service.reconcile(), "seconds": round(time.perf_counter() - started, 2)}
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a synthetic dataset")
+    parser.add_argument("--shelters", type=int, default=10_000)
+    parser.add_argument("--ngos", type=int, help="default: shelters / 20")
+    parser.add_argument("--requests", type=int, help="default: shelters / 5")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--uri", help="MongoDB URI (defaults to MONGO_URI)")
+    parser.add_argument("--db", help="database name (defaults to MONGO_DB_NAME)")
+    parser.add_argument("--drop", action="store_true", help="drop the collections first")
+    parser.add_argument("--seed-run", help="tag the documents; replaces an earlier run with the same tag")
+    args = parser.parse_args()
+
+    settings = {}
+
+    if args.uri:
+        settings["MONGO_URI"] = args.uri
+
+    if args.db:
+        settings["MONGO_DB_NAME"] = args.db
+
+    if settings:
+        mongo.configure(**settings)
+
+    report = seed(args.shelters, args.ngos, args.requests, rng_seed=args.seed, drop=args.drop, seed_run=args.seed_run)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# gunicorn settings, picked up automatically from the working directory
+#   PROMETHEUS_MULTIPROC_DIR=/tmp/shelter-metrics gunicorn wsgi:app
+import glob
+import os
+
+
+# ---------------------------------------------------
+# PROMETHEUS MULTIPROCESS MODE
+# ---------------------------------------------------
+# Each worker writes its metrics to files in PROMETHEUS_MULTIPROC_DIR;
+# /metrics merges them. Files left by a previous run would be summed
+# in, so the directory is emptied before the workers start.
+def on_starting(server):
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+    if not directory:
+        return
+
+    os.makedirs(directory, exist_ok=True)
+
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,7 +1,11 @@
 from functools import wraps
-from flask import request, jsonify, current_app, g
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from bson import ObjectId
+from flask import request, jsonify, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+
+from constants.roles import NGO
+from services.metrics_service import timed_stage
+from services.ngo_service import get_ngo_principal
+from utils.jwt_handler import principal_from_claims
 
 
 # -------------------------------------------------
@@ -11,8 +15,9 @@ def jwt_required_ngo(fn):
     """
     Protects routes so only authenticated NGOs can access them.
 
-    - Verifies JWT
-    - Fetches NGO from MongoDB
+    - Verifies JWT (signature, expiry, revocation denylist)
+    - Takes the NGO from the token claims; tokens without them
+      fall back to the principal cache (MongoDB on a miss)
     - Attaches NGO object to flask global context (g.ngo)
     """
 
@@ -20,30 +25,26 @@ def jwt_required_ngo(fn):
     def wrapper(*args, **kwargs):
         try:
             # Verify JWT token in request header
-            verify_jwt_in_request()
+            with timed_stage("jwt_verify"):
+                verify_jwt_in_request()
 
-            # Extract NGO ID from token
-            ngo_id = get_jwt_identity()
+                # Extract NGO ID from token
+                ngo_id = get_jwt_identity()
+                principal = principal_from_claims(get_jwt())
 
             if not ngo_id:
                 return jsonify({"error": "Invalid token"}), 401
 
-            # Fetch NGO from database
-            db = current_app.db
-            ngo_collection = db["ngos"]
-
-            ngo = ngo_collection.find_one({"_id": ObjectId(ngo_id)})
+            if not principal:
+                # Token without claims: fetch NGO (cached between requests)
+                with timed_stage("principal_lookup"):
+                    principal = get_ngo_principal(ngo_id)
 
-            if not ngo:
-                return jsonify({"error": "NGO not found"}), 404
+                if not principal:
+                    return jsonify({"error": "NGO not found"}), 404
 
             # Attach NGO to request context
-            g.ngo = {
-                "id": str(ngo["_id"]),
-                "ngo_name": ngo.get("ngo_name"),
-                "email": ngo.get("email"),
-                "phone": ngo.get("phone")
-            }
+            g.ngo = dict(principal)
 
         except Exception as e:
             return jsonify({"error": "Authentication failed", "details": str(e)}), 401
@@ -67,7 +68,9 @@ def ngo_role_required(fn):
         if not hasattr(g, "ngo"):
             return jsonify({"error": "Unauthorized access"}), 403
 
-        # Role pulled from DB if needed later
+        if g.ngo.get("role", NGO) != NGO:
+            return jsonify({"error": "Unauthorized access"}), 403
+
         return fn(*args, **kwargs)
 
     return wrapper
@@ -0,0 +1,30 @@
+import logging
+
+from flask import jsonify
+from werkzeug.exceptions import HTTPException
+
+from services import metrics_service
+
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# JSON ERROR RESPONSES
+# -------------------------------------------------
+def register_error_handlers(app):
+    """
+    Return JSON for HTTP errors (404, 405, ...) and turn unhandled
+    exceptions into a logged, counted 500 instead of an HTML page
+    """
+
+    @app.errorhandler(HTTPException)
+    def handle_http_error(e):
+        return jsonify({"error": e.description}), e.code
+
+    @app.errorhandler(Exception)
+    def handle_unexpected_error(e):
+        logger.exception("unhandled error")
+        metrics_service.record_exception(e)
+
+        return jsonify({"error": "Internal server error"}), 500
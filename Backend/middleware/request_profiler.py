@@ -0,0 +1,230 @@
+import hmac
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from flask import g, request
+from pymongo import monitoring
+
+from db import mongo
+from utils.profiler import StackSampler, to_collapsed, to_speedscope
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+FORMATS = ("speedscope", "collapsed")
+
+# Files written per profile: <id>.json plus one of these
+PROFILE_SUFFIXES = (".json", ".speedscope.json", ".collapsed")
+
+# The profiling session of the request running in this thread, if any
+_local = threading.local()
+
+
+class ProfileSession:
+    """
+    One profiled request: the stack sampler plus the MongoDB commands
+    it issued (command, collection, start offset, duration)
+    """
+
+    def __init__(self, interval):
+        # Sorts by start time (see _prune_profiles)
+        self.id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        self.mongo_ops = []
+        self.in_flight = {}
+        self.current_op = None
+        self.sampler = StackSampler(threading.get_ident(), interval, marker=lambda: self.current_op)
+
+    @property
+    def started(self):
+        return self.sampler.started
+
+
+# ---------------------------------------------------
+# MONGODB COMMANDS OF THE PROFILED REQUEST
+# ---------------------------------------------------
+class ProfileCommandListener(monitoring.CommandListener):
+    """
+    Records commands issued by a thread that is being profiled.
+    The command in flight also becomes the leaf frame of the stack
+    samples ("mongo find shelters"), so database time shows up in the
+    flame graph under the code that issued it.
+    """
+
+    def started(self, event):
+        session = getattr(_local, "session", None)
+
+        if session is None:
+            return
+
+        collection = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+        label = f"mongo {event.command_name} {collection}" if isinstance(collection, str) else f"mongo {event.command_name}"
+
+        session.in_flight[(event.connection_id, event.request_id)] = (label, time.perf_counter())
+        session.current_op = (label, "", 0)
+
+    def succeeded(self, event):
+        self._finish(event, ok=True)
+
+    def failed(self, event):
+        self._finish(event, ok=False)
+
+    @staticmethod
+    def _finish(event, ok):
+        session = getattr(_local, "session", None)
+
+        if session is None:
+            return
+
+        label, started = session.in_flight.pop((event.connection_id, event.request_id), (event.command_name, None))
+        session.current_op = None
+
+        session.mongo_ops.append({
+            "command": label,
+            "offset_ms": round((started - session.started) * 1000, 3) if started else None,
+            "duration_ms": event.duration_micros / 1000,
+            "ok": ok
+        })
+
+
+command_listener = ProfileCommandListener()
+
+
+# ---------------------------------------------------
+# FLASK HOOKS
+# ---------------------------------------------------
+def register_profiler(app):
+    """
+    Profile selected requests with a sampling profiler:
+
+    - every request carrying `X-Profile: <PROFILER_ADMIN_TOKEN>`
+    - a random PROFILER_SAMPLE_RATE fraction of all requests
+
+    Each profile is written to PROFILER_OUTPUT_DIR as <id>.speedscope.json
+    or <id>.collapsed, plus <id>.json with the request and its MongoDB
+    commands; the id is returned in X-Profile-Id. Only the newest
+    PROFILER_KEEP profiles are kept.
+
+    With no token and a zero rate nothing is registered at all.
+    """
+
+    token = app.config.get("PROFILER_ADMIN_TOKEN") or ""
+    rate = app.config.get("PROFILER_SAMPLE_RATE", 0.0)
+
+    if not token and rate <= 0:
+        return
+
+    output_format = app.config.get("PROFILER_FORMAT", "speedscope")
+
+    if output_format not in FORMATS:
+        raise ValueError(f"PROFILER_FORMAT must be one of {FORMATS}, got {output_format!r}")
+
+    output_dir = app.config.get("PROFILER_OUTPUT_DIR", "profiles")
+    interval = app.config.get("PROFILER_INTERVAL_MS", 2) / 1000
+    keep = app.config.get("PROFILER_KEEP", 200)
+
+    mongo.add_event_listener(command_listener)
+
+    def selected():
+        header = request.headers.get(PROFILE_HEADER)
+
+        if header is not None and token and hmac.compare_digest(header, token):
+            return True
+
+        return rate > 0 and random.random() < rate
+
+    @app.before_request
+    def start_profile():
+        if not selected():
+            return
+
+        session = ProfileSession(interval)
+        _local.session = g.profile_session = session
+        session.sampler.start()
+
+    @app.after_request
+    def finish_profile(response):
+        session = g.pop("profile_session", None)
+
+        if session is None:
+            return response
+
+        _local.session = None
+        session.sampler.stop()
+
+        try:
+            _write_profile(session, output_dir, output_format, response.status_code)
+            _prune_profiles(output_dir, keep)
+        except OSError:
+            logger.exception("could not write profile %s", session.id)
+            return response
+
+        response.headers[PROFILE_ID_HEADER] = session.id
+
+        return response
+
+    @app.teardown_request
+    def discard_profile(error=None):
+        # after_request did not run (unhandled error): stop the sampler
+        session = g.pop("profile_session", None)
+
+        if session is not None:
+            _local.session = None
+            session.sampler.stop()
+
+
+def _write_profile(session, output_dir, output_format, status):
+    os.makedirs(output_dir, exist_ok=True)
+
+    sampler = session.sampler
+    name = f"{request.method} {request.path}"
+    stem = os.path.join(output_dir, session.id)
+
+    if output_format == "collapsed":
+        with open(f"{stem}.collapsed", "w") as f:
+            f.write(to_collapsed(sampler.samples))
+    else:
+        with open(f"{stem}.speedscope.json", "w") as f:
+            json.dump(to_speedscope(sampler.samples, name, sampler.elapsed), f)
+
+    with open(f"{stem}.json", "w") as f:
+        json.dump({
+            "id": session.id,
+            "method": request.method,
+            "path": request.path,
+            "route": request.url_rule.rule if request.url_rule else None,
+            "status": status,
+            "duration_ms": round(sampler.elapsed * 1000, 3),
+            "samples": len(sampler.samples),
+            "interval_ms": sampler.interval * 1000,
+            "mongo_ops": session.mongo_ops
+        }, f, indent=2)
+
+
+def _prune_profiles(output_dir, keep):
+    """
+    Delete all but the newest `keep` profiles (all files of a profile
+    share its id)
+    """
+
+    profiles = {}
+
+    for name in os.listdir(output_dir):
+        if name.endswith(PROFILE_SUFFIXES):
+            profiles.setdefault(name.split(".", 1)[0], []).append(name)
+
+    for profile_id in sorted(profiles, reverse=True)[keep:]:
+        for name in profiles[profile_id]:
+            try:
+                os.remove(os.path.join(output_dir, name))
+            except FileNotFoundError:
+                # Pruned by another worker
+                pass
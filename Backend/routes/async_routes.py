@@ -0,0 +1,121 @@
+import asyncio
+
+from bson import ObjectId
+
+from routes.emergency_routes import request_status_view
+from routes.public_routes import parse_nearby_query, parse_stream_tiles, search_nearby
+from services import cache_service
+from services.realtime_service import aiter_sse, broker
+from services.emergency_service import get_emergency_request_async
+from services.shelter_service import get_shelter_by_id_async
+
+
+# Async handlers for the ASGI read path (async_app.py).
+# Each takes an AsyncRequest and returns (payload, status); validation
+# and response shapes are shared with the Flask blueprints. A
+# StreamResponse payload is sent as a streaming body instead of JSON.
+
+
+class StreamResponse:
+    """
+    Streaming body: an async iterator of str chunks, sent as they come
+    until it ends or the client disconnects
+    """
+
+    __slots__ = ("chunks", "content_type", "headers")
+
+    def __init__(self, chunks, content_type, headers=None):
+        self.chunks = chunks
+        self.content_type = content_type
+        self.headers = headers or {}
+
+
+# ---------------------------------------------------
+# NEARBY SHELTERS
+# ---------------------------------------------------
+async def nearby_shelters(request):
+    """
+    Same contract as GET /public/shelters/nearby.
+
+    Served straight from the in-memory index (no I/O, so it runs on
+    the event loop). Not response-cached: this process never sees the
+    writes that bump the search generation, while the index is kept
+    current by the change feed.
+    """
+
+    query, error = parse_nearby_query(request.args)
+
+    if error:
+        return {"error": error}, 400
+
+    return {"shelters": search_nearby(query)}, 200
+
+
+# ---------------------------------------------------
+# PUBLIC SHELTER DETAIL (CACHED)
+# ---------------------------------------------------
+async def public_shelter_detail(request):
+    shelter_id = request.path_params["shelter_id"]
+
+    if not ObjectId.is_valid(shelter_id):
+        return {"error": "Shelter not found"}, 404
+
+    shelter = await cache_service.get_or_load_async(
+        cache_service.shelter_key(shelter_id),
+        lambda: get_shelter_by_id_async(shelter_id)
+    )
+
+    if not shelter:
+        return {"error": "Shelter not found"}, 404
+
+    return shelter, 200
+
+
+# ---------------------------------------------------
+# EMERGENCY REQUEST STATUS
+# ---------------------------------------------------
+async def request_status(request):
+    request_id = request.path_params["request_id"]
+
+    if not ObjectId.is_valid(request_id):
+        return {"error": "Request not found"}, 404
+
+    request_document = await get_emergency_request_async(request_id)
+
+    if not request_document:
+        return {"error": "Request not found"}, 404
+
+    return request_status_view(request_document), 200
+
+
+# ---------------------------------------------------
+# LIVE BED UPDATES (SERVER-SENT EVENTS)
+# ---------------------------------------------------
+async def stream_bed_updates(request):
+    """
+    Same contract as GET /public/shelters/stream. An idle connection
+    is a parked coroutine rather than a worker thread, so one process
+    holds thousands of them.
+    """
+
+    tiles, error = parse_stream_tiles(request.args)
+
+    if error:
+        return {"error": error}, 400
+
+    subscriber = broker.subscribe(tiles, loop=asyncio.get_running_loop())
+
+    return StreamResponse(
+        aiter_sse(subscriber),
+        "text/event-stream",
+        {"cache-control": "no-cache", "x-accel-buffering": "no"}
+    ), 200
+
+
+# (method, path, handler); <name> segments become path_params
+ROUTES = [
+    ("GET", "/public/shelters/nearby", nearby_shelters),
+    ("GET", "/public/shelters/stream", stream_bed_updates),
+    ("GET", "/public/shelters/<shelter_id>", public_shelter_detail),
+    ("GET", "/emergency/request/<request_id>", request_status)
+]
@@ -0,0 +1,119 @@
+import logging
+
+from flask import Blueprint, g, jsonify
+from flask_jwt_extended import get_jwt, jwt_required
+from pymongo.errors import DuplicateKeyError
+
+from schemas.ngo_schema import NGOLoginSchema, NGORegisterSchema
+from services.ngo_service import create_ngo, get_ngo_credentials, replace_password_hash
+from services.revocation_service import revoke_token
+from utils.jwt_handler import create_ngo_token
+from utils.password import (
+    PasswordPoolBusy,
+    dummy_hash,
+    hash_password,
+    needs_rehash,
+    verify_password
+)
+from utils.validators import validate_body
+
+# Blueprint
+auth_bp = Blueprint("auth_bp", __name__)
+
+logger = logging.getLogger(__name__)
+
+
+def _busy(e):
+    response = jsonify({"error": "Too many login attempts in progress, retry shortly"})
+    response.headers["Retry-After"] = str(e.retry_after)
+
+    return response, 503
+
+
+# ---------------------------------------------------
+# REGISTER NGO
+# ---------------------------------------------------
+@auth_bp.route("/register", methods=["POST"])
+@validate_body(NGORegisterSchema, error="Invalid registration")
+def register():
+    """
+    Create an NGO account and return an access token
+    """
+
+    data = dict(g.data)
+    data["email"] = data["email"].lower()
+
+    try:
+        data["password"] = hash_password(data["password"])
+    except PasswordPoolBusy as e:
+        return _busy(e)
+
+    try:
+        ngo_id = create_ngo(data)
+    except DuplicateKeyError:
+        return jsonify({"error": "Email already registered"}), 409
+
+    return jsonify({
+        "message": "NGO registered successfully",
+        "ngo_id": ngo_id,
+        "access_token": create_ngo_token(ngo_id, data["ngo_name"])
+    }), 201
+
+
+# ---------------------------------------------------
+# LOGIN
+# ---------------------------------------------------
+@auth_bp.route("/login", methods=["POST"])
+@validate_body(NGOLoginSchema, error="Invalid login")
+def login():
+    """
+    Verify email + password and return an access token.
+
+    The hash is checked on the bounded password pool (503 + Retry-After
+    when saturated). Hashes made with older argon2 costs are replaced
+    after a successful login.
+    """
+
+    email = g.data["email"].lower()
+    password = g.data["password"]
+
+    ngo = get_ngo_credentials(email)
+    password_hash = ngo.get("password") if ngo else None
+
+    try:
+        # Unknown emails cost a full verify too (no account enumeration)
+        valid = verify_password(password_hash or dummy_hash(), password) and password_hash is not None
+
+        if valid and needs_rehash(password_hash):
+            try:
+                replace_password_hash(ngo["_id"], password_hash, hash_password(password))
+            except PasswordPoolBusy:
+                # The login itself succeeded; upgrade next time
+                logger.info("skipped rehash for %s: password pool busy", ngo["_id"])
+
+    except PasswordPoolBusy as e:
+        return _busy(e)
+
+    if not valid:
+        return jsonify({"error": "Invalid email or password"}), 401
+
+    return jsonify({
+        "message": "Login successful",
+        "access_token": create_ngo_token(ngo["_id"], ngo.get("ngo_name"))
+    }), 200
+
+
+# ---------------------------------------------------
+# LOGOUT
+# ---------------------------------------------------
+@auth_bp.route("/logout", methods=["POST"])
+@jwt_required()
+def logout():
+    """
+    Revoke the token used for this request
+    """
+
+    claims = get_jwt()
+    revoke_token(claims["jti"], claims["exp"])
+
+    return jsonify({"message": "Logged out"}), 200
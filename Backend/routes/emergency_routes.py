@@ -0,0 +1,182 @@
+import secrets
+
+from bson import ObjectId
+from flask import Blueprint, current_app, jsonify, g, request
+
+from middleware.auth_middleware import jwt_required_ngo
+from schemas.emergency_schema import CancelRequestSchema, EmergencyRequestSchema
+from services import cache_service
+from services.emergency_service import (
+    accept_request,
+    cancel_request,
+    create_emergency_request,
+    decline_request,
+    get_emergency_request,
+    get_requests_for_ngo
+)
+from utils.validators import validate_body
+
+# Blueprint
+emergency_bp = Blueprint("emergency_bp", __name__)
+
+
+# ---------------------------------------------------
+# SUBMIT EMERGENCY HELP REQUEST
+# ---------------------------------------------------
+@emergency_bp.route("/request", methods=["POST"])
+@validate_body(EmergencyRequestSchema, error="Invalid emergency request")
+def submit_request():
+    """
+    Queue a help request for dispatch to the nearest shelter with beds.
+    Poll GET /emergency/request/<id> for the assignment; the returned
+    cancel_token lets the requester cancel it.
+
+    Anonymous, so limited to EMERGENCY_RATE_LIMIT requests per client
+    IP (and per phone number, when given) per window.
+    """
+
+    retry_after = submit_retry_after(g.data.get("user_phone"))
+
+    if retry_after is not None:
+        response = jsonify({"error": "Too many emergency requests"})
+        response.headers["Retry-After"] = str(retry_after)
+
+        return response, 429
+
+    cancel_token = secrets.token_urlsafe(16)
+    request_id = create_emergency_request(g.data, cancel_token)
+
+    return jsonify({
+        "message": "Emergency request queued",
+        "request_id": request_id,
+        "status": "queued",
+        "cancel_token": cancel_token
+    }), 202
+
+
+def submit_retry_after(phone):
+    """
+    Seconds until this client may submit again, or None
+    """
+
+    limit = current_app.config.get("EMERGENCY_RATE_LIMIT", 5)
+    window = current_app.config.get("EMERGENCY_RATE_LIMIT_WINDOW_SECONDS", 600)
+
+    identities = [("emergency_ip", request.remote_addr)]
+
+    if phone:
+        identities.append(("emergency_phone", phone))
+
+    waits = [cache_service.rate_limit(scope, identity, limit, window) for scope, identity in identities]
+
+    return max((wait for wait in waits if wait is not None), default=None)
+
+
+# ---------------------------------------------------
+# CANCEL EMERGENCY HELP REQUEST
+# ---------------------------------------------------
+@emergency_bp.route("/request/<request_id>/cancel", methods=["POST"])
+@validate_body(CancelRequestSchema, error="Invalid cancel request")
+def cancel(request_id):
+    """
+    Withdraw a request; beds held for it are released
+    """
+
+    if not ObjectId.is_valid(request_id):
+        return jsonify({"error": "Request not found"}), 404
+
+    if cancel_request(request_id, g.data["cancel_token"]) is None:
+        return jsonify({"error": "Request not found or already closed"}), 404
+
+    return jsonify({"message": "Emergency request cancelled", "status": "cancelled"}), 200
+
+
+# ---------------------------------------------------
+# EMERGENCY REQUEST STATUS
+# ---------------------------------------------------
+@emergency_bp.route("/request/<request_id>", methods=["GET"])
+def request_status(request_id):
+    """
+    Dispatch status and assigned shelter for a request
+    """
+
+    if not ObjectId.is_valid(request_id):
+        return jsonify({"error": "Request not found"}), 404
+
+    request_document = get_emergency_request(request_id)
+
+    if not request_document:
+        return jsonify({"error": "Request not found"}), 404
+
+    return jsonify(request_status_view(request_document)), 200
+
+
+def request_status_view(request_document):
+    """
+    Public fields of a request (shared with the ASGI app)
+    """
+
+    return {
+        "request_id": request_document["_id"],
+        "status": request_document["status"],
+        "shelter_id": request_document.get("shelter_id"),
+        "shelter_name": request_document.get("shelter_name"),
+        "distance_km": request_document.get("distance_km")
+    }
+
+
+# ---------------------------------------------------
+# NGO REQUEST INBOX
+# ---------------------------------------------------
+@emergency_bp.route("/requests", methods=["GET"])
+@jwt_required_ngo
+def ngo_requests():
+    """
+    Requests assigned to the logged-in NGO's shelters
+    """
+
+    ngo_id = g.ngo["id"]
+
+    return jsonify({
+        "requests": get_requests_for_ngo(ngo_id)
+    }), 200
+
+
+# ---------------------------------------------------
+# NGO ACCEPT / DECLINE
+# ---------------------------------------------------
+@emergency_bp.route("/requests/<request_id>/accept", methods=["POST"])
+@jwt_required_ngo
+def accept(request_id):
+    """
+    Take a pending request at one of the NGO's shelters (beds stay held)
+    """
+
+    if not ObjectId.is_valid(request_id):
+        return jsonify({"error": "Request not found"}), 404
+
+    request_document = accept_request(request_id, g.ngo["id"])
+
+    if request_document is None:
+        return jsonify({"error": "No pending request with this id"}), 404
+
+    return jsonify(request_status_view(request_document)), 200
+
+
+@emergency_bp.route("/requests/<request_id>/decline", methods=["POST"])
+@jwt_required_ngo
+def decline(request_id):
+    """
+    Turn a pending request down: its beds are released and it is
+    dispatched to another shelter
+    """
+
+    if not ObjectId.is_valid(request_id):
+        return jsonify({"error": "Request not found"}), 404
+
+    request_document = decline_request(request_id, g.ngo["id"])
+
+    if request_document is None:
+        return jsonify({"error": "No pending request with this id"}), 404
+
+    return jsonify(request_status_view(request_document)), 200
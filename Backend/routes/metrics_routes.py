@@ -0,0 +1,30 @@
+import os
+
+from flask import Blueprint, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+
+
+metrics_bp = Blueprint("metrics_bp", __name__)
+
+
+# -------------------------------------------------
+# PROMETHEUS SCRAPE ENDPOINT
+# -------------------------------------------------
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Prometheus exposition. Under gunicorn (PROMETHEUS_MULTIPROC_DIR
+    set) the values of every worker are merged from the shared
+    directory, so any worker can answer the scrape.
+
+    Not authenticated: keep it off the public proxy.
+    """
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -1,10 +1,13 @@
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, jsonify, g
 
 from middleware.auth_middleware import jwt_required_ngo
+from schemas.ngo_schema import NGOUpdateSchema
+from services.dashboard_service import get_dashboard_stats
 from services.ngo_service import (
     get_ngo_by_id,
     update_ngo_profile
 )
+from utils.validators import validate_body
 
 # Blueprint
 ngo_bp = Blueprint("ngo_bp", __name__)
@@ -40,18 +43,18 @@ def get_profile():
 # ---------------------------------------------------
 @ngo_bp.route("/update-profile", methods=["PUT"])
 @jwt_required_ngo
+@validate_body(NGOUpdateSchema, error="Invalid profile update")
 def update_profile():
     """
     Update NGO details like name, phone
     """
 
     ngo_id = g.ngo["id"]
-    data = request.get_json()
 
-    if not data:
+    if not g.data:
         return jsonify({"error": "No update data provided"}), 400
 
-    updated = update_ngo_profile(ngo_id, data)
+    updated = update_ngo_profile(ngo_id, g.data)
 
     if updated == 0:
         return jsonify({"error": "Profile not updated"}), 400
@@ -68,7 +71,8 @@ def update_profile():
 @jwt_required_ngo
 def ngo_dashboard():
     """
-    Basic dashboard info for NGO
+    Dashboard info for NGO: profile plus shelter / bed totals,
+    read from the NGO's precomputed aggregate (no shelter scan)
     """
 
     ngo_id = g.ngo["id"]
@@ -82,5 +86,6 @@ def ngo_dashboard():
 
     return jsonify({
         "message": "NGO dashboard loaded",
-        "ngo": ngo
+        "ngo": ngo,
+        "stats": get_dashboard_stats(ngo_id)
     }), 200
@@ -0,0 +1,382 @@
+import hashlib
+import json
+import os
+from datetime import timedelta, timezone
+
+from bson import ObjectId
+from flask import Blueprint, Response, current_app, g, jsonify, redirect, request, send_file, url_for
+
+from services import cache_service, snapshot_service
+from services.realtime_service import TILE_PRECISION, broker, iter_sse
+from services.search_service import (
+    SEARCH_TILE_PRECISION,
+    find_nearest_shelters,
+    find_shelters_in_tile,
+    find_shelters_within,
+    tile_version
+)
+from services.shelter_service import get_shelter_by_id
+from utils.geo_helpers import GEOHASH_ALPHABET, geohash_bounds, geohash_encode, geohash_neighbors
+from utils.time_helpers import now_ms
+
+# Blueprint
+public_bp = Blueprint("public_bp", __name__)
+
+MAX_NEARBY_RESULTS = 50
+
+# Boolean query params accepted as search filters
+SEARCH_FLAGS = ("available_only", "emergency_mode", "pet_friendly", "accessibility", "is_24_hour")
+
+# Origins are snapped to ~100 m so nearby users share cache entries
+ORIGIN_PRECISION = 3
+
+
+def search_filters(args):
+    filters = {
+        flag: True
+        for flag in SEARCH_FLAGS
+        if args.get(flag, "").lower() in ("1", "true", "yes")
+    }
+
+    gender = args.get("gender")
+
+    if gender:
+        filters["gender"] = gender
+
+    return filters
+
+
+def parse_nearby_query(args):
+    """
+    Validate /shelters/nearby query params (shared with the ASGI app).
+    Returns (query, error).
+    """
+
+    lat = args.get("lat", type=float)
+    lng = args.get("lng", type=float)
+
+    if lat is None or lng is None or not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        return None, "valid lat and lng are required"
+
+    return {
+        "lat": round(lat, ORIGIN_PRECISION),
+        "lng": round(lng, ORIGIN_PRECISION),
+        "k": max(1, min(args.get("k", 10, type=int), MAX_NEARBY_RESULTS)),
+        "radius_km": args.get("radius_km", type=float),
+        "filters": search_filters(args)
+    }, None
+
+
+def search_nearby(query):
+    if query["radius_km"] is not None:
+        return find_shelters_within(
+            query["lat"], query["lng"], query["radius_km"], limit=query["k"], **query["filters"]
+        )
+
+    return find_nearest_shelters(query["lat"], query["lng"], query["k"], **query["filters"])
+
+
+# ---------------------------------------------------
+# NEARBY SHELTERS (CACHED)
+# ---------------------------------------------------
+@public_bp.route("/shelters/nearby", methods=["GET"])
+def nearby_shelters():
+    """
+    Nearest shelters to a point, nearest first.
+    Query params: lat, lng, k, radius_km, gender and the SEARCH_FLAGS
+    """
+
+    query, error = parse_nearby_query(request.args)
+
+    if error:
+        return jsonify({"error": error}), 400
+
+    key = cache_service.search_key(
+        lat=query["lat"],
+        lng=query["lng"],
+        k=query["k"],
+        radius_km=query["radius_km"],
+        **query["filters"]
+    )
+    shelters = cache_service.get_or_load(key, lambda: search_nearby(query))
+
+    return jsonify({"shelters": shelters}), 200
+
+
+# ---------------------------------------------------
+# TILED SEARCH (CDN-CACHEABLE)
+# ---------------------------------------------------
+# Queries are snapped to a geohash tile plus a canonical filter set, so
+# every user in the same ~5 km tile asking the same thing gets the same
+# URL and the same response. Shared caches keep it for
+# PUBLIC_TILE_MAX_AGE_SECONDS and revalidate with If-None-Match /
+# If-Modified-Since, which are answered from the in-memory search index
+# (no MongoDB read). Responses carry coordinates but no distances, so
+# clients sort and refine by distance themselves.
+
+def valid_tile(tile, precision):
+    return len(tile) == precision and all(char in GEOHASH_ALPHABET for char in tile)
+
+
+def canonical_filter_args(filters):
+    """
+    Query string args for a filter set, in a fixed order
+    """
+
+    return {
+        key: ("1" if value is True else value)
+        for key, value in sorted(filters.items())
+    }
+
+
+def tile_etag(tile, filters, digest, last_modified):
+    stamp = last_modified.isoformat() if last_modified else ""
+    raw = f"{tile}|{json.dumps(filters, sort_keys=True)}|{digest}|{stamp}"
+
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def http_last_modified(last_modified, checked_at):
+    """
+    Last-Modified as an HTTP date (whole seconds), rounded up so it is
+    never older than the change. None while that second had not ended
+    at `checked_at` (before the tile was read): a later change in the
+    same second would get the same date, so If-Modified-Since could
+    not tell them apart.
+    """
+
+    if last_modified is None:
+        return None
+
+    rounded = last_modified.replace(microsecond=0)
+
+    if last_modified.microsecond:
+        rounded += timedelta(seconds=1)
+
+    if rounded > checked_at:
+        return None
+
+    return rounded.replace(tzinfo=timezone.utc)
+
+
+def tile_not_modified(etag, last_modified):
+    """
+    Conditional GET check. When If-None-Match is sent it alone decides
+    (RFC 9110 13.2.2); If-Modified-Since is only used without it.
+    """
+
+    if "If-None-Match" in request.headers:
+        return request.if_none_match.contains(etag)
+
+    if request.if_modified_since and last_modified:
+        return last_modified <= request.if_modified_since
+
+    return False
+
+
+@public_bp.route("/shelters/search", methods=["GET"])
+def tiled_search():
+    """
+    Redirect a lat/lng search to its canonical tile URL.
+    Query params: lat, lng, gender and the SEARCH_FLAGS
+    """
+
+    lat = request.args.get("lat", type=float)
+    lng = request.args.get("lng", type=float)
+
+    if lat is None or lng is None or not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        return jsonify({"error": "valid lat and lng are required"}), 400
+
+    tile = geohash_encode(lat, lng, SEARCH_TILE_PRECISION)
+    filters = canonical_filter_args(search_filters(request.args))
+
+    response = redirect(url_for("public_bp.shelters_in_tile", tile=tile, **filters), code=302)
+
+    # The point -> tile mapping never changes
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+
+    return response
+
+
+@public_bp.route("/shelters/tiles/<tile>", methods=["GET"])
+def shelters_in_tile(tile):
+    """
+    Every shelter in a geohash tile matching the filters.
+    Query params: gender and the SEARCH_FLAGS.
+
+    ETag / Last-Modified come from the newest updated_at in the tile.
+    """
+
+    if not valid_tile(tile, SEARCH_TILE_PRECISION):
+        return jsonify({"error": f"tile must be a geohash of length {SEARCH_TILE_PRECISION}"}), 400
+
+    filters = search_filters(request.args)
+
+    checked_at = now_ms()
+    digest, last_modified = tile_version(tile)
+
+    etag = tile_etag(tile, filters, digest, last_modified)
+    last_modified = http_last_modified(last_modified, checked_at)
+
+    if tile_not_modified(etag, last_modified):
+        response = Response(status=304)
+    else:
+        lat_lo, lat_hi, lon_lo, lon_hi = geohash_bounds(tile)
+
+        response = jsonify({
+            "tile": tile,
+            "bounds": {"lat_lo": lat_lo, "lat_hi": lat_hi, "lon_lo": lon_lo, "lon_hi": lon_hi},
+            "neighbors": [neighbor for neighbor in geohash_neighbors(tile) if neighbor != tile],
+            "shelters": find_shelters_in_tile(tile, **filters)
+        })
+
+    response.set_etag(etag)
+
+    if last_modified:
+        response.last_modified = last_modified
+
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get("PUBLIC_TILE_MAX_AGE_SECONDS", 5)
+    response.cache_control.stale_while_revalidate = current_app.config.get("PUBLIC_TILE_STALE_SECONDS", 30)
+
+    return response
+
+
+# ---------------------------------------------------
+# LIVE BED UPDATES (SERVER-SENT EVENTS)
+# ---------------------------------------------------
+MAX_STREAM_TILES = 25
+
+
+def parse_stream_tiles(args):
+    """
+    Tiles to subscribe to from the stream query. Returns (tiles, error).
+    Shared with the ASGI stream route.
+    """
+
+    lat = args.get("lat", type=float)
+    lng = args.get("lng", type=float)
+
+    if lat is not None and lng is not None:
+        tiles = geohash_neighbors(geohash_encode(lat, lng, TILE_PRECISION))
+    else:
+        tiles = [tile for tile in args.get("tiles", "").split(",") if tile]
+
+    valid = all(valid_tile(tile, TILE_PRECISION) for tile in tiles)
+
+    if not tiles or not valid or len(tiles) > MAX_STREAM_TILES:
+        return None, f"lat/lng or up to {MAX_STREAM_TILES} geohash tiles of length {TILE_PRECISION} required"
+
+    return tiles, None
+
+
+@public_bp.route("/shelters/stream", methods=["GET"])
+def stream_bed_updates():
+    """
+    Push bed / emergency-mode changes for an area as server-sent events.
+    Query params: lat + lng (that tile and its neighbours), or
+    tiles=<comma separated geohashes of length TILE_PRECISION>.
+
+    Each idle connection holds a sync worker thread here. For large
+    fan-out route this path to the ASGI app (asgi.py), which serves the
+    same stream with one coroutine per connection.
+    """
+
+    tiles, error = parse_stream_tiles(request.args)
+
+    if error:
+        return jsonify({"error": error}), 400
+
+    subscriber = broker.subscribe(tiles)
+
+    response = Response(iter_sse(subscriber), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+
+    return response
+
+
+# ---------------------------------------------------
+# PUBLIC SHELTER DETAIL (CACHED)
+# ---------------------------------------------------
+@public_bp.route("/shelters/<shelter_id>", methods=["GET"])
+def public_shelter_detail(shelter_id):
+    """
+    Shelter details for the public app
+    """
+
+    if not ObjectId.is_valid(shelter_id):
+        return jsonify({"error": "Shelter not found"}), 404
+
+    shelter = cache_service.get_or_load(
+        cache_service.shelter_key(shelter_id),
+        lambda: get_shelter_by_id(shelter_id)
+    )
+
+    if not shelter:
+        return jsonify({"error": "Shelter not found"}), 404
+
+    return jsonify(shelter), 200
+
+
+# ---------------------------------------------------
+# OFFLINE SNAPSHOT + DELTAS
+# ---------------------------------------------------
+@public_bp.route("/shelters/snapshot", methods=["GET"])
+def shelter_snapshot():
+    """
+    Newest offline snapshot (msgpack columns, see snapshot_service).
+    Built by scripts/build_snapshot.py; X-Snapshot-Version is what to
+    pass as `since` to /shelters/snapshot/delta later.
+    """
+
+    latest = snapshot_service.latest_snapshot()
+
+    if latest is None:
+        return jsonify({"error": "No snapshot has been built yet"}), 404
+
+    version, path = latest
+
+    response = send_file(
+        os.path.abspath(path),
+        mimetype=snapshot_service.CONTENT_TYPE,
+        download_name=os.path.basename(path),
+        etag=str(version),
+        max_age=current_app.config.get("PUBLIC_TILE_MAX_AGE_SECONDS", 5),
+        conditional=True
+    )
+    response.cache_control.public = True
+    response.headers["X-Snapshot-Version"] = str(version)
+
+    return response
+
+
+@public_bp.route("/shelters/snapshot/delta", methods=["GET"])
+def shelter_snapshot_delta():
+    """
+    Shelters changed (and ids deleted) since a snapshot version.
+    Query params: since (a snapshot or delta version).
+    410 when `since` is older than the tombstone retention window.
+    """
+
+    since = request.args.get("since", type=int)
+
+    if since is None or since < 0:
+        return jsonify({"error": "since must be a snapshot version"}), 400
+
+    try:
+        # Keyed on the search generation: any shelter write invalidates it
+        data = cache_service.get_or_load(
+            cache_service.search_key(snapshot_delta=since),
+            lambda: snapshot_service.build_delta(since)
+        )
+    except snapshot_service.SnapshotTooOld:
+        return jsonify({"error": "Snapshot too old for a delta, download /public/shelters/snapshot"}), 410
+
+    response = Response(data, mimetype=snapshot_service.CONTENT_TYPE)
+    response.cache_control.public = True
+    response.cache_control.max_age = int(current_app.config.get("CACHE_TTL_SECONDS", 5))
+
+    return response
+
@@ -1,6 +1,13 @@
-from flask import Blueprint, request, jsonify, g
+from bson import ObjectId
+from flask import Blueprint, Response, current_app, request, jsonify, g, stream_with_context
 
 from middleware.auth_middleware import jwt_required_ngo
+from services import cache_service
+from services.export_service import (
+    EXPORT_FORMATS,
+    iter_export_chunks,
+    parse_updated_since
+)
 from services.shelter_service import (
     create_shelter,
     get_shelter_by_id,
@@ -8,8 +15,74 @@ from services.shelter_service import (
     update_shelter,
     delete_shelter,
     update_available_beds,
+    bulk_update_available_beds,
+    MAX_BULK_BED_UPDATES,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    SHELTER_VIEWS,
+    reserve_beds,
+    release_beds,
     toggle_emergency_mode
 )
+from schemas.shelter_schema import (
+    BedReservationSchema,
+    BedUpdateSchema,
+    BulkBedUpdateSchema,
+    CreateShelterSchema,
+    EmergencyToggleSchema,
+    UpdateShelterSchema
+)
+from utils.time_helpers import now_ms
+from utils.validators import validate_body
+
+
+def _shelter_etag(shelter):
+    return str(shelter.get("version", 0))
+
+
+def _expected_version():
+    """
+    Version required by an If-Match header.
+    Returns None when there is no precondition, False when it is malformed.
+    """
+
+    if_match = request.if_match
+
+    if not if_match or if_match.star_tag:
+        return None
+
+    versions = [tag for tag in if_match.as_set() if tag.isdigit()]
+
+    if len(versions) != 1:
+        return False
+
+    return int(versions[0])
+
+
+def _bed_state_response(message, shelter):
+    response = jsonify({
+        "message": message,
+        "available_beds": shelter["available_beds"],
+        "total_beds": shelter.get("total_beds"),
+        "version": shelter.get("version", 0)
+    })
+    response.set_etag(_shelter_etag(shelter))
+
+    return response
+
+
+def _owned_shelter(shelter_id):
+    """
+    The shelter if it exists and belongs to the logged-in NGO
+    """
+
+    shelter = get_shelter_by_id(shelter_id)
+
+    if not shelter or shelter.get("ngo_id") != g.ngo["id"]:
+        return None
+
+    return shelter
+
 
 # Blueprint
 shelter_bp = Blueprint("shelter_bp", __name__)
@@ -20,15 +93,15 @@ shelter_bp = Blueprint("shelter_bp", __name__)
 # ---------------------------------------------------
 @shelter_bp.route("/add", methods=["POST"])
 @jwt_required_ngo
+@validate_body(CreateShelterSchema, error="Invalid shelter")
 def add_shelter():
     """
     NGO adds a new shelter
     """
 
-    data = request.get_json()
     ngo_id = g.ngo["id"]
 
-    shelter_id = create_shelter(ngo_id, data)
+    shelter_id = create_shelter(ngo_id, g.data)
 
     return jsonify({
         "message": "Shelter created successfully",
@@ -43,18 +116,88 @@ def add_shelter():
 @jwt_required_ngo
 def get_my_shelters():
     """
-    Fetch all shelters belonging to logged-in NGO
+    Fetch shelters belonging to logged-in NGO, one page at a time.
+    Query params: cursor, limit (max MAX_PAGE_SIZE), view (card | detail)
     """
 
     ngo_id = g.ngo["id"]
 
-    shelters = get_shelters_by_ngo(ngo_id)
+    cursor = request.args.get("cursor")
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    view = request.args.get("view", "card")
+
+    if view not in SHELTER_VIEWS:
+        return jsonify({"error": f"view must be one of {sorted(SHELTER_VIEWS)}"}), 400
+
+    if cursor and not ObjectId.is_valid(cursor):
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    shelters, next_cursor = get_shelters_by_ngo(
+        ngo_id,
+        after=cursor,
+        limit=min(limit, MAX_PAGE_SIZE),
+        view=view
+    )
 
     return jsonify({
-        "shelters": shelters
+        "shelters": shelters,
+        "next_cursor": next_cursor
     }), 200
 
 
+# ---------------------------------------------------
+# STREAMING SHELTER EXPORT
+# ---------------------------------------------------
+@shelter_bp.route("/export", methods=["GET"])
+@jwt_required_ngo
+def export_shelters():
+    """
+    Stream every shelter as NDJSON (default) or a chunked JSON array.
+    Query params: format (ndjson | json), updated_since (ISO-8601).
+
+    X-Export-Started-At can be passed back as updated_since next time
+    to fetch only what changed.
+
+    Every shelter, not only the caller's. A full collection scan, so
+    limited to EXPORT_RATE_LIMIT exports per NGO per window.
+    """
+
+    retry_after = cache_service.rate_limit(
+        "export",
+        g.ngo["id"],
+        current_app.config.get("EXPORT_RATE_LIMIT", 6),
+        current_app.config.get("EXPORT_RATE_LIMIT_WINDOW_SECONDS", 3600)
+    )
+
+    if retry_after is not None:
+        response = jsonify({"error": "Export rate limit exceeded"})
+        response.headers["Retry-After"] = str(retry_after)
+
+        return response, 429
+
+    fmt = request.args.get("format", "ndjson")
+
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {list(EXPORT_FORMATS)}"}), 400
+
+    try:
+        updated_since = parse_updated_since(request.args.get("updated_since"))
+    except ValueError:
+        return jsonify({"error": "updated_since must be an ISO-8601 timestamp"}), 400
+
+    started_at = now_ms()
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+
+    response = Response(
+        stream_with_context(iter_export_chunks(updated_since, fmt)),
+        mimetype=mimetype
+    )
+    response.headers["X-Export-Started-At"] = started_at.isoformat(timespec="milliseconds") + "Z"
+
+    return response
+
+
 # ---------------------------------------------------
 # GET SINGLE SHELTER
 # ---------------------------------------------------
@@ -70,7 +213,10 @@ def get_shelter(shelter_id):
     if not shelter:
         return jsonify({"error": "Shelter not found"}), 404
 
-    return jsonify(shelter), 200
+    response = jsonify(shelter)
+    response.set_etag(_shelter_etag(shelter))
+
+    return response, 200
 
 
 # ---------------------------------------------------
@@ -78,17 +224,23 @@ def get_shelter(shelter_id):
 # ---------------------------------------------------
 @shelter_bp.route("/update/<shelter_id>", methods=["PUT"])
 @jwt_required_ngo
+@validate_body(UpdateShelterSchema, error="Invalid shelter update")
 def edit_shelter(shelter_id):
     """
     Update shelter info (name, address etc.)
     """
 
-    data = request.get_json()
+    if not g.data:
+        return jsonify({"error": "No update data provided"}), 400
 
-    updated = update_shelter(shelter_id, data)
+    updated = update_shelter(shelter_id, g.data)
 
     if updated == 0:
-        return jsonify({"error": "Shelter not updated"}), 400
+        # Only failed writes pay for a second read to explain why
+        if not get_shelter_by_id(shelter_id):
+            return jsonify({"error": "Shelter not found"}), 404
+
+        return jsonify({"error": "available_beds cannot exceed total_beds"}), 400
 
     return jsonify({"message": "Shelter updated successfully"}), 200
 
@@ -116,22 +268,127 @@ def remove_shelter(shelter_id):
 # ---------------------------------------------------
 @shelter_bp.route("/update-beds/<shelter_id>", methods=["PATCH"])
 @jwt_required_ngo
+@validate_body(BedUpdateSchema, error="Invalid bed update")
 def update_beds(shelter_id):
     """
-    Update available beds count
+    Update available beds count.
+    Send If-Match: "<version>" (the shelter ETag) to reject the write
+    when someone else changed the shelter in the meantime.
     """
 
-    data = request.get_json()
+    expected_version = _expected_version()
 
-    if "available_beds" not in data:
-        return jsonify({"error": "available_beds field required"}), 400
+    if expected_version is False:
+        return jsonify({"error": "If-Match must be a single shelter version"}), 400
 
-    updated = update_available_beds(shelter_id, data["available_beds"])
+    shelter = update_available_beds(shelter_id, g.data["available_beds"], expected_version)
 
-    if updated == 0:
-        return jsonify({"error": "Beds not updated"}), 400
+    # Write-behind coalescing: accepted, written within the window
+    if shelter and shelter.get("queued"):
+        return jsonify({
+            "message": "Available beds update queued",
+            "available_beds": shelter["available_beds"]
+        }), 202
 
-    return jsonify({"message": "Available beds updated"}), 200
+    if shelter:
+        return _bed_state_response("Available beds updated", shelter), 200
+
+    # Only failed writes pay for a second read to explain why
+    current = get_shelter_by_id(shelter_id)
+
+    if not current:
+        return jsonify({"error": "Shelter not found"}), 404
+
+    if expected_version is not None and current.get("version", 0) != expected_version:
+        response = jsonify({
+            "error": "Shelter was modified by another request",
+            "available_beds": current["available_beds"],
+            "version": current.get("version", 0)
+        })
+        response.set_etag(_shelter_etag(current))
+
+        return response, 412
+
+    return jsonify({"error": "available_beds cannot exceed total_beds"}), 400
+
+
+# ---------------------------------------------------
+# BULK UPDATE AVAILABLE BEDS
+# ---------------------------------------------------
+@shelter_bp.route("/bulk-update-beds", methods=["POST"])
+@jwt_required_ngo
+@validate_body(BulkBedUpdateSchema, error="Invalid bed updates")
+def bulk_update_beds():
+    """
+    Update bed counts for many of the NGO's shelters in one call.
+    Body: {"updates": [{"shelter_id": ..., "available_beds": ...}, ...]}
+    """
+
+    ngo_id = g.ngo["id"]
+    updates = g.data["updates"]
+
+    if len(updates) > MAX_BULK_BED_UPDATES:
+        return jsonify({"error": f"At most {MAX_BULK_BED_UPDATES} updates per request"}), 400
+
+    shelter_ids = [item["shelter_id"] for item in updates]
+
+    if len(set(shelter_ids)) != len(shelter_ids):
+        return jsonify({"error": "Each shelter_id may appear only once"}), 400
+
+    results = bulk_update_available_beds(ngo_id, updates)
+
+    return jsonify({
+        "updated": sum(1 for result in results if result["status"] == "updated"),
+        "results": results
+    }), 200
+
+
+# ---------------------------------------------------
+# RESERVE BEDS
+# ---------------------------------------------------
+@shelter_bp.route("/reserve-beds/<shelter_id>", methods=["POST"])
+@jwt_required_ngo
+@validate_body(BedReservationSchema, error="Invalid bed count")
+def reserve(shelter_id):
+    """
+    Atomically take beds (default 1) if enough are free
+    """
+
+    count = g.data["count"]
+
+    shelter = reserve_beds(shelter_id, count, ngo_id=g.ngo["id"])
+
+    if not shelter:
+        if not _owned_shelter(shelter_id):
+            return jsonify({"error": "Shelter not found"}), 404
+
+        return jsonify({"error": "Not enough available beds"}), 409
+
+    return _bed_state_response("Beds reserved", shelter), 200
+
+
+# ---------------------------------------------------
+# RELEASE BEDS
+# ---------------------------------------------------
+@shelter_bp.route("/release-beds/<shelter_id>", methods=["POST"])
+@jwt_required_ngo
+@validate_body(BedReservationSchema, error="Invalid bed count")
+def release(shelter_id):
+    """
+    Atomically give beds back (default 1), capped at total_beds
+    """
+
+    count = g.data["count"]
+
+    shelter = release_beds(shelter_id, count, ngo_id=g.ngo["id"])
+
+    if not shelter:
+        if not _owned_shelter(shelter_id):
+            return jsonify({"error": "Shelter not found"}), 404
+
+        return jsonify({"error": "Release would exceed total beds"}), 409
+
+    return _bed_state_response("Beds released", shelter), 200
 
 
 # ---------------------------------------------------
@@ -139,22 +396,20 @@ def update_beds(shelter_id):
 # ---------------------------------------------------
 @shelter_bp.route("/toggle-emergency/<shelter_id>", methods=["PATCH"])
 @jwt_required_ngo
+@validate_body(EmergencyToggleSchema, error="Invalid emergency toggle")
 def emergency_toggle(shelter_id):
     """
     Turn emergency mode ON/OFF
     """
 
-    data = request.get_json()
-
-    if "status" not in data:
-        return jsonify({"error": "status field required"}), 400
+    status = g.data["status"]
 
-    updated = toggle_emergency_mode(shelter_id, data["status"])
+    updated = toggle_emergency_mode(shelter_id, status)
 
     if updated == 0:
         return jsonify({"error": "Emergency status not updated"}), 400
 
     return jsonify({
         "message": "Emergency mode updated",
-        "status": data["status"]
+        "status": status
     }), 200
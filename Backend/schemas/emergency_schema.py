@@ -0,0 +1,61 @@
+from marshmallow import Schema, fields, validate
+
+
+# Dispatch priority levels, most urgent first
+PRIORITIES = ("critical", "high", "normal")
+
+
+# ---------------------------------------------------
+# EMERGENCY HELP REQUEST SCHEMA
+# ---------------------------------------------------
+class EmergencyRequestSchema(Schema):
+    """
+    Validation for an incoming help request
+    """
+
+    user_name = fields.Str(validate=validate.Length(max=120), allow_none=True)
+    user_phone = fields.Str(validate=validate.Length(max=20), allow_none=True)
+
+    user_location_lat = fields.Float(
+        required=True,
+        validate=validate.Range(min=-90, max=90),
+        error_messages={"required": "user_location_lat is required"}
+    )
+
+    user_location_lng = fields.Float(
+        required=True,
+        validate=validate.Range(min=-180, max=180),
+        error_messages={"required": "user_location_lng is required"}
+    )
+
+    message = fields.Str(validate=validate.Length(max=500), allow_none=True)
+
+    priority = fields.Str(
+        load_default="normal",
+        validate=validate.OneOf(PRIORITIES)
+    )
+
+    # Beds needed (e.g. a family of 4)
+    people = fields.Int(
+        load_default=1,
+        validate=validate.Range(min=1, max=20)
+    )
+
+    gender = fields.Str(validate=validate.OneOf(["men", "women", "family"]))
+    pet_friendly = fields.Boolean(load_default=False)
+    accessibility = fields.Boolean(load_default=False)
+
+
+# ---------------------------------------------------
+# CANCEL REQUEST SCHEMA
+# ---------------------------------------------------
+class CancelRequestSchema(Schema):
+    """
+    The token returned when the request was submitted
+    """
+
+    cancel_token = fields.Str(
+        required=True,
+        validate=validate.Length(min=1, max=100),
+        error_messages={"required": "cancel_token is required"}
+    )
@@ -1,4 +1,16 @@
-from marshmallow import Schema, fields, validate, ValidationError
+from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+
+
+def _check_bed_counts(data):
+    """
+    available_beds may not exceed total_beds when both are given
+    """
+
+    total = data.get("total_beds")
+    available = data.get("available_beds")
+
+    if total is not None and available is not None and available > total:
+        raise ValidationError("available_beds cannot exceed total_beds", "available_beds")
 
 
 # ---------------------------------------------------
@@ -51,6 +63,18 @@ class ShelterBaseSchema(Schema):
         error_messages={"required": "Available beds required"}
     )
 
+    latitude = fields.Float(validate=validate.Range(min=-90, max=90))
+    longitude = fields.Float(validate=validate.Range(min=-180, max=180))
+
+    gender = fields.Str(validate=validate.OneOf(["all", "men", "women", "family"]))
+    pet_friendly = fields.Boolean()
+    accessibility = fields.Boolean()
+    is_24_hour = fields.Boolean()
+
+    @validates_schema
+    def check_bed_counts(self, data, **kwargs):
+        _check_bed_counts(data)
+
 
 # ---------------------------------------------------
 # CREATE SHELTER SCHEMA
@@ -68,7 +92,8 @@ class CreateShelterSchema(ShelterBaseSchema):
 class UpdateShelterSchema(Schema):
     """
     Validation for updating shelter details
-    All fields optional
+    All fields optional; a bed count sent alone is checked against the
+    stored one by update_shelter
     """
 
     name = fields.Str(validate=validate.Length(min=2, max=120))
@@ -78,6 +103,16 @@ class UpdateShelterSchema(Schema):
     pincode = fields.Str(validate=validate.Regexp(r"^[0-9]{6}$"))
     total_beds = fields.Int(validate=validate.Range(min=0))
     available_beds = fields.Int(validate=validate.Range(min=0))
+    latitude = fields.Float(validate=validate.Range(min=-90, max=90))
+    longitude = fields.Float(validate=validate.Range(min=-180, max=180))
+    gender = fields.Str(validate=validate.OneOf(["all", "men", "women", "family"]))
+    pet_friendly = fields.Boolean()
+    accessibility = fields.Boolean()
+    is_24_hour = fields.Boolean()
+
+    @validates_schema
+    def check_bed_counts(self, data, **kwargs):
+        _check_bed_counts(data)
 
 
 # ---------------------------------------------------
@@ -95,6 +130,48 @@ class BedUpdateSchema(Schema):
     )
 
 
+# ---------------------------------------------------
+# BULK BED UPDATE SCHEMA
+# ---------------------------------------------------
+class BulkBedUpdateItemSchema(BedUpdateSchema):
+    """
+    One entry of a bulk bed update (load with many=True)
+    """
+
+    shelter_id = fields.Str(
+        required=True,
+        validate=validate.Regexp(r"^[0-9a-f]{24}$"),
+        error_messages={"required": "shelter_id is required"}
+    )
+
+
+class BulkBedUpdateSchema(Schema):
+    """
+    Body of a bulk bed update: {"updates": [...]}
+    """
+
+    updates = fields.List(
+        fields.Nested(BulkBedUpdateItemSchema),
+        required=True,
+        validate=validate.Length(min=1),
+        error_messages={"required": "updates list required"}
+    )
+
+
+# ---------------------------------------------------
+# BED RESERVATION SCHEMA
+# ---------------------------------------------------
+class BedReservationSchema(Schema):
+    """
+    Validation for reserving / releasing beds
+    """
+
+    count = fields.Int(
+        load_default=1,
+        validate=validate.Range(min=1)
+    )
+
+
 # ---------------------------------------------------
 # EMERGENCY TOGGLE SCHEMA
 # ---------------------------------------------------
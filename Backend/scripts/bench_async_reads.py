@@ -0,0 +1,197 @@
+"""
+Compare the sync (gunicorn, Flask) and async (uvicorn, asgi.py) read
+paths: same read mix, same concurrency, one worker process each.
+
+Start both servers against the same mongod, then run the benchmark:
+
+    gunicorn -w 1 -b 127.0.0.1:8000 wsgi:app
+    uvicorn asgi:app --workers 1 --port 8001
+
+Usage (from Backend/):
+    python scripts/bench_async_reads.py --uri mongodb://localhost:27017 \\
+        [--seed 10000] [--concurrency 200] [--seconds 10]
+
+Under mongomock each server holds its own empty database, so only
+routing and framework overhead are measured.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import mongo  # noqa: E402
+from utils.geo_helpers import make_point  # noqa: E402
+
+
+LAT_RANGE = (18.9, 19.3)
+LNG_RANGE = (72.8, 73.0)
+
+# Share of requests per endpoint during a surge
+READ_MIX = (
+    ("nearby", 0.7),
+    ("detail", 0.2),
+    ("status", 0.1)
+)
+
+
+# ---------------------------------------------------
+# DATA
+# ---------------------------------------------------
+def seed(count, rng):
+    shelter_collection = mongo.shelters()
+    request_collection = mongo.emergency_requests()
+
+    shelter_collection.insert_many([
+        {
+            "ngo_id": f"bench-ngo-{i % 50}",
+            "name": f"Bench shelter {i}",
+            "location": make_point(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)),
+            "total_beds": 20,
+            "available_beds": rng.randint(0, 20),
+            "emergency_mode": rng.random() < 0.3,
+            "gender": "all",
+            "version": 0,
+            "updated_at": datetime.utcnow()
+        }
+        for i in range(count)
+    ])
+
+    request_collection.insert_many([
+        {"status": "queued", "shelter_id": None, "ngo_id": None, "created_at": datetime.utcnow()}
+        for _ in range(max(1, count // 10))
+    ])
+
+
+def sample_ids(collection, size):
+    return [str(document["_id"]) for document in collection.find({}, {"_id": 1}).limit(size)]
+
+
+def make_paths(count, shelter_ids, request_ids, rng):
+    kinds, weights = zip(*READ_MIX)
+    paths = []
+
+    for kind in rng.choices(kinds, weights, k=count):
+        if kind == "detail" and shelter_ids:
+            paths.append(f"/public/shelters/{rng.choice(shelter_ids)}")
+        elif kind == "status" and request_ids:
+            paths.append(f"/emergency/request/{rng.choice(request_ids)}")
+        else:
+            paths.append(
+                f"/public/shelters/nearby?lat={rng.uniform(*LAT_RANGE):.4f}"
+                f"&lng={rng.uniform(*LNG_RANGE):.4f}&k=10&available_only=1"
+            )
+
+    return paths
+
+
+# ---------------------------------------------------
+# LOAD GENERATOR
+# ---------------------------------------------------
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+
+        response = await reader.read()
+    finally:
+        writer.close()
+
+    return int(response.split(b" ", 2)[1])
+
+
+async def run_load(base_url, paths, concurrency, seconds):
+    url = urlsplit(base_url)
+    latencies = []
+    statuses = {}
+    errors = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client(offset):
+        nonlocal errors
+
+        i = offset
+
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += concurrency
+
+            started = time.perf_counter()
+
+            try:
+                status = await fetch(url.hostname, url.port or 80, path)
+            except (OSError, IndexError, ValueError):
+                errors += 1
+                continue
+
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(fraction):
+        if not latencies:
+            return None
+
+        return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 2)
+
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99)},
+        "statuses": statuses,
+        "errors": errors
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sync-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--async-url", default="http://127.0.0.1:8001")
+    parser.add_argument("--uri", help="MongoDB URI the servers use (defaults to MONGO_URI)")
+    parser.add_argument("--seed", type=int, default=0, help="shelters to insert first")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    if args.uri:
+        mongo.configure(MONGO_URI=args.uri)
+
+    rng = random.Random(5)
+
+    if args.seed:
+        seed(args.seed, rng)
+
+    paths = make_paths(
+        20_000,
+        sample_ids(mongo.shelters(), 1000),
+        sample_ids(mongo.emergency_requests(), 1000),
+        rng
+    )
+
+    report = {"concurrency": args.concurrency, "seconds": args.seconds}
+
+    for name, base_url in (("sync", args.sync_url), ("async", args.async_url)):
+        report[name] = asyncio.run(run_load(base_url, paths, args.concurrency, args.seconds))
+
+    if report["sync"]["throughput_rps"]:
+        report["async_speedup"] = round(report["async"]["throughput_rps"] / report["sync"]["throughput_rps"], 2)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
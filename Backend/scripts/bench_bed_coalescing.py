@@ -0,0 +1,122 @@
+"""
+Intake-rush simulation: desk clients send update_available_beds for a
+few shelters at a fixed rate each. Compares coalescing modes on Mongo writes issued, collapsed
+writes and caller latency.
+
+Usage (from Backend/):
+    python scripts/bench_bed_coalescing.py [--uri mongomock://] [--shelters 5] \\
+        [--clients 40] [--rate 20] [--seconds 3] [--window-ms 100]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import mongo  # noqa: E402
+from services import shelter_service  # noqa: E402
+
+
+BENCH_DB_NAME = "shelter_connect_bench_coalescing"
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+
+    return round(sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))], 2)
+
+
+def run(mode, shelter_ids, clients, rate, seconds, window_ms):
+    shelter_service.configure_bed_updates(mode, window_ms)
+    coalescer = shelter_service.bed_update_coalescer
+
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def desk(seed):
+        rng = random.Random(seed)
+        shelter_id = shelter_ids[seed % len(shelter_ids)]
+        mine = []
+        next_at = time.perf_counter()
+
+        while next_at < deadline:
+            delay = next_at - time.perf_counter()
+
+            if delay > 0:
+                time.sleep(delay)
+
+            next_at += 1 / rate
+            started = time.perf_counter()
+            shelter_service.update_available_beds(shelter_id, rng.randint(0, 100))
+            mine.append((time.perf_counter() - started) * 1000)
+
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=desk, args=(seed,)) for seed in range(clients)]
+    started = time.perf_counter()
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    shelter_service.configure_bed_updates("off")
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    requests = len(latencies)
+    stats = coalescer.stats() if coalescer else {"writes": requests, "collapsed": 0}
+
+    return {
+        "requests": requests,
+        "mongo_writes": stats["writes"],
+        "collapsed": stats["collapsed"],
+        "throughput_rps": round(requests / elapsed, 1),
+        "latency_ms": {"p50": percentile(latencies, 0.50), "p99": percentile(latencies, 0.99)}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongomock://")
+    parser.add_argument("--shelters", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=40)
+    parser.add_argument("--rate", type=float, default=20, help="updates per second per client")
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--window-ms", type=int, default=100)
+    args = parser.parse_args()
+
+    mongo.configure(MONGO_URI=args.uri, MONGO_DB_NAME=BENCH_DB_NAME)
+    mongo.get_client().drop_database(BENCH_DB_NAME)
+
+    shelter_ids = [
+        shelter_service.create_shelter("bench-ngo", {"name": f"Desk {i}", "total_beds": 100, "available_beds": 0})
+        for i in range(args.shelters)
+    ]
+
+    report = {
+        "shelters": args.shelters,
+        "clients": args.clients,
+        "rate_per_client": args.rate,
+        "window_ms": args.window_ms
+    }
+
+    for mode in shelter_service.COALESCING_MODES:
+        report[mode] = run(mode, shelter_ids, args.clients, args.rate, args.seconds, args.window_ms)
+
+    print(json.dumps(report, indent=2))
+
+    mongo.get_client().drop_database(BENCH_DB_NAME)
+
+
+if __name__ == "__main__":
+    main()
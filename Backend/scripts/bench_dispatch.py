@@ -0,0 +1,139 @@
+"""
+Emergency dispatch benchmark: submit help requests at a fixed rate and
+report assignment throughput, latency percentiles and an oversell check.
+
+mongomock scans a collection for every point lookup, so it only checks
+correctness at low rates. Use a local mongod for the 1k requests/sec target.
+
+Usage (from Backend/):
+    python scripts/bench_dispatch.py --uri mongodb://localhost:27017 [--rate 1000] [--seconds 10] [--shelters 5000]
+    python scripts/bench_dispatch.py --uri mongomock:// --rate 50 --seconds 2 --shelters 200
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import mongo  # noqa: E402
+from db.indexes import ensure_indexes  # noqa: E402
+from services import search_service  # noqa: E402
+from services.emergency_service import create_emergency_request, dispatcher  # noqa: E402
+from utils.geo_helpers import make_point  # noqa: E402
+
+
+BENCH_DB_NAME = "shelter_connect_bench_dispatch"
+
+# Metro-sized area so requests compete for the same shelters
+LAT_RANGE = (18.9, 19.3)
+LNG_RANGE = (72.8, 73.0)
+
+
+def seed_shelters(count, rng):
+    shelter_collection = mongo.shelters()
+
+    shelter_collection.insert_many([
+        {
+            "ngo_id": f"ngo-{i % 50}",
+            "name": f"Shelter {i}",
+            "location": make_point(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)),
+            "total_beds": beds,
+            "available_beds": beds,
+            "emergency_mode": True,
+            "gender": rng.choice(["all", "all", "men", "women", "family"]),
+            "version": 0
+        }
+        for i, beds in enumerate(rng.randint(0, 4) for _ in range(count))
+    ])
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongomock://")
+    parser.add_argument("--rate", type=int, default=1000, help="requests per second")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--shelters", type=int, default=5000)
+    args = parser.parse_args()
+
+    mongo.configure(MONGO_URI=args.uri, MONGO_DB_NAME=BENCH_DB_NAME)
+    mongo.get_client().drop_database(BENCH_DB_NAME)
+
+    ensure_indexes()
+
+    rng = random.Random(3)
+    seed_shelters(args.shelters, rng)
+    search_service.rebuild_index()
+
+    total = int(args.rate * args.seconds)
+    start = time.perf_counter()
+
+    for i in range(total):
+        # Pace submissions to the target rate
+        delay = start + i / args.rate - time.perf_counter()
+
+        if delay > 0:
+            time.sleep(delay)
+
+        create_emergency_request({
+            "user_location_lat": rng.uniform(*LAT_RANGE),
+            "user_location_lng": rng.uniform(*LNG_RANGE),
+            "priority": rng.choice(["normal", "normal", "high", "critical"]),
+            "people": rng.choice([1, 1, 1, 2, 4]),
+            "pet_friendly": False,
+            "accessibility": False
+        })
+
+    submitted = time.perf_counter() - start
+
+    dispatcher.wait_for_idle(timeout=600)
+    elapsed = time.perf_counter() - start
+    dispatcher.stop()
+
+    requests = list(mongo.emergency_requests().find({}, {"status": 1, "people": 1, "created_at": 1, "assigned_at": 1}))
+
+    latencies = sorted(
+        (request["assigned_at"] - request["created_at"]).total_seconds() * 1000
+        for request in requests
+        if request.get("assigned_at")
+    )
+
+    assigned = [request for request in requests if request["status"] == "pending"]
+    shelters = list(mongo.shelters().find({}, {"total_beds": 1, "available_beds": 1}))
+
+    beds_taken = sum(shelter["total_beds"] - shelter["available_beds"] for shelter in shelters)
+
+    print(json.dumps({
+        "requests": total,
+        "target_rate": args.rate,
+        "achieved_submit_rate": round(total / submitted, 1),
+        "dispatch_throughput": round(len(latencies) / elapsed, 1),
+        "assigned": len(assigned),
+        "unassigned": len(requests) - len(assigned),
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else None
+        },
+        "oversold_shelters": sum(1 for shelter in shelters if shelter["available_beds"] < 0),
+        "beds_taken_matches_assignments": beds_taken == sum(request["people"] for request in assigned)
+    }, indent=2))
+
+    mongo.get_client().drop_database(BENCH_DB_NAME)
+
+
+if __name__ == "__main__":
+    main()
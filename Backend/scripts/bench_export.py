@@ -0,0 +1,120 @@
+"""
+Compare peak memory of the streaming export with the old
+list(find()) + json.dumps path at growing dataset sizes.
+
+Peak is measured with tracemalloc around the export only, so the
+dataset itself (when held by mongomock) is not counted. Use a local
+mongod for realistic numbers at 1M shelters.
+
+Usage (from Backend/):
+    python scripts/bench_export.py [--uri mongodb://localhost:27017] [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import mongo  # noqa: E402
+from services.export_service import iter_export_chunks  # noqa: E402
+from utils.geo_helpers import make_point  # noqa: E402
+from utils.response import json_default  # noqa: E402
+
+
+BENCH_DB_NAME = "shelter_connect_bench_export"
+
+
+def seed(count):
+    shelter_collection = mongo.shelters()
+    shelter_collection.delete_many({})
+
+    base = datetime(2024, 1, 1)
+    batch = []
+
+    for i in range(count):
+        batch.append({
+            "ngo_id": f"ngo-{i % 500}",
+            "name": f"Shelter {i}",
+            "address": f"{i} Main Street",
+            "city": "Mumbai",
+            "state": "Maharashtra",
+            "pincode": "400001",
+            "location": make_point(random.uniform(18.9, 19.3), random.uniform(72.8, 73.0)),
+            "total_beds": 100,
+            "available_beds": random.randint(0, 100),
+            "emergency_mode": False,
+            "amenities": ["Hot meals", "Showers", "Laundry", "Medical services"],
+            "rules": ["No alcohol or drugs", "Check-in by 9 PM"],
+            "version": 0,
+            "created_at": base,
+            "updated_at": base + timedelta(seconds=i)
+        })
+
+        if len(batch) == 10_000:
+            shelter_collection.insert_many(batch)
+            batch = []
+
+    if batch:
+        shelter_collection.insert_many(batch)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    fn()
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def streaming_export():
+    with open(os.devnull, "w") as out:
+        for chunk in iter_export_chunks(fmt="ndjson"):
+            out.write(chunk)
+
+
+def list_export():
+    shelters = list(mongo.shelters().find())
+
+    for shelter in shelters:
+        shelter["_id"] = str(shelter["_id"])
+
+    with open(os.devnull, "w") as out:
+        out.write(json.dumps({"shelters": shelters}, default=json_default))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongomock://")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    mongo.configure(MONGO_URI=args.uri, MONGO_DB_NAME=BENCH_DB_NAME)
+    random.seed(7)
+
+    print(f"{'shelters':>10} {'stream time':>12} {'stream peak':>12} {'list time':>10} {'list peak':>10}")
+
+    for count in args.sizes:
+        seed(count)
+
+        stream_time, stream_peak = measure(streaming_export)
+        list_time, list_peak = measure(list_export)
+
+        print(f"{count:>10} {stream_time:>11.2f}s {stream_peak / 2**20:>10.1f}MB "
+              f"{list_time:>9.2f}s {list_peak / 2**20:>8.1f}MB")
+
+    mongo.get_client().drop_database(BENCH_DB_NAME)
+
+
+if __name__ == "__main__":
+    main()
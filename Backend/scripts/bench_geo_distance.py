@@ -0,0 +1,82 @@
+"""
+Benchmark the vectorized distance kernels against a scalar haversine loop.
+
+Usage (from Backend/):
+    python scripts/bench_geo_distance.py [--origins 100] [--k 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.geo_helpers import haversine_km, rank_nearest  # noqa: E402
+
+
+SHELTER_COUNTS = (1_000, 10_000, 100_000)
+
+
+def scalar_rank(origin_lat, origin_lon, lats, lons, k):
+    """
+    Pure-Python baseline: one haversine call per shelter, then sort
+    """
+
+    distances = [
+        (haversine_km(origin_lat, origin_lon, lat, lon), index)
+        for index, (lat, lon) in enumerate(zip(lats, lons))
+    ]
+    distances.sort()
+
+    return distances[:k]
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--origins", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    print(f"{'shelters':>10} {'scalar/origin':>14} {'numpy/origin':>13} "
+          f"{'numpy batch/origin':>19} {'speedup':>8}")
+
+    for count in SHELTER_COUNTS:
+        lats = rng.uniform(8.0, 35.0, count)
+        lons = rng.uniform(68.0, 97.0, count)
+        origin_lats = rng.uniform(8.0, 35.0, args.origins)
+        origin_lons = rng.uniform(68.0, 97.0, args.origins)
+
+        lat_list = lats.tolist()
+        lon_list = lons.tolist()
+
+        # Scalar loop is slow; a few origins are enough for a stable mean
+        scalar_origins = max(1, min(args.origins, 200_000 // count))
+        scalar = sum(
+            timed(scalar_rank, origin_lats[i], origin_lons[i], lat_list, lon_list, args.k)
+            for i in range(scalar_origins)
+        ) / scalar_origins
+
+        single = sum(
+            timed(rank_nearest, origin_lats[i], origin_lons[i], lats, lons, args.k)
+            for i in range(args.origins)
+        ) / args.origins
+
+        batch = timed(rank_nearest, origin_lats, origin_lons, lats, lons, args.k) / args.origins
+
+        print(f"{count:>10} {scalar * 1e3:>12.3f}ms {single * 1e3:>11.3f}ms "
+              f"{batch * 1e3:>17.3f}ms {scalar / batch:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
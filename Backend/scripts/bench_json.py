@@ -0,0 +1,114 @@
+"""
+Benchmark JSON serialization of large shelter list responses:
+the old path (str(_id) loop + Flask's default provider) against
+MongoJSONProvider on the raw documents.
+
+Usage (from Backend/):
+    python scripts/bench_json.py [--shelters 10000] [--repeats 7]
+"""
+
+import argparse
+import copy
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.geo_helpers import make_point  # noqa: E402
+from utils.response import MongoJSONProvider, orjson  # noqa: E402
+
+
+def make_shelters(count, rng):
+    now = datetime.utcnow()
+
+    return [
+        {
+            "_id": ObjectId(),
+            "ngo_id": str(ObjectId()),
+            "name": f"Shelter {i}",
+            "address": f"{i} Relief Road",
+            "location": make_point(rng.uniform(8.0, 35.0), rng.uniform(68.0, 97.0)),
+            "total_beds": 40,
+            "available_beds": rng.randint(0, 40),
+            "emergency_mode": rng.random() < 0.2,
+            "gender": "all",
+            "pet_friendly": False,
+            "accessibility": True,
+            "is_24_hour": True,
+            "version": rng.randint(0, 500),
+            "created_at": now - timedelta(days=rng.randint(0, 900)),
+            "updated_at": now - timedelta(seconds=rng.randint(0, 86400))
+        }
+        for i in range(count)
+    ]
+
+
+def old_path(app, shelters):
+    for shelter in shelters:
+        shelter["_id"] = str(shelter["_id"])
+
+    return app.json.response({"shelters": shelters}).get_data()
+
+
+def new_path(app, shelters):
+    return app.json.response({"shelters": shelters}).get_data()
+
+
+def measure(app, fn, shelters, repeats):
+    timings = []
+    body = b""
+
+    for _ in range(repeats):
+        # Fresh documents each run, as if just read from the driver
+        documents = copy.deepcopy(shelters)
+
+        start = time.perf_counter()
+        body = fn(app, documents)
+        timings.append(time.perf_counter() - start)
+
+    return timings, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shelters", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=7)
+    args = parser.parse_args()
+
+    shelters = make_shelters(args.shelters, random.Random(9))
+
+    old_app = Flask("bench_old")
+    old_app.json = DefaultJSONProvider(old_app)
+
+    new_app = Flask("bench_new")
+    new_app.json = MongoJSONProvider(new_app)
+
+    print(f"{args.shelters} shelters, {args.repeats} runs, orjson {'on' if orjson else 'off'}")
+    print(f"{'path':>34} {'median':>9} {'min':>9} {'bytes':>10}")
+
+    results = {}
+
+    for name, app, fn in (
+        ("str(_id) loop + default provider", old_app, old_path),
+        ("MongoJSONProvider", new_app, new_path)
+    ):
+        with app.app_context():
+            timings, size = measure(app, fn, shelters, args.repeats)
+
+        results[name] = statistics.median(timings)
+        print(f"{name:>34} {results[name] * 1e3:>7.1f}ms {min(timings) * 1e3:>7.1f}ms {size:>10}")
+
+    old, new = results.values()
+    print(f"speedup: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Per-request cost of authenticating an NGO (jwt_required_ngo).
+
+before  token with identity only: signature check + principal lookup
+        - "cold": principal cache empty, one MongoDB read per request
+        - "warm": principal served from the in-process cache
+after   token with name/role claims: signature check + in-memory
+        revocation denylist, no database read
+
+MongoDB is mongomock here, so "cold" understates a real round trip.
+The number of database commands per request is reported as well.
+
+Usage (from Backend/):
+    python scripts/bench_jwt_verify.py [--requests 20000] [--revoked 1000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import g  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from app import create_app  # noqa: E402
+from config import TestConfig  # noqa: E402
+from db import mongo  # noqa: E402
+from middleware.auth_middleware import jwt_required_ngo  # noqa: E402
+from services import revocation_service  # noqa: E402
+from services.ngo_service import create_ngo, principal_cache  # noqa: E402
+from utils.jwt_handler import create_ngo_token  # noqa: E402
+
+
+class CountingCollection:
+    """
+    Wraps a collection and counts find/find_one calls
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.reads = 0
+
+    def find_one(self, *args, **kwargs):
+        self.reads += 1
+        return self._collection.find_one(*args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        self.reads += 1
+        return self._collection.find(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+@jwt_required_ngo
+def protected():
+    return g.ngo["id"]
+
+
+def measure(app, token, requests, before_each=None):
+    headers = {"Authorization": f"Bearer {token}"}
+    elapsed = 0.0
+
+    for _ in range(requests):
+        if before_each:
+            before_each()
+
+        with app.test_request_context("/", headers=headers):
+            started = time.perf_counter()
+            result = protected()
+            elapsed += time.perf_counter() - started
+
+        assert isinstance(result, str), result
+
+    return round(elapsed / requests * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--revoked", type=int, default=1000, help="denylist entries to load first")
+    args = parser.parse_args()
+
+    app = create_app(type("BenchConfig", (TestConfig,), {"METRICS_ENABLED": False}))
+
+    ngos = CountingCollection(mongo.ngos())
+    revoked = CountingCollection(mongo.revoked_tokens())
+    mongo.ngos = lambda: ngos
+    mongo.revoked_tokens = lambda: revoked
+
+    report = {"requests": args.requests, "denylist_entries": args.revoked}
+
+    with app.app_context():
+        ngo_id = create_ngo({"ngo_name": "Bench NGO", "email": "bench@example.org", "phone": "9000000000"})
+
+        for _ in range(args.revoked):
+            revocation_service.revoke_token(uuid.uuid4().hex, time.time() + 600)
+
+        legacy_token = create_access_token(identity=ngo_id)
+        claims_token = create_ngo_token(ngo_id, "Bench NGO")
+
+        variants = [
+            ("before_cold_us", legacy_token, principal_cache.clear),
+            ("before_warm_us", legacy_token, None),
+            ("after_us", claims_token, None)
+        ]
+
+        for name, token, before_each in variants:
+            ngos.reads = revoked.reads = 0
+            report[name] = measure(app, token, args.requests, before_each)
+            report[name.replace("_us", "_db_reads_per_request")] = round((ngos.reads + revoked.reads) / args.requests, 4)
+
+    report["speedup_vs_cold"] = round(report["before_cold_us"] / report["after_us"], 2)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Login throughput with the configured argon2 costs.
+
+1. raw argon2 verify, inline on one thread
+2. verify through PasswordPool with 1..N worker threads (per-core
+   scaling; argon2-cffi releases the GIL while hashing)
+3. POST /auth/login end to end (mongomock), from many client threads,
+   counting 503s from pool backpressure
+
+Usage (from Backend/):
+    python scripts/bench_login.py [--seconds 5] [--clients 32] \\
+        [--time-cost 2] [--memory-kib 19456] [--max-pending 64]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from argon2 import PasswordHasher  # noqa: E402
+
+from app import create_app  # noqa: E402
+from config import TestConfig  # noqa: E402
+from db.indexes import ensure_indexes  # noqa: E402
+from utils.password import PasswordPool  # noqa: E402
+
+
+PASSWORD = "shift-change-2024"
+
+
+def run_for(seconds, clients, call):
+    """
+    Call `call()` from `clients` threads for `seconds`.
+    Returns (completed, rejected, sorted latencies in ms, elapsed).
+    """
+
+    latencies = []
+    rejected = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        local, busy = [], 0
+
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+
+            if call():
+                local.append((time.perf_counter() - started) * 1000)
+            else:
+                busy += 1
+
+        with lock:
+            latencies.extend(local)
+            rejected[0] += busy
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+
+    return len(latencies), rejected[0], latencies, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    return round(values[min(len(values) - 1, int(fraction * len(values)))], 2) if values else None
+
+
+def bench_inline(hasher, password_hash, seconds):
+    count, _, latencies, elapsed = run_for(seconds, 1, lambda: hasher.verify(password_hash, PASSWORD))
+    return {"verifies_per_s": round(count / elapsed, 1), "p50_ms": percentile(latencies, 0.5)}
+
+
+def bench_pool(hasher, password_hash, workers, clients, seconds):
+    pool = PasswordPool(hasher, workers=workers, max_pending=clients)
+
+    count, _, latencies, elapsed = run_for(seconds, clients, lambda: pool.submit(hasher.verify, password_hash, PASSWORD))
+    pool.shutdown()
+
+    return {
+        "workers": workers,
+        "verifies_per_s": round(count / elapsed, 1),
+        "per_worker": round(count / elapsed / workers, 1),
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99)
+    }
+
+
+def bench_login(args):
+    config = type("BenchConfig", (TestConfig,), {
+        "ARGON2_TIME_COST": args.time_cost,
+        "ARGON2_MEMORY_COST_KIB": args.memory_kib,
+        "PASSWORD_POOL_MAX_PENDING": args.max_pending
+    })
+    app = create_app(config)
+
+    with app.app_context():
+        ensure_indexes()
+
+    client = app.test_client()
+    client.post("/auth/register", json={
+        "ngo_name": "Bench NGO",
+        "email": "bench@example.org",
+        "password": PASSWORD,
+        "phone": "9000000000"
+    })
+
+    def login():
+        response = app.test_client().post("/auth/login", json={"email": "bench@example.org", "password": PASSWORD})
+
+        if response.status_code == 503:
+            # A real client backs off (Retry-After); don't spin on the CPU
+            time.sleep(0.05)
+            return False
+
+        assert response.status_code == 200, response.get_json()
+        return True
+
+    count, rejected, latencies, elapsed = run_for(args.seconds, args.clients, login)
+
+    return {
+        "clients": args.clients,
+        "logins_per_s": round(count / elapsed, 1),
+        "rejected_503": rejected,
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--time-cost", type=int, default=2)
+    parser.add_argument("--memory-kib", type=int, default=19456)
+    parser.add_argument("--max-pending", type=int, default=64)
+    args = parser.parse_args()
+
+    hasher = PasswordHasher(time_cost=args.time_cost, memory_cost=args.memory_kib, parallelism=1)
+    password_hash = hasher.hash(PASSWORD)
+    cores = os.cpu_count() or 1
+
+    report = {
+        "cores": cores,
+        "argon2": {"time_cost": args.time_cost, "memory_kib": args.memory_kib, "parallelism": 1},
+        "inline": bench_inline(hasher, password_hash, args.seconds),
+        "pool": [
+            bench_pool(hasher, password_hash, workers, args.clients, args.seconds)
+            for workers in sorted({1, max(1, cores // 2), cores})
+        ],
+        "login": bench_login(args)
+    }
+
+    report["login"]["per_core"] = round(report["login"]["logins_per_s"] / cores, 1)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Per-request cost of the metrics subsystem.
+
+The request hooks and one CommandListener event pair are timed
+directly (mongomock emits no command events); their sum for a request
+with three MongoDB commands is checked against the budget of 50 us.
+End-to-end timings with METRICS_ENABLED off and on are reported too,
+but test-client noise is of the same order as the overhead.
+
+Usage (from Backend/):
+    python scripts/bench_metrics_overhead.py [--requests 2000] [--multiprocess]
+
+--multiprocess writes metric values to a temporary
+PROMETHEUS_MULTIPROC_DIR, as under gunicorn.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BUDGET_US = 50
+COMMANDS_PER_REQUEST = 3
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--multiprocess", action="store_true")
+    return parser.parse_args()
+
+
+def build_app(enabled):
+    from flask_jwt_extended import create_access_token
+
+    from app import create_app
+    from config import TestConfig
+    from services import ngo_service, shelter_service
+
+    config = type("BenchConfig", (TestConfig,), {"METRICS_ENABLED": enabled})
+    app = create_app(config)
+
+    with app.app_context():
+        ngo_id = ngo_service.create_ngo({"ngo_name": "Bench NGO", "email": f"bench-{enabled}@example.org"})
+        shelter_id = shelter_service.create_shelter(ngo_id, {
+            "name": "Bench shelter",
+            "total_beds": 20,
+            "available_beds": 10,
+            "latitude": 19.07,
+            "longitude": 72.87
+        })
+        headers = {"Authorization": f"Bearer {create_access_token(identity=ngo_id)}"}
+
+    return app, (
+        ("public detail (cached)", f"/public/shelters/{shelter_id}", {}),
+        ("ngo shelter detail (JWT)", f"/shelters/{shelter_id}", headers)
+    )
+
+
+def measure_requests(requests, rounds=7):
+    """
+    End to end through the test client. Rounds alternate between the
+    two apps so drift (GC, CPU frequency) hits both; best round wins.
+    """
+
+    from services import metrics_service
+
+    apps = {enabled: build_app(enabled) for enabled in (False, True)}
+    best = {}
+
+    for _ in range(rounds):
+        for enabled, (app, cases) in apps.items():
+            # Both apps share the module-level switch used by the cache counters
+            metrics_service._enabled = enabled
+            client = app.test_client()
+
+            for name, path, headers in cases:
+                client.get(path, headers=headers)
+                started = time.perf_counter()
+
+                for _ in range(requests):
+                    client.get(path, headers=headers)
+
+                elapsed = (time.perf_counter() - started) / requests * 1e6
+                key = (name, enabled)
+                best[key] = min(best.get(key, elapsed), elapsed)
+
+    return {
+        name: {
+            "metrics_off_us": round(best[(name, False)], 1),
+            "metrics_on_us": round(best[(name, True)], 1),
+            "difference_us": round(best[(name, True)] - best[(name, False)], 1)
+        }
+        for name, _, _ in apps[True][1]
+    }
+
+
+def measure_hooks(iterations):
+    """
+    The request hooks alone: before_request + after_request with
+    a stage recorded, inside a request context
+    """
+
+    from flask import Flask
+
+    from services import metrics_service
+
+    app = Flask(__name__)
+    app.add_url_rule("/shelters/<shelter_id>", "detail", lambda shelter_id: "")
+    response = app.response_class("")
+
+    def hooks():
+        metrics_service._start_request()
+        metrics_service.record_stage("jwt_verify", 0.0001)
+        metrics_service._finish_request(response)
+
+    with app.test_request_context("/shelters/abc"):
+        return min(timeit.repeat(hooks, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def measure_listener(iterations):
+    from services.metrics_service import MongoCommandListener
+
+    listener = MongoCommandListener()
+    started = SimpleNamespace(command_name="find", command={"find": "shelters"}, connection_id=("h", 1), request_id=1)
+    succeeded = SimpleNamespace(command_name="find", connection_id=("h", 1), request_id=1, duration_micros=800)
+
+    def event_pair():
+        listener.started(started)
+        listener.succeeded(succeeded)
+
+    return min(timeit.repeat(event_pair, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def main():
+    args = parse_args()
+
+    if args.multiprocess:
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="bench-metrics-")
+
+    hooks_us = measure_hooks(50_000)
+    command_us = measure_listener(100_000)
+
+    # A typical authenticated write: hooks + 3 MongoDB commands
+    per_request_us = hooks_us + COMMANDS_PER_REQUEST * command_us
+
+    report = {
+        "multiprocess": args.multiprocess,
+        "budget_us": BUDGET_US,
+        "request_hooks_us": round(hooks_us, 2),
+        "mongo_command_event_us": round(command_us, 2),
+        "estimated_overhead_us": round(per_request_us, 1),
+        "within_budget": per_request_us <= BUDGET_US,
+        "end_to_end": measure_requests(args.requests)
+    }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
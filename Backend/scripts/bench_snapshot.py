@@ -0,0 +1,127 @@
+"""
+Offline snapshot vs plain JSON at a given dataset size.
+
+json      what paging through list_all_shelters (card view) returns,
+          serialized with the app's JSON provider - what a client
+          would download today. Read in one cursor: keyset pages are
+          a linear scan each under mongomock.
+snapshot  snapshot_service.build_snapshot (msgpack columns, quantized
+          coordinates, string dictionaries)
+
+Reports read time (MongoDB, which dominates under mongomock), encode
+time, raw and gzip sizes, decode time, and the size of a delta after
+1% of shelters change.
+
+Usage (from Backend/):
+    python scripts/bench_snapshot.py [--uri mongomock://] [--shelters 100000]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from config import TestConfig  # noqa: E402
+from db import mongo  # noqa: E402
+from db.seed import seed  # noqa: E402
+from services import shelter_service, snapshot_service  # noqa: E402
+
+
+BENCH_DB_NAME = "shelter_connect_bench_snapshot"
+
+
+def load_json_rows():
+    """
+    The concatenated pages of list_all_shelters(view="card")
+    """
+
+    return list(
+        mongo.shelters_for_search()
+        .find({}, shelter_service.SHELTER_VIEWS["card"])
+        .sort("_id", 1)
+    )
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+
+    return result, round(time.perf_counter() - started, 3)
+
+
+def sizes(data):
+    return {"bytes": len(data), "gzip_bytes": len(gzip.compress(data, 6))}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongomock://")
+    parser.add_argument("--shelters", type=int, default=100_000)
+    parser.add_argument("--changed", type=float, default=0.01, help="fraction changed before the delta")
+    args = parser.parse_args()
+
+    app = create_app(type("BenchConfig", (TestConfig,), {"METRICS_ENABLED": False}))
+    mongo.configure(MONGO_URI=args.uri, MONGO_DB_NAME=BENCH_DB_NAME)
+
+    report = {"shelters": args.shelters}
+
+    with app.app_context(), tempfile.TemporaryDirectory() as directory:
+        seed(args.shelters, requests=0, drop=True)
+
+        json_rows, json_read_s = timed(load_json_rows)
+        json_data, json_encode_s = timed(lambda: app.json.dumps({"shelters": json_rows}).encode())
+        del json_rows
+
+        snapshot_rows, snapshot_read_s = timed(lambda: list(snapshot_service.iter_shelters()))
+        built = snapshot_service.write_snapshot(snapshot_rows, directory)
+        del snapshot_rows
+
+        with open(built["path"], "rb") as f:
+            snapshot_data = f.read()
+
+        _, json_decode_s = timed(lambda: json.loads(json_data))
+        _, snapshot_decode_s = timed(lambda: snapshot_service.decode_shelters(snapshot_data))
+
+        report["json"] = {
+            **sizes(json_data),
+            "read_s": json_read_s,
+            "encode_s": json_encode_s,
+            "decode_s": json_decode_s
+        }
+        report["snapshot"] = {
+            **sizes(snapshot_data),
+            "read_s": snapshot_read_s,
+            "encode_s": built["seconds"],
+            "decode_s": snapshot_decode_s
+        }
+        report["size_ratio"] = round(len(json_data) / len(snapshot_data), 2)
+        report["gzip_size_ratio"] = round(report["json"]["gzip_bytes"] / report["snapshot"]["gzip_bytes"], 2)
+
+        # Touch a fraction of shelters, then fetch what changed
+        time.sleep(0.002)
+        ids = [shelter["_id"] for shelter in mongo.shelters().find({}, {"_id": 1})]
+        changed = random.Random(7).sample(ids, max(1, int(len(ids) * args.changed)))
+
+        mongo.shelters().update_many(
+            {"_id": {"$in": changed}},
+            {"$set": {"available_beds": 0, "updated_at": datetime.utcnow()}}
+        )
+
+        delta, delta_s = timed(lambda: snapshot_service.build_delta(built["version"]))
+        report["delta"] = {"changed": len(changed), **sizes(delta), "build_s": delta_s}
+
+    mongo.get_client().drop_database(BENCH_DB_NAME)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
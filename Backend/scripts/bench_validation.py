@@ -0,0 +1,96 @@
+"""
+Per-request validation overhead: full marshmallow load against the
+precompiled fast path, per schema, plus the cost of the route decorator
+on an /update-beds request body.
+
+Usage (from Backend/):
+    python scripts/bench_validation.py [--iterations 50000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, g, request  # noqa: E402
+
+from schemas.shelter_schema import (  # noqa: E402
+    BedReservationSchema,
+    BedUpdateSchema,
+    BulkBedUpdateSchema,
+    EmergencyToggleSchema,
+    UpdateShelterSchema
+)
+from utils.validators import compile_fast_path, validate_body  # noqa: E402
+
+
+CASES = (
+    ("BedUpdateSchema", BedUpdateSchema(), {"available_beds": 12}),
+    ("EmergencyToggleSchema", EmergencyToggleSchema(), {"status": True}),
+    ("BedReservationSchema", BedReservationSchema(), {"count": 2}),
+    ("UpdateShelterSchema", UpdateShelterSchema(), {"name": "Harbor Haven", "city": "Mumbai", "total_beds": 80}),
+    ("BulkBedUpdateSchema x50", BulkBedUpdateSchema(), {
+        "updates": [{"shelter_id": f"{i:024x}", "available_beds": i} for i in range(50)]
+    })
+)
+
+
+def per_call_us(fn, iterations):
+    return min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def request_overhead(iterations):
+    """
+    Cost of the validate_body wrapper on a bed update request (body
+    parsing included, no database), against reading the body raw
+    """
+
+    app = Flask(__name__)
+    payload = {"available_beds": 12}
+
+    variants = (
+        ("raw get_json()", lambda: request.get_json()),
+        ("validate_body, fast path", validate_body(BedUpdateSchema, fast=True)(lambda: g.data)),
+        ("validate_body, marshmallow", validate_body(BedUpdateSchema, fast=False)(lambda: g.data))
+    )
+
+    results = {}
+
+    for label, view in variants:
+        def call():
+            with app.test_request_context(method="PATCH", json=payload):
+                view()
+
+        results[label] = per_call_us(call, iterations)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50_000)
+    parser.add_argument("--route-iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'schema':>24} {'marshmallow':>12} {'fast path':>10} {'speedup':>8}")
+
+    for name, schema, payload in CASES:
+        fast_load = compile_fast_path(schema)
+
+        assert fast_load(payload) == schema.load(payload)
+
+        slow = per_call_us(lambda: schema.load(payload), args.iterations)
+        fast = per_call_us(lambda: fast_load(payload), args.iterations)
+
+        print(f"{name:>24} {slow:>10.2f}us {fast:>8.2f}us {slow / fast:>7.1f}x")
+
+    print("\nPATCH /update-beds body handling, per request (request context included):")
+
+    for label, micros in request_overhead(args.route_iterations).items():
+        print(f"{label:>28} {micros:>8.2f}us")
+
+
+if __name__ == "__main__":
+    main()
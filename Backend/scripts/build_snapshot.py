@@ -0,0 +1,46 @@
+"""
+Compile every shelter into an offline snapshot file (msgpack columns,
+see services/snapshot_service.py) served at /public/shelters/snapshot.
+Run it from cron (e.g. every few minutes); clients catch up between
+builds with /public/shelters/snapshot/delta.
+
+Usage (from Backend/):
+    python scripts/build_snapshot.py [--uri mongodb://...] [--db name] [--out-dir snapshots] [--keep 3]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from db import mongo  # noqa: E402
+from services import snapshot_service  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", help="MongoDB URI (defaults to MONGO_URI)")
+    parser.add_argument("--db", help="Database name (defaults to MONGO_DB_NAME)")
+    parser.add_argument("--out-dir", default=Config.SNAPSHOT_DIR)
+    parser.add_argument("--keep", type=int, default=Config.SNAPSHOT_KEEP)
+    args = parser.parse_args()
+
+    settings = {}
+
+    if args.uri:
+        settings["MONGO_URI"] = args.uri
+
+    if args.db:
+        settings["MONGO_DB_NAME"] = args.db
+
+    if settings:
+        mongo.configure(**settings)
+
+    print(json.dumps(snapshot_service.build_snapshot(args.out_dir, args.keep), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Queue a background job for worker.py, or show queue counts.
+
+Usage (from Backend/):
+    python scripts/enqueue_job.py build_snapshot
+    python scripts/enqueue_job.py export_shelters '{"path": "/tmp/shelters.ndjson"}'
+    python scripts/enqueue_job.py --status
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import mongo  # noqa: E402
+from services import job_service  # noqa: E402
+from services.job_handlers import HANDLERS  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("job_type", nargs="?", choices=sorted(HANDLERS))
+    parser.add_argument("payload", nargs="?", default="{}", help="JSON payload")
+    parser.add_argument("--max-attempts", type=int)
+    parser.add_argument("--status", action="store_true", help="print {job_type: {status: count}}")
+    parser.add_argument("--uri", help="MongoDB URI (defaults to MONGO_URI)")
+    parser.add_argument("--db", help="Database name (defaults to MONGO_DB_NAME)")
+    args = parser.parse_args()
+
+    settings = {}
+
+    if args.uri:
+        settings["MONGO_URI"] = args.uri
+
+    if args.db:
+        settings["MONGO_DB_NAME"] = args.db
+
+    if settings:
+        mongo.configure(**settings)
+
+    if args.status:
+        print(json.dumps(job_service.queue_counts(), indent=2))
+        return 0
+
+    if not args.job_type:
+        parser.error("job_type is required")
+
+    job_id = job_service.enqueue(args.job_type, json.loads(args.payload), max_attempts=args.max_attempts)
+
+    print(json.dumps({"job_id": job_id, "type": args.job_type}))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
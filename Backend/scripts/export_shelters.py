@@ -0,0 +1,59 @@
+"""
+Export shelters to a file (or stdout) without loading them all into memory.
+
+Usage (from Backend/):
+    python scripts/export_shelters.py --out shelters.ndjson
+    python scripts/export_shelters.py --format json --updated-since 2024-01-15T00:00:00Z
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import mongo  # noqa: E402
+from services.export_service import (  # noqa: E402
+    EXPORT_BATCH_SIZE,
+    EXPORT_FORMATS,
+    iter_export_chunks,
+    parse_updated_since
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", help="MongoDB URI (defaults to MONGO_URI)")
+    parser.add_argument("--db", help="Database name (defaults to MONGO_DB_NAME)")
+    parser.add_argument("--out", help="Output file (defaults to stdout)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--updated-since", help="Only shelters changed after this ISO-8601 time")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    settings = {}
+
+    if args.uri:
+        settings["MONGO_URI"] = args.uri
+
+    if args.db:
+        settings["MONGO_DB_NAME"] = args.db
+
+    if settings:
+        mongo.configure(**settings)
+
+    updated_since = parse_updated_since(args.updated_since)
+    chunks = iter_export_chunks(updated_since, args.format, args.batch_size)
+
+    out = open(args.out, "w") if args.out else sys.stdout
+
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if args.out:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Load test for the Flask API with mixed read/write traffic on a seeded
+synthetic dataset (db/seed.py).
+
+Drives the app in-process (one test client per thread), so the numbers
+cover routing, auth, validation, services and MongoDB, not the HTTP
+server. Prints a JSON report per endpoint: throughput, p50/p95/p99
+latency, status codes and MongoDB commands per request.
+
+Usage (from Backend/):
+    python scripts/load_test_api.py --profile surge --shelters 100000 \\
+        --uri mongodb://localhost:27017 --output surge.json
+    python scripts/load_test_api.py --uri mongomock:// --shelters 10000
+
+    # CI: fail when p95 or throughput regress more than 20%
+    python scripts/load_test_api.py ... --compare baseline.json --tolerance 0.2
+
+mongomock scans collections linearly and emits no command events, so
+on mongomock keep --shelters small and mongo_ops_per_request is null.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from pymongo import monitoring  # noqa: E402
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from db import mongo  # noqa: E402
+from db.seed import CITIES, seed  # noqa: E402
+
+
+# Share of requests per endpoint
+PROFILES = {
+    # Mostly searches, the odd bed update from shelter staff
+    "normal": (
+        ("public_nearby", 0.45),
+        ("public_detail", 0.20),
+        ("my_shelters", 0.10),
+        ("update_beds", 0.10),
+        ("ngo_dashboard", 0.05),
+        ("emergency_request", 0.05),
+        ("request_status", 0.05)
+    ),
+    # Disaster: help requests and bed churn spike, every status page is polled
+    "surge": (
+        ("public_nearby", 0.30),
+        ("public_detail", 0.08),
+        ("my_shelters", 0.04),
+        ("update_beds", 0.18),
+        ("reserve_beds", 0.08),
+        ("toggle_emergency", 0.02),
+        ("ngo_dashboard", 0.02),
+        ("emergency_request", 0.18),
+        ("request_status", 0.10)
+    )
+}
+
+SAMPLE_SIZE = 2000
+
+
+# ---------------------------------------------------
+# MONGODB COMMANDS PER REQUEST
+# ---------------------------------------------------
+class CommandCounter(monitoring.CommandListener):
+    """
+    Counts commands started by the current thread
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def started(self, event):
+        self.local.count = getattr(self.local, "count", 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def take(self):
+        count = getattr(self.local, "count", 0)
+        self.local.count = 0
+        return count
+
+
+# ---------------------------------------------------
+# REQUEST MIX
+# ---------------------------------------------------
+def _point(rng):
+    city = rng.choice(CITIES)
+    return city[3] + rng.uniform(-0.2, 0.2), city[4] + rng.uniform(-0.2, 0.2)
+
+
+def build_context(app):
+    """
+    Sample existing shelters / requests and issue tokens for their NGOs
+    """
+
+    shelters = list(mongo.shelters().aggregate([
+        {"$sample": {"size": SAMPLE_SIZE}},
+        {"$project": {"ngo_id": 1, "total_beds": 1}}
+    ]))
+    requests = list(mongo.emergency_requests().aggregate([
+        {"$sample": {"size": SAMPLE_SIZE}},
+        {"$project": {"_id": 1}}
+    ]))
+
+    with app.app_context():
+        tokens = {
+            ngo_id: {"Authorization": f"Bearer {create_access_token(identity=ngo_id)}"}
+            for ngo_id in {shelter["ngo_id"] for shelter in shelters}
+        }
+
+    return {
+        "shelters": [(str(shelter["_id"]), shelter["ngo_id"], shelter.get("total_beds", 0)) for shelter in shelters],
+        "request_ids": [str(request["_id"]) for request in requests],
+        "tokens": tokens
+    }
+
+
+def make_request(kind, context, rng):
+    """
+    (method, path, headers, json body) for one request of `kind`
+    """
+
+    shelter_id, ngo_id, total_beds = rng.choice(context["shelters"])
+    headers = context["tokens"][ngo_id]
+
+    if kind == "public_nearby":
+        lat, lng = _point(rng)
+        flags = rng.choice(("", "&available_only=1", "&emergency_mode=1&available_only=1"))
+        return "GET", f"/public/shelters/nearby?lat={lat:.4f}&lng={lng:.4f}&k=10{flags}", None, None
+
+    if kind == "public_detail":
+        return "GET", f"/public/shelters/{shelter_id}", None, None
+
+    if kind == "my_shelters":
+        return "GET", "/shelters/my-shelters?limit=20", headers, None
+
+    if kind == "update_beds":
+        return "PATCH", f"/shelters/update-beds/{shelter_id}", headers, {"available_beds": rng.randint(0, total_beds)}
+
+    if kind == "reserve_beds":
+        return "POST", f"/shelters/reserve-beds/{shelter_id}", headers, {"count": rng.choice((1, 1, 2, 4))}
+
+    if kind == "toggle_emergency":
+        return "PATCH", f"/shelters/toggle-emergency/{shelter_id}", headers, {"status": rng.random() < 0.7}
+
+    if kind == "ngo_dashboard":
+        return "GET", "/ngo/dashboard", headers, None
+
+    if kind == "emergency_request":
+        lat, lng = _point(rng)
+        return "POST", "/emergency/request", None, {
+            "user_location_lat": lat,
+            "user_location_lng": lng,
+            "priority": rng.choices(("critical", "high", "normal"), (0.15, 0.35, 0.5))[0],
+            "people": rng.choice((1, 1, 2, 3, 4))
+        }
+
+    if kind == "request_status":
+        return "GET", f"/emergency/request/{rng.choice(context['request_ids'])}", None, None
+
+    raise ValueError(f"unknown request kind {kind!r}")
+
+
+# ---------------------------------------------------
+# RUN
+# ---------------------------------------------------
+def run_load(app, context, profile, concurrency, seconds, counter, seed_value):
+    kinds, weights = zip(*PROFILES[profile])
+    results = {kind: {"latencies": [], "statuses": {}, "ops": 0, "errors": 0} for kind in kinds}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(index):
+        rng = random.Random(seed_value * 1000 + index)
+        client = app.test_client()
+        local = {kind: {"latencies": [], "statuses": {}, "ops": 0, "errors": 0} for kind in kinds}
+
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            method, path, headers, body = make_request(kind, context, rng)
+            stats = local[kind]
+
+            counter.take()
+            started = time.perf_counter()
+
+            try:
+                response = client.open(path, method=method, headers=headers, json=body)
+            except Exception:
+                stats["errors"] += 1
+                continue
+
+            stats["latencies"].append((time.perf_counter() - started) * 1000)
+            stats["statuses"][response.status_code] = stats["statuses"].get(response.status_code, 0) + 1
+            stats["ops"] += counter.take()
+
+        with lock:
+            for kind, stats in local.items():
+                merged = results[kind]
+                merged["latencies"].extend(stats["latencies"])
+                merged["ops"] += stats["ops"]
+                merged["errors"] += stats["errors"]
+
+                for status, count in stats["statuses"].items():
+                    merged["statuses"][status] = merged["statuses"].get(status, 0) + count
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return results, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+
+    return round(values[min(len(values) - 1, int(fraction * len(values)))], 2)
+
+
+def summarize(results, elapsed, count_ops):
+    endpoints = {}
+    everything = []
+
+    for kind, stats in results.items():
+        latencies = sorted(stats["latencies"])
+        everything.extend(latencies)
+
+        endpoints[kind] = {
+            "requests": len(latencies),
+            "errors": stats["errors"],
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "latency_ms": {
+                "p50": percentile(latencies, 0.50),
+                "p95": percentile(latencies, 0.95),
+                "p99": percentile(latencies, 0.99)
+            },
+            "statuses": {str(status): count for status, count in sorted(stats["statuses"].items())},
+            "mongo_ops_per_request": round(stats["ops"] / len(latencies), 2) if count_ops and latencies else None
+        }
+
+    everything.sort()
+
+    return {
+        "requests": len(everything),
+        "throughput_rps": round(len(everything) / elapsed, 1),
+        "latency_ms": {
+            "p50": percentile(everything, 0.50),
+            "p95": percentile(everything, 0.95),
+            "p99": percentile(everything, 0.99)
+        }
+    }, endpoints
+
+
+# ---------------------------------------------------
+# CI COMPARISON
+# ---------------------------------------------------
+def compare(report, baseline, tolerance):
+    """
+    Endpoints whose p95 rose, or throughput fell, by more than tolerance
+    """
+
+    regressions = []
+
+    for kind, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(kind)
+
+        if not previous or not previous["requests"] or not current["requests"]:
+            continue
+
+        old_p95, new_p95 = previous["latency_ms"]["p95"], current["latency_ms"]["p95"]
+
+        if old_p95 and new_p95 > old_p95 * (1 + tolerance):
+            regressions.append({"endpoint": kind, "metric": "p95_ms", "baseline": old_p95, "current": new_p95})
+
+        old_rps, new_rps = previous["throughput_rps"], current["throughput_rps"]
+
+        if old_rps and new_rps < old_rps * (1 - tolerance):
+            regressions.append({"endpoint": kind, "metric": "throughput_rps", "baseline": old_rps, "current": new_rps})
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="normal")
+    parser.add_argument("--uri", default="mongomock://", help="MongoDB URI (mongomock:// for in-memory)")
+    parser.add_argument("--db", default="shelter_connect_loadtest")
+    parser.add_argument("--shelters", type=int, default=10_000, help="shelters to seed; 0 reuses existing data")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here as well")
+    parser.add_argument("--compare", help="baseline report; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    mongo.add_event_listener(counter)
+
+    config = type("LoadTestConfig", (Config,), {"MONGO_URI": args.uri, "MONGO_DB_NAME": args.db})
+    app = create_app(config)
+
+    dataset = None
+
+    if args.shelters:
+        dataset = seed(args.shelters, rng_seed=args.seed, drop=True)
+
+    context = build_context(app)
+
+    if not context["shelters"] or not context["request_ids"]:
+        sys.exit("no shelters / emergency requests to test against; seed with --shelters")
+
+    # Build the search index before the clock starts
+    app.test_client().get("/public/shelters/nearby?lat=19.07&lng=72.87")
+
+    results, elapsed = run_load(app, context, args.profile, args.concurrency, args.seconds, counter, args.seed)
+    count_ops = not args.uri.startswith("mongomock://")
+    total, endpoints = summarize(results, elapsed, count_ops)
+
+    report = {
+        "profile": args.profile,
+        "backend": "mongomock" if not count_ops else "mongod",
+        "dataset": dataset,
+        "concurrency": args.concurrency,
+        "seconds": round(elapsed, 2),
+        "total": total,
+        "endpoints": endpoints
+    }
+
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Offline load test for the per-process Mongo client in db/mongo.py.
+
+Forks worker processes the way gunicorn does and hammers the pool
+from many threads per worker. Reports per-worker throughput, pool
+wait timeouts and whether each child built its own client.
+
+Usage (from Backend/):
+    python scripts/load_test_mongo_pool.py --uri mongodb://localhost:27017 \
+        --workers 4 --threads 64 --pool-size 10 --seconds 10
+    python scripts/load_test_mongo_pool.py --uri mongomock://
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo.errors import PyMongoError  # noqa: E402
+
+from db import mongo  # noqa: E402
+
+
+def run_worker(args, parent_client, result_path):
+    collection = mongo.shelters()
+    own_client = mongo.get_client() is not parent_client
+
+    counts = {"ops": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+
+    def hammer():
+        ops = errors = 0
+
+        while time.monotonic() < deadline:
+            try:
+                collection.find_one({"ngo_id": "load-test"})
+                ops += 1
+            except PyMongoError:
+                errors += 1
+
+        with lock:
+            counts["ops"] += ops
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=hammer) for _ in range(args.threads)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    with open(result_path, "w") as handle:
+        json.dump({
+            "pid": os.getpid(),
+            "own_client": own_client,
+            "ops_per_sec": counts["ops"] / args.seconds,
+            "errors": counts["errors"]
+        }, handle)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", default="mongomock://")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--wait-timeout-ms", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    mongo.configure(
+        MONGO_URI=args.uri,
+        MONGO_MAX_POOL_SIZE=args.pool_size,
+        MONGO_WAIT_QUEUE_TIMEOUT_MS=args.wait_timeout_ms
+    )
+
+    # Touch the client in the parent, as a preloaded gunicorn master might
+    parent_client = mongo.get_client()
+
+    children = []
+
+    for index in range(args.workers):
+        result_path = f"/tmp/mongo_pool_worker_{os.getpid()}_{index}.json"
+        pid = os.fork()
+
+        if pid == 0:
+            run_worker(args, parent_client, result_path)
+            os._exit(0)
+
+        children.append((pid, result_path))
+
+    results = []
+
+    for pid, result_path in children:
+        os.waitpid(pid, 0)
+
+        with open(result_path) as handle:
+            results.append(json.load(handle))
+
+        os.remove(result_path)
+
+    print(json.dumps({
+        "fork_safe": all(r["own_client"] for r in results),
+        "total_ops_per_sec": sum(r["ops_per_sec"] for r in results),
+        "total_errors": sum(r["errors"] for r in results),
+        "workers": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
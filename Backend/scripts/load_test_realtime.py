@@ -0,0 +1,241 @@
+"""
+Open many concurrent bed-update SSE connections against a running
+server and report how many were actually established and held.
+
+Every connection is a real HTTP request to /public/shelters/stream;
+one counts as connected once its ": connected" frame arrives. Point it
+at the ASGI app, which serves the stream with one coroutine per
+connection:
+
+    uvicorn asgi:app --workers 1 --port 8001 --limit-concurrency 20000
+
+or at gunicorn (wsgi:app) to see where a worker class stops accepting
+streams. Both this process and the server need a file-descriptor limit
+above --connections (ulimit -n).
+
+Usage (from Backend/):
+    python scripts/load_test_realtime.py --url http://127.0.0.1:8001 \\
+        [--connections 10000] [--ramp 2000] [--hold 30] [--server-pid PID]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.realtime_service import TILE_PRECISION  # noqa: E402
+from utils.geo_helpers import geohash_encode  # noqa: E402
+
+
+CONNECT_TIMEOUT_SECONDS = 10
+
+
+def random_tile(rng):
+    # Metro-sized area so tiles are shared by many subscribers
+    return geohash_encode(rng.uniform(18.8, 19.4), rng.uniform(72.7, 73.2), TILE_PRECISION)
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def server_rss_mb(pid):
+    if pid is None:
+        return None
+
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return round(int(line.split()[1]) / 1024, 1)
+
+    return None
+
+
+# ---------------------------------------------------
+# ONE STREAM
+# ---------------------------------------------------
+class Stats:
+    def __init__(self):
+        self.connected = 0
+        self.open = 0
+        self.peak_open = 0
+        self.dropped = 0
+        self.events = 0
+        self.pings = 0
+        self.failures = {}
+        self.connect_ms = []
+
+    def fail(self, reason):
+        self.failures[reason] = self.failures.get(reason, 0) + 1
+
+
+async def hold_stream(host, port, path, stats, stop):
+    started = time.perf_counter()
+
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), CONNECT_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        stats.fail("connect timeout")
+        return
+    except OSError as e:
+        stats.fail(type(e).__name__)
+        return
+
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), CONNECT_TIMEOUT_SECONDS)
+        status = head.split(b" ", 2)[1].decode()
+
+        if status != "200":
+            stats.fail(f"HTTP {status}")
+            return
+
+        await asyncio.wait_for(reader.readuntil(b": connected"), CONNECT_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        stats.fail("no response")
+        writer.close()
+        return
+    except (OSError, asyncio.IncompleteReadError, IndexError) as e:
+        stats.fail(type(e).__name__)
+        writer.close()
+        return
+
+    stats.connect_ms.append((time.perf_counter() - started) * 1000)
+    stats.connected += 1
+    stats.open += 1
+    stats.peak_open = max(stats.peak_open, stats.open)
+
+    reading = asyncio.ensure_future(reader.read(65536))
+    stopping = asyncio.ensure_future(stop.wait())
+
+    try:
+        while True:
+            await asyncio.wait({reading, stopping}, return_when=asyncio.FIRST_COMPLETED)
+
+            if stopping.done():
+                break
+
+            chunk = reading.result()
+
+            if not chunk:
+                stats.dropped += 1
+                break
+
+            stats.events += chunk.count(b"event: ")
+            stats.pings += chunk.count(b": ping")
+
+            reading = asyncio.ensure_future(reader.read(65536))
+    except OSError:
+        stats.dropped += 1
+    finally:
+        reading.cancel()
+        stopping.cancel()
+        stats.open -= 1
+        writer.close()
+
+
+# ---------------------------------------------------
+# LOAD GENERATOR
+# ---------------------------------------------------
+async def run_load(base_url, connections, ramp, hold, server_pid):
+    url = urlsplit(base_url)
+    rng = random.Random(11)
+    stats = Stats()
+    stop = asyncio.Event()
+
+    rss_before = server_rss_mb(server_pid)
+    started = time.perf_counter()
+
+    tasks = []
+
+    for i in range(connections):
+        path = f"/public/shelters/stream?tiles={random_tile(rng)}"
+        tasks.append(asyncio.ensure_future(hold_stream(url.hostname, url.port or 80, path, stats, stop)))
+
+        # Pace the ramp so the accept backlog is not the thing measured
+        if ramp and (i + 1) % max(1, ramp // 10) == 0:
+            await asyncio.sleep(0.1)
+
+    # Let the last connections settle, then hold them all
+    while stats.connected + sum(stats.failures.values()) < connections:
+        if time.perf_counter() - started > connections / max(ramp, 1) + 2 * CONNECT_TIMEOUT_SECONDS:
+            break
+
+        await asyncio.sleep(0.1)
+
+    ramp_seconds = time.perf_counter() - started
+    rss_held = server_rss_mb(server_pid)
+
+    await asyncio.sleep(hold)
+
+    still_open = stats.open
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    stats.connect_ms.sort()
+
+    def percentile(fraction):
+        if not stats.connect_ms:
+            return None
+
+        return round(stats.connect_ms[min(len(stats.connect_ms) - 1, int(fraction * len(stats.connect_ms)))], 1)
+
+    report = {
+        "url": base_url,
+        "attempted": connections,
+        "connected": stats.connected,
+        "peak_open": stats.peak_open,
+        "open_after_hold": still_open,
+        "dropped_by_server": stats.dropped,
+        "failures": stats.failures,
+        "ramp_seconds": round(ramp_seconds, 1),
+        "hold_seconds": hold,
+        "connect_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99)},
+        "events_received": stats.events,
+        "heartbeats_received": stats.pings
+    }
+
+    if rss_before is not None and rss_held is not None:
+        report["server_rss_mb"] = {"before": rss_before, "held": rss_held}
+
+        if stats.peak_open:
+            report["server_kb_per_connection"] = round((rss_held - rss_before) * 1024 / stats.peak_open, 1)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8001")
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--ramp", type=int, default=2_000, help="new connections per second (0: all at once)")
+    parser.add_argument("--hold", type=float, default=30, help="seconds to hold every stream open")
+    parser.add_argument("--server-pid", type=int, help="server worker pid, to report its memory")
+    args = parser.parse_args()
+
+    fd_limit = raise_fd_limit(args.connections + 100)
+
+    if fd_limit < args.connections + 100:
+        print(f"warning: file-descriptor limit {fd_limit} is below --connections", file=sys.stderr)
+
+    report = asyncio.run(run_load(args.url, args.connections, args.ramp, args.hold, args.server_pid))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
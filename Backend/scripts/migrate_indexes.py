@@ -0,0 +1,50 @@
+"""
+Apply the indexes declared in db/indexes.py.
+
+Idempotent: existing indexes are left alone, missing ones are built
+in the background.
+
+Usage (from Backend/):
+    python scripts/migrate_indexes.py [--uri mongodb://...] [--db name] [--dry-run]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import mongo  # noqa: E402
+from db.indexes import ensure_indexes  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", help="MongoDB URI (defaults to MONGO_URI)")
+    parser.add_argument("--db", help="Database name (defaults to MONGO_DB_NAME)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report missing indexes")
+    args = parser.parse_args()
+
+    settings = {}
+
+    if args.uri:
+        settings["MONGO_URI"] = args.uri
+
+    if args.db:
+        settings["MONGO_DB_NAME"] = args.db
+
+    if settings:
+        mongo.configure(**settings)
+
+    report = ensure_indexes(dry_run=args.dry_run)
+
+    print(json.dumps(report, indent=2))
+
+    failed = any(result["failed"] for result in report.values())
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Rebuild the per-NGO dashboard aggregates (ngo_stats) from the shelters
+collection. Run it from cron (e.g. nightly) to repair any drift left by
+a crash between a shelter write and its $inc.
+
+Usage (from Backend/):
+    python scripts/reconcile_ngo_stats.py [--uri mongodb://...] [--db name] [--ngo <ngo_id>]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import mongo  # noqa: E402
+from services import dashboard_service  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uri", help="MongoDB URI (defaults to MONGO_URI)")
+    parser.add_argument("--db", help="Database name (defaults to MONGO_DB_NAME)")
+    parser.add_argument("--ngo", help="Only this NGO")
+    args = parser.parse_args()
+
+    settings = {}
+
+    if args.uri:
+        settings["MONGO_URI"] = args.uri
+
+    if args.db:
+        settings["MONGO_DB_NAME"] = args.db
+
+    if settings:
+        mongo.configure(**settings)
+
+    started = time.perf_counter()
+    count = dashboard_service.reconcile(args.ngo)
+
+    print(json.dumps({"ngo_stats": count, "seconds": round(time.perf_counter() - started, 2)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
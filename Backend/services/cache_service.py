@@ -0,0 +1,157 @@
+import json
+import time
+
+from services.metrics_service import record_cache
+from utils.cache import LocalCacheBackend, RedisCacheBackend
+
+
+# Upper bound on how stale a cached bed count can be (seconds)
+DEFAULT_CACHE_TTL_SECONDS = 5
+
+SEARCH_GENERATION_KEY = "search:generation"
+
+_backend = LocalCacheBackend(ttl=DEFAULT_CACHE_TTL_SECONDS)
+
+
+# ---------------------------------------------------
+# BACKEND SETUP
+# ---------------------------------------------------
+def init_app(app):
+    configure(app.config)
+
+
+def configure(config):
+    """
+    Pick the cache backend from a config mapping:
+    CACHE_BACKEND = "local" (per-process LRU) or "redis" (shared)
+    """
+
+    ttl = config.get("CACHE_TTL_SECONDS", DEFAULT_CACHE_TTL_SECONDS)
+
+    if config.get("CACHE_BACKEND", "local") == "redis":
+        backend = RedisCacheBackend(url=config["CACHE_REDIS_URL"], ttl=ttl)
+    else:
+        backend = LocalCacheBackend(
+            max_size=config.get("CACHE_MAX_ENTRIES", 10000),
+            ttl=ttl
+        )
+
+    set_backend(backend)
+
+
+def set_backend(backend):
+    global _backend
+
+    _backend = backend
+
+
+def get_backend():
+    return _backend
+
+
+# ---------------------------------------------------
+# READ-THROUGH
+# ---------------------------------------------------
+def get_or_load(key, loader, ttl=None):
+    """
+    Return the cached value for key, or call loader() and cache it.
+    None results are not cached.
+    """
+
+    value = _backend.get(key)
+
+    record_cache("response", value is not None)
+
+    if value is not None:
+        return value
+
+    value = loader()
+
+    if value is not None:
+        _backend.set(key, value, ttl)
+
+    return value
+
+
+async def get_or_load_async(key, loader, ttl=None):
+    """
+    get_or_load with an async loader. Backend calls stay synchronous:
+    the local LRU never blocks, Redis costs one short round trip.
+    """
+
+    value = _backend.get(key)
+
+    record_cache("response", value is not None)
+
+    if value is not None:
+        return value
+
+    value = await loader()
+
+    if value is not None:
+        _backend.set(key, value, ttl)
+
+    return value
+
+
+# ---------------------------------------------------
+# KEYS
+# ---------------------------------------------------
+def shelter_key(shelter_id):
+    return f"shelter:{shelter_id}"
+
+
+def search_key(**params):
+    """
+    Key for a search result. Embeds the current search generation,
+    so bumping it invalidates every cached search at once.
+    """
+
+    generation = _backend.get_counter(SEARCH_GENERATION_KEY)
+    encoded = json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+    return f"search:{generation}:{encoded}"
+
+
+# ---------------------------------------------------
+# RATE LIMITS
+# ---------------------------------------------------
+def rate_limit(scope, identity, limit, window_seconds):
+    """
+    Count one call against a fixed-window limit (shared by all workers
+    with the Redis backend, per worker with the local one).
+    Returns None if allowed, else seconds until the window resets.
+    """
+
+    now = time.time()
+    window = int(now // window_seconds)
+
+    count = _backend.incr(f"ratelimit:{scope}:{identity}:{window}", ttl=window_seconds)
+
+    if count <= limit:
+        return None
+
+    return max(1, int((window + 1) * window_seconds - now))
+
+
+# ---------------------------------------------------
+# WRITE-THROUGH INVALIDATION
+# ---------------------------------------------------
+def invalidate_shelter(shelter_id):
+    """
+    Drop a shelter's cached detail and every cached search result
+    (any of them may include the changed shelter)
+    """
+
+    _backend.delete(shelter_key(shelter_id))
+    _backend.incr(SEARCH_GENERATION_KEY)
+
+
+def invalidate_shelters(shelter_ids):
+    shelter_ids = list(shelter_ids)
+
+    if not shelter_ids:
+        return
+
+    _backend.delete(*(shelter_key(shelter_id) for shelter_id in shelter_ids))
+    _backend.incr(SEARCH_GENERATION_KEY)
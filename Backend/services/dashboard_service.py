@@ -0,0 +1,136 @@
+from datetime import datetime
+
+from pymongo import ReplaceOne
+
+from db import mongo
+from utils.time_helpers import now_ms
+
+
+# ---------------------------------------------------
+# PER-NGO DASHBOARD AGGREGATES
+# ---------------------------------------------------
+# One ngo_stats document per NGO, keyed by the NGO id:
+#   {_id, shelters, total_beds, available_beds, emergency_shelters, updated_at}
+#
+# Shelter writes read their pre-image atomically (find_one_and_update /
+# find_one_and_delete) and $inc the difference here, so the dashboard
+# reads one document however many shelters the NGO has.
+#
+# The $inc is a second write, not a transaction: a crash between the
+# two leaves the aggregate off until reconcile() rebuilds it from the
+# shelters collection (scripts/reconcile_ngo_stats.py).
+
+COUNTERS = ("shelters", "total_beds", "available_beds", "emergency_shelters")
+
+
+def apply_delta(ngo_id, shelters=0, total_beds=0, available_beds=0, emergency_shelters=0):
+    """
+    $inc an NGO's aggregate (upserted on its first shelter)
+    """
+
+    delta = {
+        "shelters": shelters,
+        "total_beds": total_beds,
+        "available_beds": available_beds,
+        "emergency_shelters": emergency_shelters
+    }
+    delta = {key: value for key, value in delta.items() if value}
+
+    if not ngo_id or not delta:
+        return
+
+    mongo.ngo_stats().update_one(
+        {"_id": ngo_id},
+        {"$inc": delta, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+def shelter_totals(shelter):
+    """
+    What one shelter contributes to its NGO's aggregate
+    """
+
+    return {
+        "shelters": 1,
+        "total_beds": shelter.get("total_beds") or 0,
+        "available_beds": shelter.get("available_beds") or 0,
+        "emergency_shelters": 1 if shelter.get("emergency_mode") else 0
+    }
+
+
+# ---------------------------------------------------
+# READ (O(1))
+# ---------------------------------------------------
+def get_dashboard_stats(ngo_id):
+    stats = mongo.ngo_stats().find_one({"_id": ngo_id}) or {}
+
+    totals = {key: stats.get(key, 0) for key in COUNTERS}
+    occupied = totals["total_beds"] - totals["available_beds"]
+
+    return {
+        **totals,
+        "occupied_beds": occupied,
+        "occupancy_rate": round(occupied / totals["total_beds"], 4) if totals["total_beds"] else 0.0,
+        "updated_at": stats.get("updated_at")
+    }
+
+
+# ---------------------------------------------------
+# RECONCILIATION
+# ---------------------------------------------------
+def _stats_pipeline(ngo_id=None):
+    pipeline = [{"$match": {"ngo_id": ngo_id}}] if ngo_id is not None else []
+
+    pipeline.append({
+        "$group": {
+            "_id": "$ngo_id",
+            "shelters": {"$sum": 1},
+            "total_beds": {"$sum": {"$ifNull": ["$total_beds", 0]}},
+            "available_beds": {"$sum": {"$ifNull": ["$available_beds", 0]}},
+            "emergency_shelters": {"$sum": {"$cond": [{"$eq": ["$emergency_mode", True]}, 1, 0]}}
+        }
+    })
+
+    return pipeline
+
+
+def reconcile(ngo_id=None):
+    """
+    Rebuild the aggregates (one NGO, or all) from the shelters
+    collection with a single $group pipeline.
+
+    A shelter write landing between the $group and the replace is
+    overwritten by the snapshot; run the full rebuild off-peak.
+    Returns the number of NGO aggregates written.
+    """
+
+    started = now_ms()
+
+    results = list(mongo.shelters().aggregate(_stats_pipeline(ngo_id), allowDiskUse=True))
+    results = [stats for stats in results if stats["_id"]]
+
+    operations = [
+        ReplaceOne(
+            {"_id": stats["_id"]},
+            {**stats, "updated_at": started, "reconciled_at": started},
+            upsert=True
+        )
+        for stats in results
+    ]
+
+    stats_collection = mongo.ngo_stats()
+
+    if operations:
+        stats_collection.bulk_write(operations, ordered=False)
+
+    # NGOs left without shelters
+    if ngo_id is None:
+        stats_collection.delete_many({
+            "_id": {"$nin": [stats["_id"] for stats in results]},
+            "updated_at": {"$lt": started}
+        })
+    elif not results:
+        stats_collection.delete_many({"_id": ngo_id, "updated_at": {"$lt": started}})
+
+    return len(results)
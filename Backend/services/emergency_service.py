@@ -0,0 +1,736 @@
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from db import mongo
+from services import search_service
+from services.shelter_service import release_beds, reserve_beds
+from utils.geo_helpers import rank_nearest
+
+
+logger = logging.getLogger(__name__)
+
+# A higher priority acts as a head start in queue time, so an old
+# "normal" request still overtakes a brand-new "critical" one eventually
+PRIORITY_HEADSTART_SECONDS = {
+    "critical": 600,
+    "high": 120,
+    "normal": 0
+}
+
+DISPATCH_BATCH_SIZE = 200
+DISPATCH_INTERVAL_SECONDS = 0.05
+
+# Nearest open shelters scored per request before falling back to a filtered search
+CANDIDATES_PER_REQUEST = 8
+
+# Batches that fail are re-queued; a request gives up after this many tries
+DISPATCH_MAX_ATTEMPTS = 3
+
+# Beds held for a pending request go back if its NGO has not accepted
+# it within this many seconds (EMERGENCY_HOLD_SECONDS)
+DEFAULT_HOLD_SECONDS = 1800
+
+# A queued request is claimed by one worker's dispatcher, which renews
+# the lease while it holds the request; other workers only recover it
+# once the lease has expired (its worker died)
+CLAIM_LEASE_SECONDS = 60
+
+# How often each dispatcher renews its leases, recovers expired ones
+# and expires unaccepted holds
+SWEEP_SECONDS = 20
+
+# Request statuses (pending = beds held at a shelter, awaiting the NGO;
+# failed = dispatch kept erroring; expired = the NGO never answered)
+STATUS_QUEUED = "queued"
+STATUS_PENDING = "pending"
+STATUS_ACCEPTED = "accepted"
+STATUS_UNASSIGNED = "unassigned"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+STATUS_EXPIRED = "expired"
+
+# Statuses that hold beds at the assigned shelter
+HOLDING_STATUSES = (STATUS_PENDING, STATUS_ACCEPTED)
+
+# Never returned to NGOs or requesters
+PRIVATE_FIELDS = {"cancel_token_hash": 0}
+
+_settings = {
+    "hold_seconds": DEFAULT_HOLD_SECONDS
+}
+
+
+def init_app(app):
+    _settings["hold_seconds"] = app.config.get("EMERGENCY_HOLD_SECONDS", DEFAULT_HOLD_SECONDS)
+
+    # Inside the worker, after fork, so queued requests are recovered
+    # after a restart even before a new one arrives
+    @app.before_request
+    def _start_dispatcher():
+        dispatcher.start()
+
+
+# ---------------------------------------------------
+# CREATE / READ REQUESTS
+# ---------------------------------------------------
+def create_emergency_request(request_data, cancel_token=None):
+    """
+    Store a validated help request and queue it for dispatch.
+    cancel_token (kept only as a hash) lets the requester cancel it.
+    """
+
+    request_collection = mongo.emergency_requests()
+
+    now = datetime.utcnow()
+
+    document = {
+        **request_data,
+        "status": STATUS_QUEUED,
+        "shelter_id": None,
+        "ngo_id": None,
+        "created_at": now,
+        **dispatcher.claim_fields(now)
+    }
+
+    if cancel_token:
+        document["cancel_token_hash"] = _token_hash(cancel_token)
+
+    result = request_collection.insert_one(document)
+
+    dispatcher.submit(document)
+
+    return str(result.inserted_id)
+
+
+def get_emergency_request(request_id):
+    request_collection = mongo.emergency_requests()
+
+    return request_collection.find_one({"_id": ObjectId(request_id)})
+
+
+async def get_emergency_request_async(request_id):
+    """
+    get_emergency_request for the ASGI read path
+    """
+
+    request_collection = mongo.async_emergency_requests()
+
+    return await request_collection.find_one({"_id": ObjectId(request_id)})
+
+
+def get_requests_for_ngo(ngo_id, limit=100):
+    """
+    Requests assigned to an NGO's shelters, newest first
+    """
+
+    request_collection = mongo.emergency_requests()
+
+    return list(
+        request_collection
+        .find({"ngo_id": ngo_id}, PRIVATE_FIELDS)
+        .sort("created_at", -1)
+        .limit(limit)
+    )
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# ---------------------------------------------------
+# BED HOLDS (ACCEPT / DECLINE / CANCEL / EXPIRE)
+# ---------------------------------------------------
+# A dispatched request holds its beds until the requester cancels it,
+# the NGO declines it, or nobody accepts it within the hold time.
+# Each transition is one conditional update, so beds are released once.
+
+def accept_request(request_id, ngo_id):
+    """
+    The NGO takes a pending request at one of its shelters; the beds
+    stay reserved. Returns the request, or None if there is no such
+    pending request.
+    """
+
+    request_collection = mongo.emergency_requests()
+
+    return request_collection.find_one_and_update(
+        {"_id": ObjectId(request_id), "status": STATUS_PENDING, "ngo_id": ngo_id},
+        {"$set": {"status": STATUS_ACCEPTED, "accepted_at": datetime.utcnow()}},
+        projection=PRIVATE_FIELDS,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def decline_request(request_id, ngo_id):
+    """
+    The NGO turns a pending request down: its beds are released and it
+    is dispatched again, skipping every shelter that declined it.
+    Returns the re-queued request, or None if there is no such pending
+    request.
+    """
+
+    request_collection = mongo.emergency_requests()
+
+    pending = request_collection.find_one(
+        {"_id": ObjectId(request_id), "status": STATUS_PENDING, "ngo_id": ngo_id},
+        {"shelter_id": 1}
+    )
+
+    if pending is None:
+        return None
+
+    declined = request_collection.find_one_and_update(
+        {"_id": pending["_id"], "status": STATUS_PENDING, "shelter_id": pending["shelter_id"]},
+        {
+            "$set": {
+                "status": STATUS_QUEUED,
+                "shelter_id": None,
+                "shelter_name": None,
+                "ngo_id": None,
+                "distance_km": None,
+                **dispatcher.claim_fields(datetime.utcnow())
+            },
+            "$addToSet": {"declined_shelters": pending["shelter_id"]}
+        },
+        projection=PRIVATE_FIELDS,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    if declined is None:
+        return None
+
+    _release_hold(declined)
+
+    requeued = request_collection.find_one({"_id": declined["_id"]}, PRIVATE_FIELDS)
+    dispatcher.submit(requeued)
+
+    return requeued
+
+
+def cancel_request(request_id, cancel_token):
+    """
+    The requester withdraws a request (with the token returned when it
+    was submitted); beds it holds are released. Returns the request as
+    it was before, or None if the token is wrong or it is already closed.
+    """
+
+    request_collection = mongo.emergency_requests()
+
+    cancelled = request_collection.find_one_and_update(
+        {
+            "_id": ObjectId(request_id),
+            "status": {"$in": [STATUS_QUEUED, *HOLDING_STATUSES]},
+            "cancel_token_hash": _token_hash(cancel_token)
+        },
+        {"$set": {"status": STATUS_CANCELLED, "cancelled_at": datetime.utcnow()}},
+        projection=PRIVATE_FIELDS,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    if cancelled is not None:
+        _release_hold(cancelled)
+
+    return cancelled
+
+
+def expire_holds(cutoff=None):
+    """
+    Release the beds of pending requests assigned before `cutoff`
+    (default: EMERGENCY_HOLD_SECONDS ago) that no NGO accepted.
+    Returns the number expired.
+    """
+
+    request_collection = mongo.emergency_requests()
+
+    now = datetime.utcnow()
+    cutoff = cutoff or now - timedelta(seconds=_settings["hold_seconds"])
+    stale = {"status": STATUS_PENDING, "assigned_at": {"$lt": cutoff}}
+
+    count = 0
+
+    for request_document in request_collection.find(stale, {"_id": 1}):
+        expired = request_collection.find_one_and_update(
+            {"_id": request_document["_id"], **stale},
+            {"$set": {"status": STATUS_EXPIRED, "expired_at": now}},
+            projection={"shelter_id": 1, "people": 1, "status": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+
+        if expired is not None:
+            _release_hold(expired)
+            count += 1
+
+    return count
+
+
+def _release_hold(request_document):
+    """
+    Give back the beds a request held (given its state before the transition)
+    """
+
+    if request_document["status"] not in HOLDING_STATUSES or not request_document.get("shelter_id"):
+        return
+
+    if release_beds(request_document["shelter_id"], request_document.get("people", 1)) is None:
+        logger.warning(
+            "could not release %d beds at %s for request %s",
+            request_document.get("people", 1), request_document["shelter_id"], request_document["_id"]
+        )
+
+
+# ---------------------------------------------------
+# PRIORITY QUEUE
+# ---------------------------------------------------
+class DispatchQueue:
+    """
+    Min-heap ordered by (created time - priority head start).
+    A request already waiting is not queued twice.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._ids = set()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, request_document):
+        """
+        Queue a request. False if it is already queued.
+        """
+
+        created_at = request_document["created_at"].timestamp()
+        headstart = PRIORITY_HEADSTART_SECONDS.get(request_document.get("priority"), 0)
+        request_id = request_document.get("_id")
+
+        with self._lock:
+            if request_id is not None:
+                if request_id in self._ids:
+                    return False
+
+                self._ids.add(request_id)
+
+            heapq.heappush(
+                self._heap,
+                (created_at - headstart, next(self._counter), request_document)
+            )
+
+        return True
+
+    def pop_batch(self, size):
+        with self._lock:
+            count = min(size, len(self._heap))
+            batch = [heapq.heappop(self._heap)[2] for _ in range(count)]
+
+            for request_document in batch:
+                self._ids.discard(request_document.get("_id"))
+
+            return batch
+
+
+# ---------------------------------------------------
+# DISPATCHER
+# ---------------------------------------------------
+class Dispatcher:
+    """
+    Drains the queue in micro-batches and assigns each request to the
+    nearest emergency-mode shelter with enough free beds.
+
+    Beds are taken with shelter_service.reserve_beds (a conditional
+    $inc), so concurrent batches and workers can never oversell.
+
+    Every queued request is claimed (claimed_by + lease_expires_at) by
+    the dispatcher that queues it, so only one worker works on it.
+    """
+
+    def __init__(self, batch_size=DISPATCH_BATCH_SIZE, interval=DISPATCH_INTERVAL_SECONDS):
+        self.queue = DispatchQueue()
+        self.batch_size = batch_size
+        self.interval = interval
+
+        self.assigned = 0
+        self.unassigned = 0
+        self.failed = 0
+        self.busy = False
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self._thread_lock = threading.Lock()
+        self._next_sweep = 0.0
+        self._owner = None
+        self._owner_pid = None
+
+    # -------------------------------
+    # CLAIMS
+    # -------------------------------
+    @property
+    def owner(self):
+        """
+        Claim owner id of this dispatcher in this process (a forked
+        child gets its own)
+        """
+
+        if self._owner_pid != os.getpid():
+            self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            self._owner_pid = os.getpid()
+
+        return self._owner
+
+    def claim_fields(self, now):
+        return {
+            "claimed_by": self.owner,
+            "claimed_at": now,
+            "lease_expires_at": now + timedelta(seconds=CLAIM_LEASE_SECONDS)
+        }
+
+    def renew_claims(self):
+        """
+        Extend the lease of every request this dispatcher still holds
+        """
+
+        request_collection = mongo.emergency_requests()
+
+        result = request_collection.update_many(
+            {"status": STATUS_QUEUED, "claimed_by": self.owner},
+            {"$set": {"lease_expires_at": datetime.utcnow() + timedelta(seconds=CLAIM_LEASE_SECONDS)}}
+        )
+
+        return result.modified_count
+
+    def recover(self):
+        """
+        Claim and queue requests whose lease has expired (their worker
+        died) or that were never claimed (e.g. seeded), one atomic
+        claim each, oldest first. Requests held by live workers are
+        left alone.
+        """
+
+        request_collection = mongo.emergency_requests()
+
+        count = 0
+
+        while True:
+            now = datetime.utcnow()
+
+            request_document = request_collection.find_one_and_update(
+                {
+                    "status": STATUS_QUEUED,
+                    "$or": [{"lease_expires_at": {"$lt": now}}, {"lease_expires_at": None}]
+                },
+                {"$set": self.claim_fields(now)},
+                projection=PRIVATE_FIELDS,
+                sort=[("created_at", 1)],
+                return_document=ReturnDocument.AFTER
+            )
+
+            if request_document is None:
+                break
+
+            if self.queue.push(request_document):
+                count += 1
+
+        if count:
+            self._wakeup.set()
+
+        return count
+
+    # -------------------------------
+    # LIFECYCLE
+    # -------------------------------
+    def submit(self, request_document):
+        self.queue.push(request_document)
+        self.start()
+
+        if len(self.queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        """
+        Start the dispatch thread in this process (once; a forked child
+        starts its own). Its first sweep recovers requests a dead
+        process left queued.
+        """
+
+        if self._thread_pid == os.getpid():
+            return
+
+        with self._thread_lock:
+            if self._thread_pid != os.getpid():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="emergency-dispatch", daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join()
+
+        self._thread = None
+        self._thread_pid = None
+
+    def _run(self):
+        self._next_sweep = 0.0
+
+        while not self._stop.is_set():
+            if time.monotonic() >= self._next_sweep:
+                self._next_sweep = time.monotonic() + SWEEP_SECONDS
+                self._sweep()
+
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+            self.busy = True
+
+            try:
+                while len(self.queue):
+                    self.run_once()
+            except Exception:
+                logger.exception("emergency dispatch batch failed")
+            finally:
+                self.busy = False
+
+    def _sweep(self):
+        try:
+            self.renew_claims()
+            recovered = self.recover()
+
+            if recovered:
+                logger.info("recovered %d emergency requests from expired claims", recovered)
+        except Exception:
+            logger.exception("emergency request recovery failed")
+
+        try:
+            expired = expire_holds()
+
+            if expired:
+                logger.info("released the beds of %d unaccepted emergency requests", expired)
+        except Exception:
+            logger.exception("emergency hold expiry failed")
+
+    def wait_for_idle(self, timeout=5.0):
+        """
+        Block until every submitted request has been processed
+        (used by tests and benchmarks)
+        """
+
+        deadline = time.monotonic() + timeout
+
+        while (len(self.queue) or self.busy) and time.monotonic() < deadline:
+            time.sleep(0.002)
+
+    # -------------------------------
+    # ASSIGNMENT
+    # -------------------------------
+    def run_once(self):
+        """
+        Assign one micro-batch. Returns the number of requests processed.
+        """
+
+        batch = self.queue.pop_batch(self.batch_size)
+
+        if not batch:
+            return 0
+
+        try:
+            shelters = search_service.open_emergency_shelters()
+            candidates = self._rank_candidates(batch, shelters)
+
+            # Beds this batch believes are left, so it stops offering a
+            # full shelter before Mongo has to reject the reservation
+            remaining = {shelter["_id"]: shelter["available_beds"] for shelter in shelters}
+
+            for request_document, ranked in zip(batch, candidates):
+                self._assign(request_document, ranked, remaining)
+        except Exception:
+            self._requeue(batch)
+            raise
+
+        return len(batch)
+
+    def _requeue(self, batch):
+        """
+        Put back the requests of a failed batch that were not recorded
+        yet, or mark them failed once they used up their attempts
+        """
+
+        for request_document in batch:
+            if request_document.get("status") != STATUS_QUEUED:
+                continue
+
+            attempts = request_document.get("dispatch_attempts", 0) + 1
+            request_document["dispatch_attempts"] = attempts
+
+            if attempts < DISPATCH_MAX_ATTEMPTS:
+                self.queue.push(request_document)
+                continue
+
+            try:
+                if self._record(request_document, {"status": STATUS_FAILED, "failed_at": datetime.utcnow()}):
+                    self.failed += 1
+            except Exception:
+                # Still queued in Mongo; recovered once its claim expires
+                logger.exception("could not mark emergency request %s failed", request_document["_id"])
+
+    def _rank_candidates(self, batch, shelters):
+        if not shelters:
+            return [[] for _ in batch]
+
+        lats = np.fromiter((shelter["lat"] for shelter in shelters), dtype=np.float64, count=len(shelters))
+        lons = np.fromiter((shelter["lon"] for shelter in shelters), dtype=np.float64, count=len(shelters))
+
+        indices, distances = rank_nearest(
+            [request_document["user_location_lat"] for request_document in batch],
+            [request_document["user_location_lng"] for request_document in batch],
+            lats,
+            lons,
+            k=min(CANDIDATES_PER_REQUEST, len(shelters))
+        )
+
+        return [
+            [(shelters[index], float(distance)) for index, distance in zip(row, row_distances) if index >= 0]
+            for row, row_distances in zip(indices, distances)
+        ]
+
+    def _assign(self, request_document, ranked, remaining):
+        needs = _request_filters(request_document)
+        people = request_document.get("people", 1)
+        declined = set(request_document.get("declined_shelters", ()))
+
+        nearest = [
+            (shelter, distance)
+            for shelter, distance in ranked
+            if _suits(shelter, needs) and shelter["_id"] not in declined
+        ]
+
+        if self._reserve_first(request_document, nearest, people, remaining):
+            return
+
+        # The nearest few are unsuitable or full: run a filtered index
+        # search, which already skips shelters with no beds left
+        fallback = [
+            (shelter, shelter["distance_km"])
+            for shelter in search_service.find_nearest_shelters(
+                request_document["user_location_lat"],
+                request_document["user_location_lng"],
+                CANDIDATES_PER_REQUEST,
+                emergency_mode=True,
+                available_only=True,
+                **needs
+            )
+            if shelter["_id"] not in declined
+        ]
+
+        if self._reserve_first(request_document, fallback, people, remaining):
+            return
+
+        recorded = self._record(request_document, {
+            "status": STATUS_UNASSIGNED,
+            "assigned_at": datetime.utcnow()
+        })
+
+        if recorded:
+            self.unassigned += 1
+
+    def _reserve_first(self, request_document, candidates, people, remaining):
+        """
+        Reserve beds at the first candidate that still has room
+        """
+
+        for shelter, distance in candidates:
+            if remaining.get(shelter["_id"], shelter["available_beds"]) < people:
+                continue
+
+            reserved = reserve_beds(shelter["_id"], people)
+
+            if not reserved:
+                remaining[shelter["_id"]] = 0
+                continue
+
+            remaining[shelter["_id"]] = reserved["available_beds"]
+
+            recorded = self._record(request_document, {
+                "status": STATUS_PENDING,
+                "shelter_id": shelter["_id"],
+                "shelter_name": reserved.get("name"),
+                "ngo_id": reserved.get("ngo_id"),
+                "distance_km": round(distance, 3),
+                "assigned_at": datetime.utcnow()
+            })
+
+            if recorded:
+                self.assigned += 1
+            else:
+                # Handled elsewhere meanwhile (cancelled, or recovered by
+                # another worker after this one's claim expired)
+                release_beds(shelter["_id"], people)
+
+            return True
+
+        return False
+
+    @staticmethod
+    def _record(request_document, fields):
+        """
+        Move a still-queued request to its outcome. False if it was no
+        longer queued (nothing is written then).
+        """
+
+        request_collection = mongo.emergency_requests()
+
+        result = request_collection.update_one(
+            {"_id": request_document["_id"], "status": STATUS_QUEUED},
+            {"$set": fields}
+        )
+
+        if result.matched_count == 0:
+            return False
+
+        request_document.update(fields)
+
+        return True
+
+
+def _request_filters(request_document):
+    needs = {}
+
+    if request_document.get("gender"):
+        needs["gender"] = request_document["gender"]
+
+    for flag in ("pet_friendly", "accessibility"):
+        if request_document.get(flag):
+            needs[flag] = True
+
+    return needs
+
+
+def _suits(shelter, needs):
+    gender = needs.get("gender")
+
+    if gender and shelter["gender"] not in (gender, "all"):
+        return False
+
+    return all(shelter[flag] for flag in ("pet_friendly", "accessibility") if needs.get(flag))
+
+
+# Process-wide dispatcher; its thread starts on the first request
+dispatcher = Dispatcher()
+
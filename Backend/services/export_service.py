@@ -0,0 +1,90 @@
+import json
+from datetime import datetime
+
+from db import mongo
+from utils.response import json_default
+
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = ("ndjson", "json")
+
+
+# ---------------------------------------------------
+# ITERATE SHELTERS FOR EXPORT
+# ---------------------------------------------------
+def iter_shelters(updated_since=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield every shelter (optionally only those changed at or after
+    updated_since) from a server-side cursor, never holding more than
+    one batch. Boundary documents may repeat across incremental runs;
+    consumers should upsert by _id.
+
+    Reads the primary: a lagging secondary could miss writes just
+    before the updated_at watermark handed to the next run.
+    """
+
+    shelter_collection = mongo.shelters()
+
+    query = {}
+
+    if updated_since is not None:
+        query["updated_at"] = {"$gte": updated_since}
+
+    cursor = (
+        shelter_collection
+        .find(query)
+        .sort([("updated_at", 1), ("_id", 1)])
+        .batch_size(batch_size)
+    )
+
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+# ---------------------------------------------------
+# SERIALIZE EXPORT STREAM
+# ---------------------------------------------------
+def iter_export_chunks(updated_since=None, fmt="ndjson", batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield the export as text chunks: one line per shelter for NDJSON,
+    or the pieces of a single JSON array for "json"
+    """
+
+    dumps = json.JSONEncoder(default=json_default, separators=(",", ":")).encode
+    shelters = iter_shelters(updated_since, batch_size)
+
+    if fmt == "ndjson":
+        for shelter in shelters:
+            yield dumps(shelter) + "\n"
+        return
+
+    yield "["
+
+    first = True
+
+    for shelter in shelters:
+        yield dumps(shelter) if first else "," + dumps(shelter)
+        first = False
+
+    yield "]\n"
+
+
+def parse_updated_since(value):
+    """
+    Parse an ISO-8601 timestamp. Returns None for an empty value
+    and raises ValueError for a malformed one.
+    """
+
+    if not value:
+        return None
+
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+    # Stored timestamps are naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.replace(tzinfo=None) - parsed.utcoffset()
+
+    return parsed
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+
+from db.indexes import ensure_indexes
+from db.seed import seed
+from services import dashboard_service, snapshot_service
+from services.export_service import iter_export_chunks, parse_updated_since
+
+
+# ---------------------------------------------------
+# JOB HANDLERS
+# ---------------------------------------------------
+# handler(payload) -> result. Handlers run in the worker's process pool,
+# so they must be module-level functions, and payloads and results
+# must be BSON-serializable. A handler may run more than once (retry
+# after a failure or an expired lease), so it has to be idempotent.
+
+def migrate_indexes(payload):
+    """
+    payload: {"dry_run": bool}
+    """
+
+    return ensure_indexes(dry_run=payload.get("dry_run", False))
+
+
+def seed_dataset(payload):
+    """
+    payload: db.seed.seed keyword arguments, e.g. {"shelters": 100000}
+    Nothing is dropped unless the payload says "drop": true. Documents
+    are tagged with payload["seed_run"] (default: a digest of the
+    payload), so a retry after a partial insert replaces only its own.
+    """
+
+    seed_run = payload.get("seed_run") or hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:12]
+
+    return {"seed_run": seed_run, **seed(**{**payload, "seed_run": seed_run})}
+
+
+def reconcile_ngo_stats(payload):
+    """
+    payload: {"ngo_id": optional}
+    """
+
+    return {"ngo_stats": dashboard_service.reconcile(payload.get("ngo_id"))}
+
+
+def build_snapshot(payload):
+    """
+    payload: {"directory": optional, "keep": optional}
+    """
+
+    return snapshot_service.build_snapshot(payload.get("directory"), payload.get("keep"))
+
+
+def export_shelters(payload):
+    """
+    payload: {"path", "format": "ndjson" | "json", "updated_since": ISO-8601}
+    Written to path + ".tmp" first, so a retry never leaves half a file.
+    """
+
+    path = payload["path"]
+    tmp_path = f"{path}.tmp"
+    updated_since = parse_updated_since(payload.get("updated_since"))
+
+    with open(tmp_path, "w") as f:
+        for chunk in iter_export_chunks(updated_since, payload.get("format", "ndjson")):
+            f.write(chunk)
+
+    os.replace(tmp_path, path)
+
+    return {"path": path, "bytes": os.path.getsize(path)}
+
+
+HANDLERS = {
+    "migrate_indexes": migrate_indexes,
+    "seed": seed_dataset,
+    "reconcile_ngo_stats": reconcile_ngo_stats,
+    "build_snapshot": build_snapshot,
+    "export_shelters": export_shelters
+}
+
+
+class UnknownJobType(Exception):
+    pass
+
+
+def run_job(job_type, payload):
+    """
+    Entry point executed in the pool for each job
+    """
+
+    handler = HANDLERS.get(job_type)
+
+    if handler is None:
+        raise UnknownJobType(job_type)
+
+    return handler(payload)
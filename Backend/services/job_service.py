@@ -0,0 +1,245 @@
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from db import mongo
+
+
+# ---------------------------------------------------
+# JOB QUEUE (MONGODB)
+# ---------------------------------------------------
+# One document per job in the jobs collection:
+#   {_id, type, payload, status, run_at, attempts, max_attempts,
+#    lease_owner, lease_expires_at, heartbeat_at, created_at,
+#    started_at, finished_at, error, result, expires_at}
+#
+# status: queued -> running -> done | failed, and running -> queued
+# again when an attempt fails (retried at run_at, with backoff) or its
+# lease runs out (the worker died). A worker owns a running job only
+# while its lease is current and keeps it current with heartbeats;
+# every update is conditioned on lease_owner, so a worker that lost
+# its lease cannot overwrite the next owner's state.
+#
+# Finished jobs are kept for inspection until expires_at (TTL index).
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+STATUSES = (QUEUED, RUNNING, DONE, FAILED)
+
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF_SECONDS = 10
+DEFAULT_BACKOFF_MAX_SECONDS = 600
+DEFAULT_RETENTION = timedelta(days=7)
+
+# Longest error text stored on a job
+MAX_ERROR_LENGTH = 2000
+
+_settings = {
+    "max_attempts": DEFAULT_MAX_ATTEMPTS,
+    "backoff_seconds": DEFAULT_BACKOFF_SECONDS,
+    "backoff_max_seconds": DEFAULT_BACKOFF_MAX_SECONDS,
+    "retention": DEFAULT_RETENTION
+}
+
+
+def init_app(app):
+    _settings["max_attempts"] = app.config.get("JOB_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+    _settings["backoff_seconds"] = app.config.get("JOB_BACKOFF_SECONDS", DEFAULT_BACKOFF_SECONDS)
+    _settings["backoff_max_seconds"] = app.config.get("JOB_BACKOFF_MAX_SECONDS", DEFAULT_BACKOFF_MAX_SECONDS)
+    _settings["retention"] = timedelta(days=app.config.get("JOB_RETENTION_DAYS", DEFAULT_RETENTION.days))
+
+
+# ---------------------------------------------------
+# ENQUEUE
+# ---------------------------------------------------
+def enqueue(job_type, payload=None, run_at=None, max_attempts=None):
+    """
+    Queue a job. Returns its id.
+    """
+
+    now = datetime.utcnow()
+
+    result = mongo.jobs().insert_one({
+        "type": job_type,
+        "payload": payload or {},
+        "status": QUEUED,
+        "run_at": run_at or now,
+        "attempts": 0,
+        "max_attempts": max_attempts or _settings["max_attempts"],
+        "created_at": now
+    })
+
+    return str(result.inserted_id)
+
+
+def get_job(job_id):
+    return mongo.jobs().find_one({"_id": ObjectId(job_id)})
+
+
+# ---------------------------------------------------
+# LEASES
+# ---------------------------------------------------
+def claim(owner, job_types=None, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Atomically take the oldest due job (optionally only of job_types)
+    and lease it to `owner`. Returns the job, or None.
+    """
+
+    now = datetime.utcnow()
+
+    query = {"status": QUEUED, "run_at": {"$lte": now}}
+
+    if job_types:
+        query["type"] = {"$in": list(job_types)}
+
+    return mongo.jobs().find_one_and_update(
+        query,
+        {
+            "$set": {
+                "status": RUNNING,
+                "lease_owner": owner,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                "heartbeat_at": now,
+                "started_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("run_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def heartbeat(job_id, owner, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Extend a lease. False if `owner` no longer holds it.
+    """
+
+    now = datetime.utcnow()
+
+    result = mongo.jobs().update_one(
+        {"_id": ObjectId(job_id), "status": RUNNING, "lease_owner": owner},
+        {"$set": {"lease_expires_at": now + timedelta(seconds=lease_seconds), "heartbeat_at": now}}
+    )
+
+    return result.matched_count == 1
+
+
+def _release(job_id, owner, update):
+    result = mongo.jobs().update_one(
+        {"_id": ObjectId(job_id), "status": RUNNING, "lease_owner": owner},
+        {**update, "$unset": {"lease_owner": "", "lease_expires_at": ""}}
+    )
+
+    return result.matched_count == 1
+
+
+def complete(job_id, owner, result=None):
+    """
+    Mark a leased job done. False if the lease was lost meanwhile.
+    """
+
+    now = datetime.utcnow()
+
+    return _release(job_id, owner, {"$set": {
+        "status": DONE,
+        "result": result,
+        "finished_at": now,
+        "expires_at": now + _settings["retention"]
+    }})
+
+
+def backoff_seconds(attempts):
+    """
+    Exponential backoff with full jitter after `attempts` failed tries
+    """
+
+    ceiling = min(_settings["backoff_max_seconds"], _settings["backoff_seconds"] * 2 ** (attempts - 1))
+
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def fail(job, owner, error):
+    """
+    Record a failed attempt: re-queue with backoff, or mark the job
+    failed once max_attempts is used up. Returns the new status, or
+    None if the lease was lost meanwhile.
+    """
+
+    now = datetime.utcnow()
+    error = str(error)[:MAX_ERROR_LENGTH]
+
+    if job["attempts"] < job["max_attempts"]:
+        status = QUEUED
+        update = {"$set": {
+            "status": QUEUED,
+            "run_at": now + timedelta(seconds=backoff_seconds(job["attempts"])),
+            "error": error
+        }}
+    else:
+        status = FAILED
+        update = {"$set": {
+            "status": FAILED,
+            "error": error,
+            "finished_at": now,
+            "expires_at": now + _settings["retention"]
+        }}
+
+    return status if _release(job["_id"], owner, update) else None
+
+
+def reap_expired(cutoff=None):
+    """
+    Re-queue running jobs whose lease ran out before `cutoff` (default
+    now): their worker died or hung. Jobs out of attempts are failed
+    instead. Returns (requeued, failed).
+    """
+
+    now = datetime.utcnow()
+    expired = {"status": RUNNING, "lease_expires_at": {"$lt": cutoff or now}}
+
+    failed = mongo.jobs().update_many(
+        {**expired, "$expr": {"$gte": ["$attempts", "$max_attempts"]}},
+        {
+            "$set": {
+                "status": FAILED,
+                "error": "lease expired",
+                "finished_at": now,
+                "expires_at": now + _settings["retention"]
+            },
+            "$unset": {"lease_owner": "", "lease_expires_at": ""}
+        }
+    )
+
+    requeued = mongo.jobs().update_many(
+        expired,
+        {
+            "$set": {"status": QUEUED, "run_at": now, "error": "lease expired"},
+            "$unset": {"lease_owner": "", "lease_expires_at": ""}
+        }
+    )
+
+    return requeued.modified_count, failed.modified_count
+
+
+# ---------------------------------------------------
+# STATS
+# ---------------------------------------------------
+def queue_counts():
+    """
+    {job_type: {status: count}} over the whole collection
+    """
+
+    counts = {}
+
+    for row in mongo.jobs().aggregate([
+        {"$group": {"_id": {"type": "$type", "status": "$status"}, "count": {"$sum": 1}}}
+    ]):
+        counts.setdefault(row["_id"]["type"], {})[row["_id"]["status"]] = row["count"]
+
+    return counts
@@ -0,0 +1,228 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from pymongo.errors import PyMongoError
+
+from services import job_service
+from services.job_handlers import run_job
+from services.metrics_service import record_job, record_job_claim
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------
+# JOB WORKER
+# ---------------------------------------------------
+class JobWorker:
+    """
+    Claims jobs from the queue and runs them on an executor (a process
+    pool in production, see worker.py), at most `concurrency` at once.
+
+    This process only claims, heartbeats and records outcomes; the
+    handlers run in the executor, so a long job never blocks the
+    heartbeats that keep its lease.
+
+    A job still running after its max runtime (per type in
+    `max_runtime`, else `default_max_runtime` seconds) stops being
+    heartbeated: its lease runs out and reap_expired re-queues or
+    fails it, and its late result is dropped as lease_lost.
+    """
+
+    def __init__(
+        self,
+        executor_factory,
+        concurrency,
+        job_types=None,
+        target=run_job,
+        lease_seconds=job_service.DEFAULT_LEASE_SECONDS,
+        heartbeat_seconds=15,
+        poll_seconds=1.0,
+        max_runtime=None,
+        default_max_runtime=3600
+    ):
+        self.executor_factory = executor_factory
+        self.concurrency = concurrency
+        self.job_types = job_types
+        self.target = target
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.max_runtime = max_runtime or {}
+        self.default_max_runtime = default_max_runtime
+
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        # future -> (job, started, executor)
+        self._inflight = {}
+        # ids of jobs past their max runtime, no longer heartbeated
+        self._overrun = set()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stopped = threading.Event()
+        self._executor = None
+        self._heartbeat_thread = None
+        self._next_reap = 0.0
+
+        # job_type -> {"done", "retry", "failed", "lease_lost", "seconds"}
+        self.stats = {}
+
+    # -------------------------------
+    # MAIN LOOP
+    # -------------------------------
+    def run(self):
+        """
+        Work until stop() is called, then finish the jobs in flight
+        """
+
+        self._executor = self.executor_factory()
+        self._stopped.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeats, name="job-heartbeats", daemon=True)
+        self._heartbeat_thread.start()
+
+        logger.info("job worker %s started (concurrency %d)", self.owner, self.concurrency)
+
+        try:
+            while not self._stopping.is_set():
+                try:
+                    self.run_once()
+                except PyMongoError:
+                    logger.exception("job queue unavailable, retrying")
+                    self._stopping.wait(self.poll_seconds)
+
+            while self._inflight:
+                self._collect(self.poll_seconds)
+        finally:
+            self._stopped.set()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        logger.info("job worker %s stopped", self.owner)
+
+    def stop(self):
+        self._stopping.set()
+
+    def run_once(self, timeout=None):
+        """
+        Reap expired leases (periodically), claim up to capacity, then
+        wait up to `timeout` for a job to finish
+        """
+
+        if self._executor is None:
+            self._executor = self.executor_factory()
+
+        if time.monotonic() >= self._next_reap:
+            self._next_reap = time.monotonic() + self.heartbeat_seconds
+            requeued, failed = job_service.reap_expired()
+
+            if requeued or failed:
+                logger.warning("expired leases: %d re-queued, %d failed", requeued, failed)
+
+        self._fill()
+        self._collect(self.poll_seconds if timeout is None else timeout)
+
+    def _fill(self):
+        while len(self._inflight) < self.concurrency and not self._stopping.is_set():
+            job = job_service.claim(self.owner, self.job_types, self.lease_seconds)
+
+            if job is None:
+                return
+
+            record_job_claim(job["type"], (job["started_at"] - job["run_at"]).total_seconds())
+
+            future = self._executor.submit(self.target, job["type"], job["payload"])
+
+            with self._lock:
+                self._inflight[future] = (job, time.perf_counter(), self._executor)
+
+    def _collect(self, timeout):
+        if not self._inflight:
+            self._stopping.wait(timeout)
+            return
+
+        done, _ = wait(list(self._inflight), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            with self._lock:
+                job, started, executor = self._inflight.pop(future)
+                self._overrun.discard(job["_id"])
+
+            self._finish(job, future, time.perf_counter() - started, executor)
+
+    def _finish(self, job, future, seconds, executor=None):
+        try:
+            result = future.result()
+        except BrokenProcessPool as e:
+            # A pool process died (e.g. OOM-killed); every job in flight is lost
+            logger.error("job pool broke while running %s %s", job["type"], job["_id"])
+            outcome = job_service.fail(job, self.owner, f"worker process died: {e}")
+
+            # Every job in flight on that pool fails this way; replace it once
+            if executor is self._executor:
+                self._replace_executor()
+        except Exception as e:
+            logger.warning("job %s %s failed (attempt %d): %s", job["type"], job["_id"], job["attempts"], e)
+            outcome = job_service.fail(job, self.owner, repr(e))
+        else:
+            outcome = job_service.DONE if job_service.complete(job["_id"], self.owner, result) else None
+
+        outcome = {job_service.QUEUED: "retry", None: "lease_lost"}.get(outcome, outcome)
+
+        stats = self.stats.setdefault(job["type"], {"done": 0, "retry": 0, "failed": 0, "lease_lost": 0, "seconds": 0.0})
+        stats[outcome] += 1
+        stats["seconds"] += seconds
+
+        record_job(job["type"], outcome, seconds)
+
+    def _replace_executor(self):
+        broken, self._executor = self._executor, self.executor_factory()
+        broken.shutdown(wait=False)
+
+    # -------------------------------
+    # HEARTBEATS
+    # -------------------------------
+    def _heartbeats(self):
+        # Keeps going while stop() drains the jobs in flight
+        while not self._stopped.wait(self.heartbeat_seconds):
+            self.send_heartbeats()
+
+    def send_heartbeats(self):
+        """
+        Extend the lease of every job in flight that is within its max runtime
+        """
+
+        now = time.perf_counter()
+
+        with self._lock:
+            jobs = [(job, now - started) for job, started, _ in self._inflight.values()]
+
+        for job, elapsed in jobs:
+            if job["_id"] in self._overrun:
+                continue
+
+            if elapsed > self.max_runtime.get(job["type"], self.default_max_runtime):
+                logger.error("%s %s exceeded its max runtime (%.0fs), letting its lease expire", job["type"], job["_id"], elapsed)
+                self._overrun.add(job["_id"])
+                continue
+
+            try:
+                if not job_service.heartbeat(job["_id"], self.owner, self.lease_seconds):
+                    logger.warning("lost lease on %s %s", job["type"], job["_id"])
+            except PyMongoError:
+                logger.exception("heartbeat for %s failed", job["_id"])
+
+    def throughput(self, elapsed):
+        """
+        Jobs finished per second per job type over `elapsed` seconds
+        """
+
+        return {
+            job_type: round(stats["done"] / elapsed, 3) if elapsed > 0 else None
+            for job_type, stats in self.stats.items()
+        }
@@ -0,0 +1,263 @@
+import threading
+import time
+
+from flask import g, request
+from prometheus_client import Counter, Histogram
+from pymongo import monitoring
+
+from db import mongo
+
+
+# Multiprocess mode (gunicorn): set PROMETHEUS_MULTIPROC_DIR before the
+# workers start and every metric below is written to per-process files
+# that /metrics merges. Only Counters and Histograms are used, so no
+# Gauge aggregation mode has to be chosen.
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+COMMAND_BUCKETS = (0.0002, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Flask request latency by blueprint and route",
+    ("blueprint", "route", "method", "status"),
+    buckets=REQUEST_BUCKETS
+)
+
+REQUEST_STAGE_LATENCY = Histogram(
+    "http_request_stage_duration_seconds",
+    "Time spent per request in JWT verification, the NGO principal lookup and MongoDB",
+    ("route", "stage"),
+    buckets=REQUEST_BUCKETS
+)
+
+REQUEST_EXCEPTIONS = Counter(
+    "http_request_exceptions_total",
+    "Unhandled exceptions turned into 500 responses",
+    ("route", "exception")
+)
+
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency as reported by the driver",
+    ("command", "collection"),
+    buckets=COMMAND_BUCKETS
+)
+
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error",
+    ("command", "collection")
+)
+
+# Hit ratio: rate(cache_requests_total{result="hit"}) / rate(cache_requests_total)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache and result (hit | miss)",
+    ("cache", "result")
+)
+
+JOB_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+# Throughput per type: rate(job_duration_seconds_count{outcome="done"})
+JOB_DURATION = Histogram(
+    "job_duration_seconds",
+    "Background job run time by type and outcome (done | retry | failed | lease_lost)",
+    ("job_type", "outcome"),
+    buckets=JOB_BUCKETS
+)
+
+JOB_QUEUE_DELAY = Histogram(
+    "job_queue_delay_seconds",
+    "Time from a job becoming due to a worker claiming it",
+    ("job_type",),
+    buckets=JOB_BUCKETS
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+_enabled = True
+_skip_paths = frozenset(("/metrics",))
+
+# Per-thread accumulators for the request being served (Flask sync
+# workers serve one request per thread at a time)
+_local = threading.local()
+
+# Bound histogram children, so the hot path skips labels() locking
+_request_children = {}
+_stage_children = {}
+
+
+# ---------------------------------------------------
+# SETUP
+# ---------------------------------------------------
+def init_app(app):
+    """
+    Time every request and MongoDB command unless METRICS_ENABLED
+    is false. /metrics itself is not timed.
+    """
+
+    global _enabled
+
+    _enabled = app.config.get("METRICS_ENABLED", True)
+
+    if not _enabled:
+        return
+
+    mongo.add_event_listener(command_listener)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def enabled():
+    return _enabled
+
+
+def _child(cache, metric, labels):
+    child = cache.get(labels)
+
+    if child is None:
+        child = cache[labels] = metric.labels(*labels)
+
+    return child
+
+
+# ---------------------------------------------------
+# REQUEST TIMING
+# ---------------------------------------------------
+def _start_request():
+    if request.path in _skip_paths:
+        return
+
+    _local.stages = {}
+    g.metrics_started = time.perf_counter()
+
+
+def _finish_request(response):
+    started = g.pop("metrics_started", None)
+
+    if started is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    rule = request.url_rule
+    route = rule.rule if rule is not None else UNMATCHED_ROUTE
+
+    _child(_request_children, REQUEST_LATENCY, (
+        request.blueprint or "",
+        route,
+        request.method,
+        str(response.status_code)
+    )).observe(elapsed)
+
+    stages, _local.stages = _local.stages, None
+
+    for stage, seconds in stages.items():
+        _child(_stage_children, REQUEST_STAGE_LATENCY, (route, stage)).observe(seconds)
+
+    return response
+
+
+def record_stage(stage, seconds):
+    """
+    Add time to a named stage of the current request
+    (no-op outside a timed request)
+    """
+
+    stages = getattr(_local, "stages", None)
+
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+class timed_stage:
+    """
+    Context manager: with timed_stage("jwt_verify"): ...
+    """
+
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        record_stage(self.stage, time.perf_counter() - self.started)
+
+
+def record_exception(error):
+    rule = request.url_rule
+
+    REQUEST_EXCEPTIONS.labels(
+        rule.rule if rule is not None else UNMATCHED_ROUTE,
+        type(error).__name__
+    ).inc()
+
+
+# ---------------------------------------------------
+# CACHE
+# ---------------------------------------------------
+_cache_children = {}
+
+
+def record_cache(cache, hit):
+    if _enabled:
+        _child(_cache_children, CACHE_REQUESTS, (cache, "hit" if hit else "miss")).inc()
+
+
+# ---------------------------------------------------
+# MONGODB COMMANDS
+# ---------------------------------------------------
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    pymongo CommandListener feeding the command histogram, and the
+    "mongo" stage of the request running in the same thread.
+
+    The collection name only appears on the started event, so it is
+    held by (connection, request id) until the command completes.
+    """
+
+    def __init__(self):
+        self._collections = {}
+        self._children = {}
+
+    def started(self, event):
+        # getMore carries the cursor id under its name, the collection apart
+        collection = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+
+        if not isinstance(collection, str):
+            collection = ""
+
+        self._collections[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event):
+        seconds = event.duration_micros / 1e6
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+
+        _child(self._children, MONGO_COMMAND_LATENCY, (event.command_name, collection)).observe(seconds)
+        record_stage("mongo", seconds)
+
+    def failed(self, event):
+        seconds = event.duration_micros / 1e6
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+
+        MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+        record_stage("mongo", seconds)
+
+
+command_listener = MongoCommandListener()
+
+
+# ---------------------------------------------------
+# BACKGROUND JOBS
+# ---------------------------------------------------
+def record_job(job_type, outcome, seconds):
+    if _enabled:
+        JOB_DURATION.labels(job_type, outcome).observe(seconds)
+
+
+def record_job_claim(job_type, delay_seconds):
+    if _enabled:
+        JOB_QUEUE_DELAY.labels(job_type).observe(max(0.0, delay_seconds))
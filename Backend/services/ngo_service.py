@@ -1,7 +1,23 @@
-from flask import current_app
 from bson import ObjectId
 from datetime import datetime
 
+from db import mongo
+from services import revocation_service
+from services.metrics_service import record_cache
+from utils.cache import TTLCache
+
+
+# Authenticated NGO principals, keyed by NGO id.
+# Invalidation is per worker process, so the TTL bounds how long
+# other workers may keep serving a changed or deleted NGO.
+PRINCIPAL_CACHE_TTL_SECONDS = 30
+PRINCIPAL_CACHE_MAX_SIZE = 10000
+
+principal_cache = TTLCache(
+    max_size=PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=PRINCIPAL_CACHE_TTL_SECONDS
+)
+
 
 # ---------------------------------------------------
 # CREATE NGO (used during registration if needed)
@@ -11,8 +27,7 @@ def create_ngo(ngo_data):
     Inserts a new NGO into the database
     """
 
-    db = current_app.db
-    ngo_collection = db["ngos"]
+    ngo_collection = mongo.ngos()
 
     ngo_data["created_at"] = datetime.utcnow()
 
@@ -29,15 +44,38 @@ def get_ngo_by_email(email):
     Fetch NGO using email
     """
 
-    db = current_app.db
-    ngo_collection = db["ngos"]
+    ngo_collection = mongo.ngos()
+
+    return ngo_collection.find_one({"email": email})
+
+
+# ---------------------------------------------------
+# LOGIN CREDENTIALS
+# ---------------------------------------------------
+def get_ngo_credentials(email):
+    """
+    Only the password hash, name (token claim) and _id of the NGO
+    with this email. Served by the unique email index.
+    """
+
+    ngo_collection = mongo.ngos()
+
+    return ngo_collection.find_one({"email": email}, {"password": 1, "ngo_name": 1})
+
+
+def replace_password_hash(ngo_id, old_hash, new_hash):
+    """
+    Swap in a rehashed password, unless it changed in the meantime
+    """
 
-    ngo = ngo_collection.find_one({"email": email})
+    ngo_collection = mongo.ngos()
 
-    if ngo:
-        ngo["_id"] = str(ngo["_id"])
+    result = ngo_collection.update_one(
+        {"_id": ObjectId(ngo_id), "password": old_hash},
+        {"$set": {"password": new_hash}}
+    )
 
-    return ngo
+    return result.modified_count
 
 
 # ---------------------------------------------------
@@ -48,15 +86,47 @@ def get_ngo_by_id(ngo_id):
     Fetch NGO using Mongo ObjectId
     """
 
-    db = current_app.db
-    ngo_collection = db["ngos"]
+    ngo_collection = mongo.ngos()
 
-    ngo = ngo_collection.find_one({"_id": ObjectId(ngo_id)})
+    return ngo_collection.find_one({"_id": ObjectId(ngo_id)})
 
-    if ngo:
-        ngo["_id"] = str(ngo["_id"])
 
-    return ngo
+# ---------------------------------------------------
+# GET NGO PRINCIPAL (used by auth middleware)
+# ---------------------------------------------------
+def get_ngo_principal(ngo_id):
+    """
+    Minimal NGO identity attached to authenticated requests.
+    Served from the principal cache; falls back to MongoDB on a miss.
+    """
+
+    principal = principal_cache.get(ngo_id)
+
+    record_cache("principal", principal is not None)
+
+    if principal is not None:
+        return principal
+
+    ngo_collection = mongo.ngos()
+
+    ngo = ngo_collection.find_one(
+        {"_id": ObjectId(ngo_id)},
+        {"ngo_name": 1, "email": 1, "phone": 1}
+    )
+
+    if not ngo:
+        return None
+
+    principal = {
+        "id": str(ngo["_id"]),
+        "ngo_name": ngo.get("ngo_name"),
+        "email": ngo.get("email"),
+        "phone": ngo.get("phone")
+    }
+
+    principal_cache.set(ngo_id, principal)
+
+    return principal
 
 
 # ---------------------------------------------------
@@ -67,14 +137,15 @@ def update_ngo_profile(ngo_id, update_data):
     Update NGO details like name, phone etc.
     """
 
-    db = current_app.db
-    ngo_collection = db["ngos"]
+    ngo_collection = mongo.ngos()
 
     result = ngo_collection.update_one(
         {"_id": ObjectId(ngo_id)},
         {"$set": update_data}
     )
 
+    principal_cache.invalidate(ngo_id)
+
     return result.modified_count
 
 
@@ -86,11 +157,16 @@ def delete_ngo(ngo_id):
     Deletes an NGO from database
     """
 
-    db = current_app.db
-    ngo_collection = db["ngos"]
+    ngo_collection = mongo.ngos()
 
     result = ngo_collection.delete_one({"_id": ObjectId(ngo_id)})
 
+    principal_cache.invalidate(ngo_id)
+
+    # Tokens carry the NGO's claims; reject the ones already issued
+    if result.deleted_count:
+        revocation_service.revoke_ngo(ngo_id)
+
     return result.deleted_count
 
 
@@ -102,12 +178,6 @@ def list_all_ngos():
     Returns all NGOs in the system
     """
 
-    db = current_app.db
-    ngo_collection = db["ngos"]
-
-    ngos = list(ngo_collection.find())
-
-    for ngo in ngos:
-        ngo["_id"] = str(ngo["_id"])
+    ngo_collection = mongo.ngos()
 
-    return ngos
+    return list(ngo_collection.find())
@@ -0,0 +1,396 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from db import mongo
+from utils.geo_helpers import geohash_encode, point_lat_lon
+
+
+logger = logging.getLogger(__name__)
+
+# Tile size for subscriptions (~39 x 19.5 km)
+TILE_PRECISION = 4
+
+# Pending deltas kept per subscriber; older ones are dropped and the
+# subscriber is told to resync
+SUBSCRIBER_QUEUE_SIZE = 64
+
+POLL_INTERVAL_SECONDS = 1.0
+
+# Only these fields produce deltas
+WATCHED_FIELDS = ("available_beds", "emergency_mode")
+
+DELTA_PROJECTION = {"location": 1, "available_beds": 1, "emergency_mode": 1, "version": 1}
+
+
+# ---------------------------------------------------
+# SUBSCRIBER
+# ---------------------------------------------------
+class Subscriber:
+    """
+    One connected client. Holds a bounded queue of pending deltas.
+    """
+
+    __slots__ = ("tiles", "queue", "overflowed", "_ready")
+
+    def __init__(self, tiles):
+        self.tiles = frozenset(tiles)
+        self.queue = deque(maxlen=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+        self._ready = threading.Event()
+
+    def push(self, delta):
+        if len(self.queue) == self.queue.maxlen:
+            self.overflowed = True
+
+        self.queue.append(delta)
+        self._wake()
+
+    def _wake(self):
+        self._ready.set()
+
+    def drain(self, timeout=None):
+        """
+        Wait up to timeout for deltas and return them all.
+        Returns (deltas, overflowed).
+        """
+
+        if not self.queue:
+            self._ready.wait(timeout)
+
+        self._ready.clear()
+
+        return self._take()
+
+    def _take(self):
+        deltas = []
+
+        while self.queue:
+            deltas.append(self.queue.popleft())
+
+        overflowed, self.overflowed = self.overflowed, False
+
+        return deltas, overflowed
+
+
+class AsyncSubscriber(Subscriber):
+    """
+    Subscriber for a connection served on an event loop (asgi.py).
+    Deltas are pushed from the change feed thread, so the wakeup is
+    handed to the loop instead of blocking a thread per connection.
+    """
+
+    __slots__ = ("_loop",)
+
+    def __init__(self, tiles, loop):
+        super().__init__(tiles)
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def _wake(self):
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Loop already closed; the connection is gone
+            pass
+
+    async def drain_async(self, timeout=None):
+        """
+        drain() without blocking the loop
+        """
+
+        expired = []
+
+        def expire():
+            expired.append(True)
+            self._ready.set()
+
+        timer = self._loop.call_later(timeout, expire) if timeout is not None else None
+
+        try:
+            # A wakeup scheduled for deltas already taken can still
+            # arrive, so check the queue again after every wakeup
+            while not self.queue and not expired:
+                self._ready.clear()
+                await self._ready.wait()
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+        return self._take()
+
+
+# ---------------------------------------------------
+# BROKER (FAN-OUT BY TILE)
+# ---------------------------------------------------
+class BedUpdateBroker:
+    """
+    Routes shelter deltas to subscribers of the shelter's tile.
+    The change feed is started lazily on first subscribe, so it
+    always runs inside the worker process.
+    """
+
+    def __init__(self, feed_factory=None):
+        self._tiles = {}
+        self._lock = threading.Lock()
+        self._feed_factory = feed_factory or ChangeFeed
+        self._feed = None
+        self.published = 0
+        self.delivered = 0
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._tiles.values())
+
+    def subscribe(self, tiles, loop=None):
+        """
+        Pass the running event loop to get an AsyncSubscriber
+        """
+
+        subscriber = Subscriber(tiles) if loop is None else AsyncSubscriber(tiles, loop)
+
+        with self._lock:
+            for tile in subscriber.tiles:
+                self._tiles.setdefault(tile, set()).add(subscriber)
+
+        self._ensure_feed()
+
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            for tile in subscriber.tiles:
+                subscribers = self._tiles.get(tile)
+
+                if subscribers is None:
+                    continue
+
+                subscribers.discard(subscriber)
+
+                if not subscribers:
+                    del self._tiles[tile]
+
+    def publish(self, delta):
+        with self._lock:
+            subscribers = list(self._tiles.get(delta["tile"], ()))
+
+        for subscriber in subscribers:
+            subscriber.push(delta)
+
+        self.published += 1
+        self.delivered += len(subscribers)
+
+    def _ensure_feed(self):
+        if self._feed is not None:
+            return
+
+        with self._lock:
+            if self._feed is None:
+                self._feed = self._feed_factory(self.publish)
+                self._feed.start()
+
+    def stop(self):
+        if self._feed is not None:
+            self._feed.stop()
+            self._feed = None
+
+
+# ---------------------------------------------------
+# DELTAS
+# ---------------------------------------------------
+def make_delta(shelter):
+    """
+    Compact delta for a shelter document, or None without a location
+    """
+
+    coordinates = point_lat_lon(shelter.get("location"))
+
+    if coordinates is None:
+        return None
+
+    return {
+        "id": str(shelter["_id"]),
+        "tile": geohash_encode(coordinates[0], coordinates[1], TILE_PRECISION),
+        "available_beds": shelter.get("available_beds"),
+        "emergency_mode": bool(shelter.get("emergency_mode", False)),
+        "version": shelter.get("version", 0)
+    }
+
+
+# ---------------------------------------------------
+# CHANGE FEED (CHANGE STREAM, POLLING FALLBACK)
+# ---------------------------------------------------
+class ChangeFeed:
+    """
+    Tails the shelters collection and calls publish(delta) for every
+    change to a watched field.
+
+    Uses a change stream when the server supports one (replica set or
+    sharded cluster). Falls back to polling updated_at on standalone
+    servers and mongomock. Subclasses change what is watched through
+    _pipeline / _on_change and _poll.
+    """
+
+    def __init__(self, publish, poll_interval=POLL_INTERVAL_SECONDS):
+        self._publish = publish
+        self._poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._resume_token = None
+        self.mode = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="shelter-change-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._watch()
+            # OperationFailure: standalone mongod; TypeError/NotImplementedError: mongomock
+            except (OperationFailure, NotImplementedError, TypeError) as e:
+                logger.info("change streams unavailable (%s), polling instead", e)
+                self._poll()
+                return
+            except PyMongoError:
+                logger.exception("change stream failed, resuming")
+                self._stop.wait(self._poll_interval)
+
+    def _pipeline(self):
+        watched = [f"updateDescription.updatedFields.{field}" for field in WATCHED_FIELDS]
+
+        return [
+            {"$match": {
+                "$or": [
+                    {"operationType": {"$in": ["insert", "replace"]}},
+                    {"operationType": "update", "$or": [{field: {"$exists": True}} for field in watched]}
+                ]
+            }},
+            {"$project": {"fullDocument": {"_id": 1, **DELTA_PROJECTION}}}
+        ]
+
+    def _on_change(self, change):
+        shelter = change.get("fullDocument")
+
+        if shelter:
+            self._emit(shelter)
+
+    def _watch(self):
+        shelter_collection = mongo.shelters()
+
+        with shelter_collection.watch(
+            self._pipeline(),
+            full_document="updateLookup",
+            resume_after=self._resume_token,
+            max_await_time_ms=1000
+        ) as stream:
+            self.mode = "change_stream"
+
+            while not self._stop.is_set():
+                change = stream.try_next()
+
+                if change is None:
+                    continue
+
+                self._resume_token = stream.resume_token
+                self._on_change(change)
+
+    def _poll(self):
+        self.mode = "polling"
+
+        shelter_collection = mongo.shelters()
+
+        known = {}
+        last_seen = datetime.utcnow()
+
+        while not self._stop.wait(self._poll_interval):
+            try:
+                changed = list(shelter_collection.find(
+                    {"updated_at": {"$gte": last_seen}},
+                    {**DELTA_PROJECTION, "updated_at": 1}
+                ))
+            except PyMongoError:
+                logger.exception("change poll failed")
+                continue
+
+            for shelter in changed:
+                last_seen = max(last_seen, shelter["updated_at"])
+                state = tuple(shelter.get(field) for field in WATCHED_FIELDS)
+
+                # updated_at also moves for unwatched fields; skip those
+                if known.get(shelter["_id"]) == state:
+                    continue
+
+                known[shelter["_id"]] = state
+                self._emit(shelter)
+
+    def _emit(self, shelter):
+        delta = make_delta(shelter)
+
+        if delta is not None:
+            self._publish(delta)
+
+
+# Process-wide broker shared by all stream connections in this worker
+broker = BedUpdateBroker()
+
+
+# ---------------------------------------------------
+# SSE STREAM
+# ---------------------------------------------------
+def sse_events(deltas, overflowed):
+    """
+    SSE frames for one drain: a "resync" event if deltas were dropped,
+    a "beds" event per delta, or a comment heartbeat if nothing came
+    """
+
+    events = []
+
+    if overflowed:
+        events.append("event: resync\ndata: {}\n\n")
+
+    for delta in deltas:
+        events.append(f"event: beds\ndata: {json.dumps(delta, separators=(',', ':'))}\n\n")
+
+    if not events:
+        events.append(": ping\n\n")
+
+    return events
+
+
+def iter_sse(subscriber, heartbeat_seconds=15.0):
+    """
+    Server-sent events for one subscriber. Blocks its thread between
+    events (Flask route).
+    """
+
+    try:
+        yield ": connected\n\n"
+
+        while True:
+            yield from sse_events(*subscriber.drain(heartbeat_seconds))
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+async def aiter_sse(subscriber, heartbeat_seconds=15.0):
+    """
+    iter_sse for an AsyncSubscriber (ASGI route)
+    """
+
+    try:
+        yield ": connected\n\n"
+
+        while True:
+            for event in sse_events(*await subscriber.drain_async(heartbeat_seconds)):
+                yield event
+    finally:
+        broker.unsubscribe(subscriber)
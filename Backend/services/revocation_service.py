@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import PyMongoError
+
+from db import mongo
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------
+# TOKEN REVOCATION (IN-MEMORY DENYLIST)
+# ---------------------------------------------------
+# Revocations live in the small revoked_tokens collection:
+#   {_id: "jti:<jti>" | "ngo:<ngo_id>", revoked_at, expires_at}
+#
+# "jti:" revokes one token (logout). "ngo:" revokes every token of an
+# NGO issued before revoked_at (NGO deleted). expires_at is when the
+# last affected token expires anyway; a TTL index drops the entry from
+# the collection then.
+#
+# Each worker keeps the entries in memory and pulls new ones at most
+# every refresh_seconds, so checking a token is two dict lookups and
+# no database read. A revocation made in this process applies at once;
+# in other workers within refresh_seconds. The TTL index does not
+# reach these copies: each refresh prunes the entries past expires_at.
+
+JTI_PREFIX = "jti:"
+NGO_PREFIX = "ngo:"
+
+DEFAULT_REFRESH_SECONDS = 5
+DEFAULT_TOKEN_LIFETIME = timedelta(minutes=15)
+
+
+def _epoch(value):
+    # Stored datetimes are naive UTC
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class Denylist:
+    def __init__(self, refresh_seconds=DEFAULT_REFRESH_SECONDS, clock=time.monotonic):
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+
+        # jti -> expires_at, ngo_id -> (revoked_at, expires_at), epoch seconds
+        self.tokens = {}
+        self.ngos = {}
+
+        self._synced_until = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self.tokens = {}
+            self.ngos = {}
+            self._synced_until = None
+            self._next_refresh = 0.0
+
+    def add(self, entry):
+        with self._lock:
+            self._add(entry)
+
+    def _add(self, entry):
+        key = entry["_id"]
+        expires_at = _epoch(entry["expires_at"])
+
+        if key.startswith(JTI_PREFIX):
+            self.tokens[key[len(JTI_PREFIX):]] = expires_at
+        elif key.startswith(NGO_PREFIX):
+            ngo_id = key[len(NGO_PREFIX):]
+            revoked_at, previous_expiry = self.ngos.get(ngo_id, (0, 0))
+            self.ngos[ngo_id] = (max(revoked_at, _epoch(entry["revoked_at"])), max(expires_at, previous_expiry))
+
+    def _prune(self):
+        # Tokens past expires_at fail verification anyway
+        now = time.time()
+
+        self.tokens = {jti: expires_at for jti, expires_at in self.tokens.items() if expires_at > now}
+        self.ngos = {ngo_id: entry for ngo_id, entry in self.ngos.items() if entry[1] > now}
+
+    def refresh(self, force=False):
+        """
+        Pull entries revoked since the last sync (one indexed read).
+        Only one thread refreshes; the others keep using the snapshot,
+        except before the first load, which every caller waits for.
+        """
+
+        now = self.clock()
+
+        if not force and now < self._next_refresh:
+            return
+
+        if not self._lock.acquire(blocking=force or self._synced_until is None):
+            return
+
+        try:
+            self._next_refresh = now + self.refresh_seconds
+
+            query = {"expires_at": {"$gt": datetime.utcnow()}}
+
+            if self._synced_until is not None:
+                # Overlap a little: entries can commit slightly out of order
+                query["revoked_at"] = {"$gte": self._synced_until - timedelta(seconds=self.refresh_seconds)}
+
+            latest = self._synced_until
+
+            self._prune()
+
+            try:
+                for entry in mongo.revoked_tokens().find(query):
+                    self._add(entry)
+
+                    if latest is None or entry["revoked_at"] > latest:
+                        latest = entry["revoked_at"]
+
+            except PyMongoError:
+                # Keep serving the last snapshot; signatures are still checked
+                logger.warning("revocation refresh failed", exc_info=True)
+                return
+
+            self._synced_until = latest or datetime.utcnow()
+
+        finally:
+            self._lock.release()
+
+    def is_revoked(self, payload):
+        self.refresh()
+
+        if payload.get("jti") in self.tokens:
+            return True
+
+        revoked = self.ngos.get(payload.get("sub"))
+
+        # Same-second tokens count as revoked: iat has 1 s resolution
+        return revoked is not None and payload.get("iat", 0) <= revoked[0]
+
+
+denylist = Denylist()
+_token_lifetime = DEFAULT_TOKEN_LIFETIME
+
+
+def init_app(app, jwt):
+    global _token_lifetime
+
+    denylist.refresh_seconds = app.config.get("REVOCATION_REFRESH_SECONDS", DEFAULT_REFRESH_SECONDS)
+    _token_lifetime = app.config.get("JWT_ACCESS_TOKEN_EXPIRES") or DEFAULT_TOKEN_LIFETIME
+    denylist.clear()
+
+    jwt.token_in_blocklist_loader(is_token_revoked)
+
+
+def is_token_revoked(jwt_header, jwt_payload):
+    """
+    flask_jwt_extended token_in_blocklist_loader callback
+    """
+
+    return denylist.is_revoked(jwt_payload)
+
+
+# ---------------------------------------------------
+# REVOKE
+# ---------------------------------------------------
+def _revoke(key, expires_at):
+    now = datetime.utcnow()
+    entry = {"_id": key, "revoked_at": now, "expires_at": expires_at}
+
+    mongo.revoked_tokens().replace_one({"_id": key}, entry, upsert=True)
+    denylist.add(entry)
+
+
+def revoke_token(jti, expires):
+    """
+    Revoke one token (logout). `expires` is its exp claim.
+    """
+
+    _revoke(JTI_PREFIX + jti, datetime.fromtimestamp(expires, timezone.utc).replace(tzinfo=None))
+
+
+def revoke_ngo(ngo_id):
+    """
+    Revoke every token issued to an NGO so far
+    """
+
+    _revoke(NGO_PREFIX + str(ngo_id), datetime.utcnow() + _token_lifetime)
@@ -0,0 +1,704 @@
+import hashlib
+import heapq
+import logging
+import math
+import os
+import threading
+from datetime import timedelta
+
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from db import mongo
+from services.realtime_service import POLL_INTERVAL_SECONDS, ChangeFeed
+from utils.geo_helpers import KM_PER_DEGREE, geohash_encode, haversine_km, point_lat_lon
+from utils.time_helpers import now_ms
+
+
+logger = logging.getLogger(__name__)
+
+# Grid cell size in degrees (~11 km of latitude)
+DEFAULT_CELL_SIZE_DEG = 0.1
+
+# Geohash tiles for public tile responses (~4.9 x 4.9 km)
+SEARCH_TILE_PRECISION = 5
+
+# Index-only bookkeeping, not part of search results
+INTERNAL_KEYS = ("cell", "tile", "updated_at")
+
+# Fields needed to answer nearest-shelter queries without a DB read
+INDEX_PROJECTION = {
+    "name": 1,
+    "location": 1,
+    "available_beds": 1,
+    "emergency_mode": 1,
+    "gender": 1,
+    "pet_friendly": 1,
+    "accessibility": 1,
+    "is_24_hour": 1,
+    "updated_at": 1
+}
+
+# Polling re-reads this far behind the newest updated_at it has seen:
+# updated_at is stamped before the write commits, so commits can land
+# out of order
+POLL_LOOKBACK = timedelta(seconds=2)
+
+
+_settings = {
+    "live_updates": False,
+    "refresh_seconds": 60.0
+}
+
+# This process's change feed and reload thread (see start_live_updates)
+_live = {"pid": None, "feed": None, "stop": None}
+_live_lock = threading.Lock()
+
+
+# ---------------------------------------------------
+# GRID BUCKET INDEX
+# ---------------------------------------------------
+class ShelterGeoIndex:
+    """
+    In-memory spatial index of shelter coordinates.
+
+    Shelters are bucketed into fixed-size lat/lon grid cells.
+    Nearest queries walk rings of cells outward from the origin
+    and stop once no unvisited cell can hold a closer shelter.
+    """
+
+    def __init__(self, cell_size_deg=DEFAULT_CELL_SIZE_DEG):
+        self.cell_size = cell_size_deg
+        self.rows = int(math.ceil(180.0 / cell_size_deg))
+        self.cols = int(math.ceil(360.0 / cell_size_deg))
+
+        self._cells = {}
+        self._entries = {}
+
+        # geohash tile -> {shelter_id: entry}, and when a shelter last left it
+        self._tiles = {}
+        self._tile_removed = {}
+
+        self._lock = threading.RLock()
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -------------------------------
+    # CELL HELPERS
+    # -------------------------------
+    def _cell_for(self, lat, lon):
+        row = int((lat + 90.0) // self.cell_size)
+        col = int((lon + 180.0) // self.cell_size)
+
+        return min(max(row, 0), self.rows - 1), col % self.cols
+
+    def _ring(self, row, col, radius):
+        """
+        Yield cells whose Chebyshev distance from (row, col) is exactly radius
+        """
+
+        if radius == 0:
+            yield row, col
+            return
+
+        seen = set()
+
+        for d_row in range(-radius, radius + 1):
+            r = row + d_row
+
+            if r < 0 or r >= self.rows:
+                continue
+
+            if abs(d_row) == radius:
+                d_cols = range(-radius, radius + 1)
+            else:
+                d_cols = (-radius, radius)
+
+            for d_col in d_cols:
+                cell = (r, (col + d_col) % self.cols)
+
+                # Rings wider than the globe wrap onto themselves
+                if cell not in seen:
+                    seen.add(cell)
+                    yield cell
+
+    def _ring_lower_bound_km(self, lat, radius):
+        """
+        Minimum distance from the origin to any cell in ring `radius + 1`
+        """
+
+        span_deg = radius * self.cell_size
+        pole_lat = min(abs(lat) + span_deg + self.cell_size, 90.0)
+
+        return span_deg * KM_PER_DEGREE * math.cos(math.radians(pole_lat))
+
+    # -------------------------------
+    # MUTATIONS
+    # -------------------------------
+    def clear(self):
+        with self._lock:
+            self._cells = {}
+            self._entries = {}
+            self._tiles = {}
+            self._tile_removed = {}
+            self.loaded = False
+
+    def upsert(self, shelter):
+        """
+        Insert or replace a shelter document in the index.
+        Shelters without a valid location are dropped from the index.
+        """
+
+        shelter_id = str(shelter["_id"])
+        coordinates = point_lat_lon(shelter.get("location"))
+
+        with self._lock:
+            self._discard(shelter_id)
+
+            if coordinates is None:
+                return False
+
+            lat, lon = coordinates
+
+            entry = {
+                "_id": shelter_id,
+                "name": shelter.get("name"),
+                "lat": lat,
+                "lon": lon,
+                "available_beds": shelter.get("available_beds", 0),
+                "emergency_mode": bool(shelter.get("emergency_mode", False)),
+                "gender": shelter.get("gender", "all"),
+                "pet_friendly": bool(shelter.get("pet_friendly", False)),
+                "accessibility": bool(shelter.get("accessibility", False)),
+                "is_24_hour": bool(shelter.get("is_24_hour", False)),
+                "updated_at": shelter.get("updated_at") or now_ms(),
+                "cell": self._cell_for(lat, lon),
+                "tile": geohash_encode(lat, lon, SEARCH_TILE_PRECISION)
+            }
+
+            self._entries[shelter_id] = entry
+            self._cells.setdefault(entry["cell"], {})[shelter_id] = entry
+            self._tiles.setdefault(entry["tile"], {})[shelter_id] = entry
+
+        return True
+
+    def update_fields(self, shelter_id, updated_at=None, **fields):
+        """
+        Update non-spatial attributes in place (no re-bucketing needed)
+        """
+
+        with self._lock:
+            entry = self._entries.get(str(shelter_id))
+
+            if entry is None:
+                return False
+
+            entry.update(fields)
+            entry["updated_at"] = updated_at or now_ms()
+
+        return True
+
+    def get(self, shelter_id):
+        """
+        The entry of a shelter (not a copy), or None
+        """
+
+        return self._entries.get(str(shelter_id))
+
+    def remove(self, shelter_id):
+        with self._lock:
+            return self._discard(str(shelter_id))
+
+    def _discard(self, shelter_id):
+        entry = self._entries.pop(shelter_id, None)
+
+        if entry is None:
+            return False
+
+        bucket = self._cells.get(entry["cell"])
+
+        if bucket is not None:
+            bucket.pop(shelter_id, None)
+
+            if not bucket:
+                del self._cells[entry["cell"]]
+
+        tile = self._tiles.get(entry["tile"])
+
+        if tile is not None:
+            tile.pop(shelter_id, None)
+
+            if not tile:
+                del self._tiles[entry["tile"]]
+
+        # A removal changes the tile without leaving an updated_at behind
+        self._tile_removed[entry["tile"]] = now_ms()
+
+        return True
+
+    # -------------------------------
+    # QUERIES
+    # -------------------------------
+    def snapshot(self, **filters):
+        """
+        Copies of all entries matching filters (for batch scoring)
+        """
+
+        with self._lock:
+            return [
+                _result(entry, None)
+                for entry in self._entries.values()
+                if _matches(entry, filters)
+            ]
+
+    def tile_version(self, tile):
+        """
+        (content digest, last change) of a geohash tile, without copying
+        entries. The digest covers the id and updated_at of every entry,
+        so two indexes give the same digest only when they hold the same
+        version of each shelter. Last change is the newest updated_at in
+        the tile, or the last removal from it; None for a tile that
+        never had shelters.
+        """
+
+        with self._lock:
+            entries = self._tiles.get(tile, {})
+            versions = sorted((shelter_id, entry["updated_at"]) for shelter_id, entry in entries.items())
+
+            stamps = [updated_at for _, updated_at in versions]
+
+            if tile in self._tile_removed:
+                stamps.append(self._tile_removed[tile])
+
+        digest = hashlib.sha1(
+            "|".join(f"{shelter_id}@{updated_at.isoformat()}" for shelter_id, updated_at in versions).encode()
+        ).hexdigest()
+
+        return digest, max(stamps, default=None)
+
+    def in_tile(self, tile, **filters):
+        """
+        Shelters in a geohash tile matching filters, ordered by id
+        (no distances: the response is shared by every origin in the tile)
+        """
+
+        with self._lock:
+            entries = sorted(self._tiles.get(tile, {}).values(), key=lambda entry: entry["_id"])
+
+            return [
+                {key: value for key, value in entry.items() if key not in ("cell", "tile")}
+                for entry in entries
+                if _matches(entry, filters)
+            ]
+
+    def nearest(self, lat, lon, k=10, max_distance_km=None, **filters):
+        """
+        k nearest shelters matching filters, sorted by distance
+        """
+
+        if k <= 0:
+            return []
+
+        with self._lock:
+            row, col = self._cell_for(lat, lon)
+            max_radius = max(self.rows, self.cols // 2)
+
+            # Max-heap of (-distance, shelter_id, entry) holding the best k
+            best = []
+            radius = 0
+
+            while radius <= max_radius:
+                # A ring this wide costs more than scanning what's left
+                if radius > 0 and 8 * radius > len(self._cells):
+                    self._scan((row, col), radius - 1, lat, lon, k, max_distance_km, filters, best)
+                    break
+
+                for cell in self._ring(row, col, radius):
+                    bucket = self._cells.get(cell)
+
+                    if bucket:
+                        self._collect(bucket.values(), lat, lon, k, max_distance_km, filters, best)
+
+                bound = self._ring_lower_bound_km(lat, radius)
+
+                if max_distance_km is not None and bound > max_distance_km:
+                    break
+
+                if len(best) == k and -best[0][0] <= bound:
+                    break
+
+                radius += 1
+
+            return self._finish(best)
+
+    def within_radius(self, lat, lon, radius_km, limit=None, **filters):
+        """
+        All shelters within radius_km matching filters, sorted by distance
+        """
+
+        with self._lock:
+            lat_span = radius_km / KM_PER_DEGREE
+            edge_lat = min(abs(lat) + lat_span, 89.999)
+            lon_span = lat_span / max(math.cos(math.radians(edge_lat)), 1e-6)
+
+            row_lo, _ = self._cell_for(lat - lat_span, lon)
+            row_hi, _ = self._cell_for(lat + lat_span, lon)
+            col_span = int(math.ceil(lon_span / self.cell_size)) + 1
+            _, col = self._cell_for(lat, lon)
+
+            box_cells = (row_hi - row_lo + 1) * min(2 * col_span + 1, self.cols)
+
+            if box_cells > len(self._cells):
+                candidates = (
+                    entry
+                    for bucket in self._cells.values()
+                    for entry in bucket.values()
+                )
+            else:
+                cols = {
+                    (col + d_col) % self.cols
+                    for d_col in range(-col_span, col_span + 1)
+                }
+                candidates = (
+                    entry
+                    for r in range(row_lo, row_hi + 1)
+                    for c in cols
+                    for entry in self._cells.get((r, c), {}).values()
+                )
+
+            results = []
+
+            for entry in candidates:
+                if not _matches(entry, filters):
+                    continue
+
+                distance = haversine_km(lat, lon, entry["lat"], entry["lon"])
+
+                if distance <= radius_km:
+                    results.append((distance, entry))
+
+            results.sort(key=lambda item: item[0])
+
+            if limit is not None:
+                results = results[:limit]
+
+            return [_result(entry, distance) for distance, entry in results]
+
+    def _collect(self, entries, lat, lon, k, max_distance_km, filters, best):
+        for entry in entries:
+            if not _matches(entry, filters):
+                continue
+
+            distance = haversine_km(lat, lon, entry["lat"], entry["lon"])
+
+            if max_distance_km is not None and distance > max_distance_km:
+                continue
+
+            item = (-distance, entry["_id"], entry)
+
+            if len(best) < k:
+                heapq.heappush(best, item)
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, item)
+
+    def _scan(self, origin, visited_radius, lat, lon, k, max_distance_km, filters, best):
+        """
+        Finish a nearest query by scanning every cell outside the visited rings
+        """
+
+        row, col = origin
+
+        for (r, c), bucket in self._cells.items():
+            d_col = abs(c - col)
+            d_col = min(d_col, self.cols - d_col)
+
+            if max(abs(r - row), d_col) <= visited_radius:
+                continue
+
+            self._collect(bucket.values(), lat, lon, k, max_distance_km, filters, best)
+
+    @staticmethod
+    def _finish(best):
+        ordered = sorted(best, key=lambda item: -item[0])
+
+        return [_result(entry, -neg_distance) for neg_distance, _, entry in ordered]
+
+
+# ---------------------------------------------------
+# FILTER + RESULT HELPERS
+# ---------------------------------------------------
+def _matches(entry, filters):
+    """
+    Supported filters: available_only, emergency_mode, gender,
+    pet_friendly, accessibility, is_24_hour
+    """
+
+    if filters.get("available_only") and entry["available_beds"] <= 0:
+        return False
+
+    gender = filters.get("gender")
+
+    if gender and entry["gender"] not in (gender, "all"):
+        return False
+
+    for flag in ("emergency_mode", "pet_friendly", "accessibility", "is_24_hour"):
+        if filters.get(flag) and not entry[flag]:
+            return False
+
+    return True
+
+
+def _result(entry, distance):
+    result = {key: value for key, value in entry.items() if key not in INTERNAL_KEYS}
+    result["distance_km"] = distance
+
+    return result
+
+
+# Process-wide index shared by all requests in this worker
+shelter_index = ShelterGeoIndex()
+
+
+# ---------------------------------------------------
+# BUILD INDEX FROM DATABASE
+# ---------------------------------------------------
+def rebuild_index():
+    """
+    Load every shelter location into the in-memory index
+    """
+
+    shelter_collection = mongo.shelters_for_search()
+
+    fresh = ShelterGeoIndex(shelter_index.cell_size)
+
+    for shelter in shelter_collection.find({}, INDEX_PROJECTION):
+        fresh.upsert(shelter)
+
+    with shelter_index._lock:
+        shelter_index._cells = fresh._cells
+        shelter_index._entries = fresh._entries
+        shelter_index._tiles = fresh._tiles
+        shelter_index._tile_removed = fresh._tile_removed
+        shelter_index.loaded = True
+
+    return len(shelter_index)
+
+
+def _ensure_loaded():
+    if not shelter_index.loaded:
+        rebuild_index()
+
+    if _settings["live_updates"] and _live["pid"] != os.getpid():
+        start_live_updates()
+
+
+# ---------------------------------------------------
+# LIVE UPDATES (FLASK WORKERS)
+# ---------------------------------------------------
+# A write only reaches the index of the worker that handled it. Every
+# other worker applies the full document of each insert, update and
+# delete from an IndexFeed, plus a periodic reload as a backstop.
+# Started on first use, so always inside the worker after fork
+# (asgi.py runs its own, see async_app.AsyncReadApp.startup).
+
+def init_app(app):
+    _settings["live_updates"] = app.config.get("SEARCH_INDEX_LIVE_UPDATES", True)
+    _settings["refresh_seconds"] = app.config.get("SEARCH_INDEX_REFRESH_SECONDS", 60.0)
+
+
+def start_live_updates():
+    """
+    Start this process's change feed subscriber and reload thread
+    (once per process; a forked child starts its own)
+    """
+
+    with _live_lock:
+        if _live["pid"] == os.getpid():
+            return
+
+        feed = IndexFeed()
+        feed.start()
+
+        stop = threading.Event()
+        threading.Thread(target=_refresh_index, args=(stop,), name="search-index-refresh", daemon=True).start()
+
+        _live.update(pid=os.getpid(), feed=feed, stop=stop)
+
+
+def stop_live_updates():
+    with _live_lock:
+        if _live["pid"] != os.getpid():
+            return
+
+        _live["feed"].stop()
+        _live["stop"].set()
+        _live.update(pid=None, feed=None, stop=None)
+
+
+def _refresh_index(stop):
+    while not stop.wait(_settings["refresh_seconds"]):
+        try:
+            rebuild_index()
+        except Exception:
+            logger.exception("search index refresh failed")
+
+
+# ---------------------------------------------------
+# INCREMENTAL UPDATES (called from shelter_service)
+# ---------------------------------------------------
+def index_shelter(shelter_id):
+    """
+    Re-read one shelter and refresh its index entry
+    """
+
+    if not shelter_index.loaded:
+        return
+
+    shelter_collection = mongo.shelters()
+
+    shelter = shelter_collection.find_one({"_id": ObjectId(shelter_id)}, INDEX_PROJECTION)
+
+    if shelter:
+        shelter_index.upsert(shelter)
+    else:
+        shelter_index.remove(shelter_id)
+
+
+def update_indexed_beds(shelter_id, beds_count, updated_at=None):
+    shelter_index.update_fields(shelter_id, updated_at, available_beds=beds_count)
+
+
+def update_indexed_emergency(shelter_id, status, updated_at=None):
+    shelter_index.update_fields(shelter_id, updated_at, emergency_mode=bool(status))
+
+
+def unindex_shelter(shelter_id):
+    shelter_index.remove(shelter_id)
+
+
+def apply_document(shelter):
+    """
+    Upsert a shelter document (INDEX_PROJECTION fields) written by
+    another process, unless the index already holds a newer version
+    """
+
+    current = shelter_index.get(shelter["_id"])
+
+    if current and shelter.get("updated_at") and current["updated_at"] > shelter["updated_at"]:
+        return False
+
+    return shelter_index.upsert(shelter)
+
+
+# ---------------------------------------------------
+# INDEX FEED
+# ---------------------------------------------------
+class IndexFeed(ChangeFeed):
+    """
+    ChangeFeed for the search index: every insert, update, replace and
+    delete of a shelter, applied as a full document upsert or removal.
+    Polling falls back to updated_at for writes and the snapshot
+    tombstones for deletions.
+    """
+
+    def __init__(self, poll_interval=POLL_INTERVAL_SECONDS):
+        super().__init__(None, poll_interval)
+
+    def _pipeline(self):
+        return [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+            {"$project": {
+                "operationType": 1,
+                "documentKey": 1,
+                "fullDocument": {"_id": 1, **INDEX_PROJECTION}
+            }}
+        ]
+
+    def _on_change(self, change):
+        if change["operationType"] == "delete":
+            shelter_index.remove(change["documentKey"]["_id"])
+            return
+
+        # None when the shelter was deleted before the lookup; its delete follows
+        if change.get("fullDocument"):
+            apply_document(change["fullDocument"])
+
+    def _poll(self):
+        self.mode = "polling"
+
+        last_seen = last_deleted = now_ms()
+
+        while not self._stop.wait(self._poll_interval):
+            try:
+                for shelter in mongo.shelters().find({"updated_at": {"$gte": last_seen - POLL_LOOKBACK}}, INDEX_PROJECTION):
+                    apply_document(shelter)
+                    last_seen = max(last_seen, shelter["updated_at"])
+
+                for tombstone in mongo.shelter_tombstones().find({"deleted_at": {"$gte": last_deleted - POLL_LOOKBACK}}):
+                    shelter_index.remove(tombstone["_id"])
+                    last_deleted = max(last_deleted, tombstone["deleted_at"])
+            except PyMongoError:
+                logger.exception("search index poll failed")
+
+
+def open_emergency_shelters():
+    """
+    Emergency-mode shelters with free beds, as index entries
+    """
+
+    _ensure_loaded()
+
+    return shelter_index.snapshot(emergency_mode=True, available_only=True)
+
+
+# ---------------------------------------------------
+# NEAREST SHELTERS
+# ---------------------------------------------------
+def find_nearest_shelters(latitude, longitude, k=10, max_distance_km=None, **filters):
+    """
+    k nearest shelters to a point.
+    Filters: available_only, emergency_mode, gender,
+    pet_friendly, accessibility, is_24_hour
+    """
+
+    _ensure_loaded()
+
+    return shelter_index.nearest(latitude, longitude, k, max_distance_km, **filters)
+
+
+# ---------------------------------------------------
+# SHELTERS WITHIN RADIUS
+# ---------------------------------------------------
+def find_shelters_within(latitude, longitude, radius_km, limit=None, **filters):
+    """
+    Shelters within radius_km of a point, nearest first
+    """
+
+    _ensure_loaded()
+
+    return shelter_index.within_radius(latitude, longitude, radius_km, limit, **filters)
+
+
+# ---------------------------------------------------
+# GEOHASH TILES (PUBLIC TILE RESPONSES)
+# ---------------------------------------------------
+def tile_version(tile):
+    """
+    (content digest, last change) of a tile; see ShelterGeoIndex.tile_version
+    """
+
+    _ensure_loaded()
+
+    return shelter_index.tile_version(tile)
+
+
+def find_shelters_in_tile(tile, **filters):
+    """
+    Shelters in a geohash tile of length SEARCH_TILE_PRECISION
+    """
+
+    _ensure_loaded()
+
+    return shelter_index.in_tile(tile, **filters)
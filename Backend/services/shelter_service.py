@@ -1,6 +1,44 @@
-from flask import current_app
+import atexit
+import logging
+import threading
+import time
 from bson import ObjectId
 from datetime import datetime
+from pymongo import ReturnDocument, UpdateOne
+
+from db import mongo
+from services import cache_service, dashboard_service, search_service, snapshot_service
+from utils.geo_helpers import make_point
+from utils.time_helpers import now_ms
+
+
+# Fields returned by bed-count writes
+BED_STATE_PROJECTION = {"ngo_id": 1, "name": 1, "available_beds": 1, "total_beds": 1, "version": 1}
+
+# Field sets per call site. "detail" returns the whole document.
+SHELTER_VIEWS = {
+    "card": {
+        "name": 1,
+        "address": 1,
+        "city": 1,
+        "location": 1,
+        "total_beds": 1,
+        "available_beds": 1,
+        "emergency_mode": 1,
+        "gender": 1,
+        "pet_friendly": 1,
+        "accessibility": 1,
+        "is_24_hour": 1,
+        "version": 1,
+        "updated_at": 1
+    },
+    "detail": None
+}
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+logger = logging.getLogger(__name__)
 
 
 # ---------------------------------------------------
@@ -11,8 +49,7 @@ def create_shelter(ngo_id, shelter_data):
     Create a new shelter under an NGO
     """
 
-    db = current_app.db
-    shelter_collection = db["shelters"]
+    shelter_collection = mongo.shelters()
 
     shelter_document = {
         "ngo_id": ngo_id,
@@ -23,13 +60,31 @@ def create_shelter(ngo_id, shelter_data):
         "pincode": shelter_data.get("pincode"),
         "total_beds": shelter_data.get("total_beds", 0),
         "available_beds": shelter_data.get("available_beds", 0),
+        "gender": shelter_data.get("gender", "all"),
+        "pet_friendly": shelter_data.get("pet_friendly", False),
+        "accessibility": shelter_data.get("accessibility", False),
+        "is_24_hour": shelter_data.get("is_24_hour", False),
         "emergency_mode": False,
+        "version": 0,
         "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "updated_at": now_ms()
     }
 
+    if shelter_data.get("latitude") is not None and shelter_data.get("longitude") is not None:
+        shelter_document["location"] = make_point(
+            shelter_data["latitude"],
+            shelter_data["longitude"]
+        )
+
     result = shelter_collection.insert_one(shelter_document)
 
+    dashboard_service.apply_delta(ngo_id, **dashboard_service.shelter_totals(shelter_document))
+
+    if search_service.shelter_index.loaded:
+        search_service.shelter_index.upsert(shelter_document)
+
+    cache_service.invalidate_shelter(str(result.inserted_id))
+
     return str(result.inserted_id)
 
 
@@ -41,34 +96,63 @@ def get_shelter_by_id(shelter_id):
     Fetch shelter using shelter ID
     """
 
-    db = current_app.db
-    shelter_collection = db["shelters"]
+    shelter_collection = mongo.shelters()
 
-    shelter = shelter_collection.find_one({"_id": ObjectId(shelter_id)})
+    return shelter_collection.find_one({"_id": ObjectId(shelter_id)})
 
-    if shelter:
-        shelter["_id"] = str(shelter["_id"])
 
-    return shelter
+async def get_shelter_by_id_async(shelter_id):
+    """
+    get_shelter_by_id for the ASGI read path (public detail, so
+    replica lag is tolerated)
+    """
+
+    shelter_collection = mongo.async_shelters_for_search()
+
+    return await shelter_collection.find_one({"_id": ObjectId(shelter_id)})
 
 
 # ---------------------------------------------------
 # GET ALL SHELTERS FOR AN NGO
 # ---------------------------------------------------
-def get_shelters_by_ngo(ngo_id):
+def _paginate(shelter_collection, query, after=None, limit=DEFAULT_PAGE_SIZE, view="detail"):
     """
-    Fetch all shelters belonging to a specific NGO
+    One keyset page ordered by _id.
+    Returns (shelters, next_cursor); next_cursor is None on the last page.
     """
 
-    db = current_app.db
-    shelter_collection = db["shelters"]
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    if after:
+        query = {**query, "_id": {"$gt": ObjectId(after)}}
+
+    # Fetch one extra document to know whether another page exists
+    cursor = (
+        shelter_collection
+        .find(query, SHELTER_VIEWS[view])
+        .sort("_id", 1)
+        .limit(limit + 1)
+    )
+
+    shelters = list(cursor)
+    has_more = len(shelters) > limit
+    shelters = shelters[:limit]
+
+    # _id stays an ObjectId; the JSON provider encodes it
+    next_cursor = str(shelters[-1]["_id"]) if has_more else None
 
-    shelters = list(shelter_collection.find({"ngo_id": ngo_id}))
+    return shelters, next_cursor
+
+
+def get_shelters_by_ngo(ngo_id, after=None, limit=DEFAULT_PAGE_SIZE, view="detail"):
+    """
+    Fetch one page of shelters belonging to a specific NGO.
+    Pass the returned cursor as `after` to get the next page.
+    """
 
-    for shelter in shelters:
-        shelter["_id"] = str(shelter["_id"])
+    shelter_collection = mongo.shelters()
 
-    return shelters
+    return _paginate(shelter_collection, {"ngo_id": ngo_id}, after, limit, view)
 
 
 # ---------------------------------------------------
@@ -77,19 +161,52 @@ def get_shelters_by_ngo(ngo_id):
 def update_shelter(shelter_id, update_data):
     """
     Update shelter details like name, address etc.
+    A bed count sent without the other is only written while it keeps
+    available_beds <= total_beds; returns 0 if nothing matched.
     """
 
-    db = current_app.db
-    shelter_collection = db["shelters"]
+    shelter_collection = mongo.shelters()
 
-    update_data["updated_at"] = datetime.utcnow()
+    query = {"_id": ObjectId(shelter_id)}
 
-    result = shelter_collection.update_one(
-        {"_id": ObjectId(shelter_id)},
-        {"$set": update_data}
+    total_beds = update_data.get("total_beds")
+    available_beds = update_data.get("available_beds")
+
+    # Both given: checked by UpdateShelterSchema
+    if available_beds is not None and total_beds is None:
+        query["total_beds"] = {"$gte": available_beds}
+    elif total_beds is not None and available_beds is None:
+        query["available_beds"] = {"$lte": total_beds}
+
+    latitude = update_data.pop("latitude", None)
+    longitude = update_data.pop("longitude", None)
+
+    if latitude is not None and longitude is not None:
+        update_data["location"] = make_point(latitude, longitude)
+
+    update_data["updated_at"] = now_ms()
+
+    # Pre-image of the bed totals, for the NGO dashboard aggregate
+    before = shelter_collection.find_one_and_update(
+        query,
+        {"$set": update_data, "$inc": {"version": 1}},
+        projection={"ngo_id": 1, "total_beds": 1, "available_beds": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+
+    if not before:
+        return 0
+
+    dashboard_service.apply_delta(
+        before.get("ngo_id"),
+        total_beds=update_data.get("total_beds", before.get("total_beds") or 0) - (before.get("total_beds") or 0),
+        available_beds=update_data.get("available_beds", before.get("available_beds") or 0) - (before.get("available_beds") or 0)
     )
 
-    return result.modified_count
+    search_service.index_shelter(shelter_id)
+    cache_service.invalidate_shelter(shelter_id)
+
+    return 1
 
 
 # ---------------------------------------------------
@@ -100,36 +217,547 @@ def delete_shelter(shelter_id):
     Remove a shelter
     """
 
-    db = current_app.db
-    shelter_collection = db["shelters"]
+    shelter_collection = mongo.shelters()
+
+    deleted = shelter_collection.find_one_and_delete(
+        {"_id": ObjectId(shelter_id)},
+        projection={"ngo_id": 1, "total_beds": 1, "available_beds": 1, "emergency_mode": 1}
+    )
+
+    if not deleted:
+        return 0
 
-    result = shelter_collection.delete_one({"_id": ObjectId(shelter_id)})
+    dashboard_service.apply_delta(deleted.get("ngo_id"), **{
+        key: -value
+        for key, value in dashboard_service.shelter_totals(deleted).items()
+    })
 
-    return result.deleted_count
+    snapshot_service.record_deletion(shelter_id)
+    search_service.unindex_shelter(shelter_id)
+    cache_service.invalidate_shelter(shelter_id)
+
+    return 1
 
 
 # ---------------------------------------------------
 # UPDATE AVAILABLE BEDS
 # ---------------------------------------------------
-def update_available_beds(shelter_id, beds_count):
+def _version_filter(expected_version):
+    # Shelters created before versioning have no version field
+    if expected_version == 0:
+        return {"$in": [0, None]}
+
+    return expected_version
+
+
+def update_available_beds(shelter_id, beds_count, expected_version=None):
     """
-    Update the number of available beds
+    Set the number of available beds (never above total_beds).
+
+    If expected_version is given the write only applies when the
+    shelter is still at that version (optimistic concurrency).
+    Returns the new bed state, or None if nothing matched.
+
+    With coalescing enabled (see init_app), unconditional updates go
+    through bed_update_coalescer instead of writing immediately.
     """
 
-    db = current_app.db
-    shelter_collection = db["shelters"]
+    if expected_version is None and bed_update_coalescer is not None:
+        return bed_update_coalescer.submit(shelter_id, beds_count)
 
-    result = shelter_collection.update_one(
-        {"_id": ObjectId(shelter_id)},
+    return _write_available_beds(shelter_id, beds_count, expected_version)
+
+
+def _write_available_beds(shelter_id, beds_count, expected_version=None):
+    shelter_collection = mongo.shelters()
+
+    query = {
+        "_id": ObjectId(shelter_id),
+        "total_beds": {"$gte": beds_count}
+    }
+
+    if expected_version is not None:
+        query["version"] = _version_filter(expected_version)
+
+    updated_at = now_ms()
+
+    # The pre-image gives the exact delta for the NGO aggregate
+    shelter = shelter_collection.find_one_and_update(
+        query,
         {
             "$set": {
                 "available_beds": beds_count,
-                "updated_at": datetime.utcnow()
-            }
+                "updated_at": updated_at
+            },
+            "$inc": {"version": 1}
+        },
+        projection=BED_STATE_PROJECTION,
+        return_document=ReturnDocument.BEFORE
+    )
+
+    if not shelter:
+        return None
+
+    dashboard_service.apply_delta(
+        shelter.get("ngo_id"),
+        available_beds=beds_count - (shelter.get("available_beds") or 0)
+    )
+
+    shelter["available_beds"] = beds_count
+    shelter["version"] = shelter.get("version", 0) + 1
+
+    search_service.update_indexed_beds(shelter_id, beds_count, updated_at)
+    cache_service.invalidate_shelter(shelter_id)
+
+    return shelter
+
+
+# ---------------------------------------------------
+# COALESCED BED UPDATES
+# ---------------------------------------------------
+# Modes for BED_UPDATE_COALESCING:
+#   "off"          every update is written immediately (default)
+#   "wait"         updates are merged per window; callers block until the
+#                  merged write is acknowledged and all get its result
+#   "write_behind" callers are acked as soon as the update is queued; a
+#                  crash loses at most one window of updates
+COALESCING_MODES = ("off", "wait", "write_behind")
+
+DEFAULT_COALESCE_WINDOW_MS = 100
+
+
+class _PendingBeds:
+    __slots__ = ("values", "deadline", "done", "results", "error")
+
+    def __init__(self, deadline):
+        self.values = []
+        self.deadline = deadline
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class BedUpdateCoalescer:
+    """
+    Merges available_beds writes for the same shelter that arrive
+    within `window` seconds into one find_one_and_update.
+
+    The last value wins, exactly as if the writes had been applied in
+    arrival order. If it exceeds total_beds, the latest value that fits
+    is written instead and only the callers over the limit get None.
+    """
+
+    def __init__(self, window=DEFAULT_COALESCE_WINDOW_MS / 1000, wait=True):
+        self.window = window
+        self.wait = wait
+
+        self.requests = 0
+        self.writes = 0
+        self.collapsed = 0
+        self.failed = 0
+
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+        self._thread = None
+
+    # -------------------------------
+    # CALLERS
+    # -------------------------------
+    def submit(self, shelter_id, beds_count):
+        with self._lock:
+            pending = self._pending.get(shelter_id)
+
+            if pending is None:
+                pending = self._pending[shelter_id] = _PendingBeds(time.monotonic() + self.window)
+                self._wakeup.notify()
+
+            index = len(pending.values)
+            pending.values.append(beds_count)
+            self.requests += 1
+
+            stopping = self._stopping
+
+        if stopping:
+            self.flush()
+        else:
+            self._ensure_running()
+
+        if not self.wait:
+            return {"available_beds": beds_count, "queued": True}
+
+        pending.done.wait()
+
+        if pending.error is not None:
+            raise pending.error
+
+        return pending.results[index]
+
+    def stats(self):
+        with self._lock:
+            pending = sum(len(item.values) for item in self._pending.values())
+
+        return {
+            "requests": self.requests,
+            "writes": self.writes,
+            "collapsed": self.collapsed,
+            "failed": self.failed,
+            "pending": pending
         }
+
+    # -------------------------------
+    # FLUSHING
+    # -------------------------------
+    def _ensure_running(self):
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="bed-update-coalescer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                due = self._take_due()
+
+                while not due and not self._stopping:
+                    deadlines = [item.deadline for item in self._pending.values()]
+                    timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+                    self._wakeup.wait(timeout)
+                    due = self._take_due()
+
+            for shelter_id, pending in due:
+                self._write(shelter_id, pending)
+
+            if self._stopping and not due:
+                return
+
+    def _take_due(self, everything=False):
+        now = time.monotonic()
+
+        due = [
+            (shelter_id, pending)
+            for shelter_id, pending in self._pending.items()
+            if everything or self._stopping or pending.deadline <= now
+        ]
+
+        for shelter_id, _ in due:
+            del self._pending[shelter_id]
+
+        return due
+
+    def flush(self):
+        """
+        Write everything pending now, in the calling thread
+        """
+
+        with self._lock:
+            due = self._take_due(everything=True)
+
+        for shelter_id, pending in due:
+            self._write(shelter_id, pending)
+
+    def stop(self):
+        """
+        Flush pending updates and stop the background thread
+        (registered with atexit, so a clean worker exit loses nothing)
+        """
+
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self.flush()
+
+    def _write(self, shelter_id, pending):
+        values = pending.values
+
+        try:
+            state = _write_available_beds(shelter_id, values[-1])
+
+            # Over total_beds: fall back to the latest value that fits
+            if state is None and len(set(values)) > 1:
+                state = self._write_latest_valid(shelter_id, values)
+
+            # Callers over total_beds would have been rejected on their own
+            pending.results = [
+                state if state is not None and value <= state["total_beds"] else None
+                for value in values
+            ]
+
+            self.writes += 1
+            self.collapsed += len(values) - 1
+
+        except Exception as e:
+            logger.exception("coalesced bed update for %s failed", shelter_id)
+            pending.error = e
+            self.failed += len(values)
+
+        finally:
+            pending.done.set()
+
+    @staticmethod
+    def _write_latest_valid(shelter_id, values):
+        shelter_collection = mongo.shelters()
+
+        shelter = shelter_collection.find_one({"_id": ObjectId(shelter_id)}, {"total_beds": 1})
+
+        if not shelter:
+            return None
+
+        fitting = [value for value in values if value <= shelter.get("total_beds", 0)]
+
+        if not fitting:
+            return None
+
+        return _write_available_beds(shelter_id, fitting[-1])
+
+
+# Set by init_app when BED_UPDATE_COALESCING is enabled
+bed_update_coalescer = None
+
+
+def init_app(app):
+    configure_bed_updates(
+        app.config.get("BED_UPDATE_COALESCING", "off"),
+        app.config.get("BED_UPDATE_COALESCE_WINDOW_MS", DEFAULT_COALESCE_WINDOW_MS)
     )
 
-    return result.modified_count
+
+def configure_bed_updates(mode="off", window_ms=DEFAULT_COALESCE_WINDOW_MS):
+    """
+    Switch bed update coalescing on or off, flushing the previous
+    coalescer if there was one
+    """
+
+    global bed_update_coalescer
+
+    if mode not in COALESCING_MODES:
+        raise ValueError(f"BED_UPDATE_COALESCING must be one of {COALESCING_MODES}")
+
+    previous, bed_update_coalescer = bed_update_coalescer, None
+
+    if previous is not None:
+        previous.stop()
+
+    if mode != "off":
+        bed_update_coalescer = BedUpdateCoalescer(window_ms / 1000, wait=mode == "wait")
+
+
+def _stop_bed_updates():
+    if bed_update_coalescer is not None:
+        bed_update_coalescer.stop()
+
+
+atexit.register(_stop_bed_updates)
+
+
+# ---------------------------------------------------
+# BULK UPDATE AVAILABLE BEDS
+# ---------------------------------------------------
+MAX_BULK_BED_UPDATES = 500
+
+
+def bulk_update_available_beds(ngo_id, updates):
+    """
+    Apply many {shelter_id, available_beds} updates for one NGO in a
+    single unordered bulk_write.
+
+    Returns one result per input item, in order, with status:
+    - "updated": the new count was written
+    - "not_found": no such shelter for this NGO
+    - "rejected": available_beds exceeds the shelter's total_beds
+    """
+
+    shelter_collection = mongo.shelters()
+
+    if not updates:
+        return []
+
+    # bulk_write returns no pre-images, so each update is conditioned on
+    # the bed count read here: whatever applies, applies on top of a
+    # known value, and the dashboard delta is exact
+    before = {
+        str(shelter["_id"]): shelter.get("available_beds")
+        for shelter in shelter_collection.find(
+            {
+                "_id": {"$in": [ObjectId(item["shelter_id"]) for item in updates]},
+                "ngo_id": ngo_id
+            },
+            {"available_beds": 1}
+        )
+    }
+
+    # Every write in the batch carries the same timestamp, which lets a
+    # single follow-up read tell which items actually applied
+    batch_time = now_ms()
+
+    operations = [
+        UpdateOne(
+            {
+                "_id": ObjectId(item["shelter_id"]),
+                "ngo_id": ngo_id,
+                "available_beds": before[item["shelter_id"]],
+                "total_beds": {"$gte": item["available_beds"]}
+            },
+            _bed_update(item["available_beds"], batch_time)
+        )
+        for item in updates
+        if item["shelter_id"] in before
+    ]
+
+    if operations:
+        shelter_collection.bulk_write(operations, ordered=False)
+
+    current = {
+        str(shelter["_id"]): shelter
+        for shelter in shelter_collection.find(
+            {"_id": {"$in": [ObjectId(shelter_id) for shelter_id in before]}, "ngo_id": ngo_id},
+            {"available_beds": 1, "version": 1, "updated_at": 1}
+        )
+    }
+
+    results = []
+    updated_ids = []
+    beds_delta = 0
+
+    for item in updates:
+        shelter_id = item["shelter_id"]
+        shelter = current.get(shelter_id)
+
+        if shelter is None:
+            results.append({"shelter_id": shelter_id, "status": "not_found"})
+            continue
+
+        if shelter["updated_at"] == batch_time and shelter["available_beds"] == item["available_beds"]:
+            beds_delta += item["available_beds"] - (before[shelter_id] or 0)
+        else:
+            # Over total_beds, or changed since it was read: retry alone
+            # with an atomic pre-image
+            previous = shelter_collection.find_one_and_update(
+                {"_id": ObjectId(shelter_id), "ngo_id": ngo_id, "total_beds": {"$gte": item["available_beds"]}},
+                _bed_update(item["available_beds"], batch_time),
+                projection={"available_beds": 1, "version": 1},
+                return_document=ReturnDocument.BEFORE
+            )
+
+            if previous is None:
+                results.append({
+                    "shelter_id": shelter_id,
+                    "status": "rejected",
+                    "available_beds": shelter["available_beds"],
+                    "version": shelter.get("version", 0)
+                })
+                continue
+
+            beds_delta += item["available_beds"] - (previous.get("available_beds") or 0)
+            shelter = {"available_beds": item["available_beds"], "version": previous.get("version", 0) + 1}
+
+        search_service.update_indexed_beds(shelter_id, shelter["available_beds"], batch_time)
+        updated_ids.append(shelter_id)
+
+        results.append({
+            "shelter_id": shelter_id,
+            "status": "updated",
+            "available_beds": shelter["available_beds"],
+            "version": shelter.get("version", 0)
+        })
+
+    cache_service.invalidate_shelters(updated_ids)
+    dashboard_service.apply_delta(ngo_id, available_beds=beds_delta)
+
+    return results
+
+
+def _bed_update(available_beds, updated_at):
+    return {
+        "$set": {"available_beds": available_beds, "updated_at": updated_at},
+        "$inc": {"version": 1}
+    }
+
+
+# ---------------------------------------------------
+# RESERVE / RELEASE BEDS (ATOMIC)
+# ---------------------------------------------------
+def _owned_by(shelter_id, ngo_id):
+    query = {"_id": ObjectId(shelter_id)}
+
+    if ngo_id is not None:
+        query["ngo_id"] = ngo_id
+
+    return query
+
+
+def reserve_beds(shelter_id, count=1, ngo_id=None):
+    """
+    Atomically take `count` beds if at least that many are free.
+    Returns the new bed state, or None if the shelter is missing (or
+    not ngo_id's, when given) or does not have enough beds.
+    """
+
+    shelter_collection = mongo.shelters()
+    updated_at = now_ms()
+
+    shelter = shelter_collection.find_one_and_update(
+        {
+            **_owned_by(shelter_id, ngo_id),
+            "available_beds": {"$gte": count}
+        },
+        {
+            "$inc": {"available_beds": -count, "version": 1},
+            "$set": {"updated_at": updated_at}
+        },
+        projection=BED_STATE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+
+    if shelter:
+        dashboard_service.apply_delta(shelter.get("ngo_id"), available_beds=-count)
+        search_service.update_indexed_beds(shelter_id, shelter["available_beds"], updated_at)
+        cache_service.invalidate_shelter(shelter_id)
+
+    return shelter
+
+
+def release_beds(shelter_id, count=1, ngo_id=None):
+    """
+    Atomically give back `count` beds without exceeding total_beds.
+    Returns the new bed state, or None if the shelter is missing (or
+    not ngo_id's, when given) or the release would overflow.
+    """
+
+    shelter_collection = mongo.shelters()
+    updated_at = now_ms()
+
+    shelter = shelter_collection.find_one_and_update(
+        {
+            **_owned_by(shelter_id, ngo_id),
+            "$expr": {
+                "$lte": [{"$add": ["$available_beds", count]}, "$total_beds"]
+            }
+        },
+        {
+            "$inc": {"available_beds": count, "version": 1},
+            "$set": {"updated_at": updated_at}
+        },
+        projection=BED_STATE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+
+    if shelter:
+        dashboard_service.apply_delta(shelter.get("ngo_id"), available_beds=count)
+        search_service.update_indexed_beds(shelter_id, shelter["available_beds"], updated_at)
+        cache_service.invalidate_shelter(shelter_id)
+
+    return shelter
 
 
 # ---------------------------------------------------
@@ -140,36 +768,44 @@ def toggle_emergency_mode(shelter_id, status):
     Turn emergency mode ON/OFF for shelter
     """
 
-    db = current_app.db
-    shelter_collection = db["shelters"]
+    shelter_collection = mongo.shelters()
+    updated_at = now_ms()
 
-    result = shelter_collection.update_one(
+    before = shelter_collection.find_one_and_update(
         {"_id": ObjectId(shelter_id)},
         {
             "$set": {
                 "emergency_mode": status,
-                "updated_at": datetime.utcnow()
-            }
-        }
+                "updated_at": updated_at
+            },
+            "$inc": {"version": 1}
+        },
+        projection={"ngo_id": 1, "emergency_mode": 1},
+        return_document=ReturnDocument.BEFORE
     )
 
-    return result.modified_count
+    if not before:
+        return 0
+
+    dashboard_service.apply_delta(
+        before.get("ngo_id"),
+        emergency_shelters=int(bool(status)) - int(bool(before.get("emergency_mode")))
+    )
+
+    search_service.update_indexed_emergency(shelter_id, status, updated_at)
+    cache_service.invalidate_shelter(shelter_id)
+
+    return 1
 
 
 # ---------------------------------------------------
 # LIST ALL SHELTERS (GLOBAL / FUTURE ADMIN)
 # ---------------------------------------------------
-def list_all_shelters():
+def list_all_shelters(after=None, limit=DEFAULT_PAGE_SIZE, view="card"):
     """
-    Returns all shelters in the system
+    Returns one page of all shelters in the system
     """
 
-    db = current_app.db
-    shelter_collection = db["shelters"]
-
-    shelters = list(shelter_collection.find())
-
-    for shelter in shelters:
-        shelter["_id"] = str(shelter["_id"])
+    shelter_collection = mongo.shelters_for_search()
 
-    return shelters
+    return _paginate(shelter_collection, {}, after, limit, view)
@@ -0,0 +1,467 @@
+import glob
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+
+import msgpack
+from bson import Decimal128, ObjectId
+
+from db import mongo
+from utils.geo_helpers import geohash_encode, point_lat_lon
+
+
+# ---------------------------------------------------
+# OFFLINE SNAPSHOT FORMAT
+# ---------------------------------------------------
+# A snapshot (or delta) is one msgpack map of columns, one entry per
+# shelter, instead of a list of documents:
+#
+#   schema, kind ("snapshot" | "delta"), version, base (delta only),
+#   count, coord_scale,
+#   ids            bin, 12 raw ObjectId bytes per shelter
+#   lat, lon       coordinates * coord_scale as ints, each the
+#                  difference from the previous row (rows are in
+#                  geohash order, so the differences stay small)
+#   has_location   bin, one byte per shelter (0 = no coordinates)
+#   strings        {"city": [...], "gender": [...]} dictionaries;
+#   city, gender   indexes into them
+#   name, address, total_beds, available_beds
+#   flags          bit field, see FLAGS
+#   updated_ago_s  seconds between the shelter's updated_at and version
+#                  (negative for rows newer than version)
+#   removed        bin, ObjectIds deleted since base (delta only)
+#
+# version is a watermark in epoch milliseconds: the newest updated_at
+# in the data minus SNAPSHOT_WATERMARK_MARGIN_SECONDS. A client keeps
+# it and asks for /snapshot/delta?since=<version> when back online.
+# updated_at is stamped before the write commits, so a write may turn
+# up after a newer one; the margin makes the next delta cover it. Rows
+# from the margin repeat, so apply rows as upserts by id.
+
+SCHEMA_VERSION = 1
+
+CONTENT_TYPE = "application/x-msgpack"
+
+# 1e-5 degrees is ~1.1 m
+COORD_SCALE = 100_000
+
+# Sort key precision (~19 m cells)
+ORDER_PRECISION = 8
+
+FLAGS = ("emergency_mode", "pet_friendly", "accessibility", "is_24_hour")
+
+DICTIONARY_COLUMNS = ("city", "gender")
+
+SNAPSHOT_PROJECTION = {
+    "name": 1,
+    "address": 1,
+    "city": 1,
+    "location": 1,
+    "total_beds": 1,
+    "available_beds": 1,
+    "emergency_mode": 1,
+    "gender": 1,
+    "pet_friendly": 1,
+    "accessibility": 1,
+    "is_24_hour": 1,
+    "updated_at": 1
+}
+
+SNAPSHOT_BATCH_SIZE = 1000
+
+DEFAULT_SNAPSHOT_DIR = "snapshots"
+DEFAULT_SNAPSHOT_KEEP = 3
+DEFAULT_TOMBSTONE_RETENTION = timedelta(days=30)
+DEFAULT_WATERMARK_MARGIN = timedelta(seconds=5)
+
+FILE_PREFIX = "shelters-"
+FILE_SUFFIX = ".msgpack"
+
+_settings = {
+    "dir": DEFAULT_SNAPSHOT_DIR,
+    "keep": DEFAULT_SNAPSHOT_KEEP,
+    "tombstone_retention": DEFAULT_TOMBSTONE_RETENTION,
+    "watermark_margin": DEFAULT_WATERMARK_MARGIN
+}
+
+
+class SnapshotTooOld(Exception):
+    """
+    Deltas cannot be served this far back (tombstones have expired)
+    """
+
+
+def init_app(app):
+    _settings["dir"] = app.config.get("SNAPSHOT_DIR", DEFAULT_SNAPSHOT_DIR)
+    _settings["keep"] = app.config.get("SNAPSHOT_KEEP", DEFAULT_SNAPSHOT_KEEP)
+    _settings["tombstone_retention"] = timedelta(
+        days=app.config.get("SNAPSHOT_TOMBSTONE_RETENTION_DAYS", DEFAULT_TOMBSTONE_RETENTION.days)
+    )
+    _settings["watermark_margin"] = timedelta(
+        seconds=app.config.get("SNAPSHOT_WATERMARK_MARGIN_SECONDS", DEFAULT_WATERMARK_MARGIN.seconds)
+    )
+
+
+# ---------------------------------------------------
+# VERSIONS (EPOCH MILLISECONDS)
+# ---------------------------------------------------
+def to_version(moment):
+    return int(moment.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def from_version(version):
+    return datetime.fromtimestamp(version / 1000, timezone.utc).replace(tzinfo=None)
+
+
+def watermark(newest, floor=0):
+    """
+    Version for data whose newest updated_at is `newest`: stepped back
+    by the margin, never below `floor`
+    """
+
+    if newest is None:
+        return floor
+
+    return max(floor, to_version(newest - _settings["watermark_margin"]))
+
+
+# ---------------------------------------------------
+# ENCODE
+# ---------------------------------------------------
+def _count(value):
+    if isinstance(value, Decimal128):
+        value = value.to_decimal()
+
+    return int(value or 0)
+
+
+def _order_key(shelter):
+    coordinates = point_lat_lon(shelter.get("location"))
+
+    # Shelters without coordinates go last
+    return geohash_encode(*coordinates, ORDER_PRECISION) if coordinates else "~"
+
+
+def _row(shelter):
+    """
+    The snapshot fields of one document as a compact tuple, so a build
+    keeps rows rather than whole documents while it sorts them
+    """
+
+    coordinates = point_lat_lon(shelter.get("location"))
+    flags = 0
+
+    for bit, flag in enumerate(FLAGS):
+        if shelter.get(flag):
+            flags |= 1 << bit
+
+    return (
+        _order_key(shelter),
+        shelter["_id"].binary,
+        coordinates,
+        shelter.get("city") or "",
+        shelter.get("gender") or "",
+        shelter.get("name") or "",
+        shelter.get("address") or "",
+        _count(shelter.get("total_beds")),
+        _count(shelter.get("available_beds")),
+        flags,
+        shelter.get("updated_at")
+    )
+
+
+def shelter_rows(shelters):
+    """
+    Rows of an iterable of shelter documents, in snapshot (geohash) order
+    """
+
+    return sorted(map(_row, shelters), key=itemgetter(0))
+
+
+def encode_shelters(shelters, version, kind="snapshot", base=None, removed=()):
+    """
+    Pack shelter documents (SNAPSHOT_PROJECTION fields) into the
+    column format above. Returns bytes.
+    """
+
+    return encode_rows(shelter_rows(shelters), version, kind, base, removed)
+
+
+def encode_rows(rows, version, kind="snapshot", base=None, removed=()):
+    """
+    encode_shelters for rows already built by shelter_rows
+    """
+
+    dictionaries = {column: {} for column in DICTIONARY_COLUMNS}
+    columns = {
+        key: []
+        for key in ("lat", "lon", "name", "address", "total_beds", "available_beds", "flags", "updated_ago_s")
+    }
+    columns.update({column: [] for column in DICTIONARY_COLUMNS})
+
+    ids = bytearray()
+    has_location = bytearray()
+    prev_lat = prev_lon = 0
+    version_s = version // 1000
+
+    for _, shelter_id, coordinates, city, gender, name, address, total_beds, available_beds, flags, updated_at in rows:
+        ids += shelter_id
+
+        if coordinates is None:
+            has_location.append(0)
+            lat = lon = 0
+        else:
+            has_location.append(1)
+            lat = round(coordinates[0] * COORD_SCALE)
+            lon = round(coordinates[1] * COORD_SCALE)
+
+        columns["lat"].append(lat - prev_lat)
+        columns["lon"].append(lon - prev_lon)
+        prev_lat, prev_lon = lat, lon
+
+        for column, value in zip(DICTIONARY_COLUMNS, (city, gender)):
+            columns[column].append(dictionaries[column].setdefault(value, len(dictionaries[column])))
+
+        columns["name"].append(name)
+        columns["address"].append(address)
+        columns["total_beds"].append(total_beds)
+        columns["available_beds"].append(available_beds)
+        columns["flags"].append(flags)
+        columns["updated_ago_s"].append(version_s - to_version(updated_at) // 1000 if updated_at else 0)
+
+    payload = {
+        "schema": SCHEMA_VERSION,
+        "kind": kind,
+        "version": version,
+        "count": len(rows),
+        "coord_scale": COORD_SCALE,
+        "flag_names": list(FLAGS),
+        "ids": bytes(ids),
+        "has_location": bytes(has_location),
+        "strings": {column: list(values) for column, values in dictionaries.items()},
+        **columns
+    }
+
+    if kind == "delta":
+        payload["base"] = base
+        payload["removed"] = b"".join(ObjectId(shelter_id).binary for shelter_id in removed)
+
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+# ---------------------------------------------------
+# DECODE (reference for clients, used by the tests)
+# ---------------------------------------------------
+def _object_ids(raw):
+    return [str(ObjectId(raw[i:i + 12])) for i in range(0, len(raw), 12)]
+
+
+def decode_shelters(data):
+    """
+    Unpack a snapshot or delta into
+    {"kind", "version", "base", "shelters": [...], "removed": [...]}
+    """
+
+    payload = msgpack.unpackb(data, raw=False)
+
+    if payload["schema"] != SCHEMA_VERSION:
+        raise ValueError(f"unsupported snapshot schema {payload['schema']}")
+
+    scale = payload["coord_scale"]
+    strings = payload["strings"]
+    version_s = payload["version"] // 1000
+    ids = _object_ids(payload["ids"])
+
+    shelters = []
+    lat = lon = 0
+
+    for row, shelter_id in enumerate(ids):
+        lat += payload["lat"][row]
+        lon += payload["lon"][row]
+        flags = payload["flags"][row]
+
+        shelter = {
+            "_id": shelter_id,
+            "name": payload["name"][row],
+            "address": payload["address"][row],
+            "total_beds": payload["total_beds"][row],
+            "available_beds": payload["available_beds"][row],
+            "updated_at": datetime.fromtimestamp(version_s - payload["updated_ago_s"][row], timezone.utc).replace(tzinfo=None)
+        }
+
+        for column in DICTIONARY_COLUMNS:
+            shelter[column] = strings[column][payload[column][row]]
+
+        for bit, flag in enumerate(payload["flag_names"]):
+            shelter[flag] = bool(flags & (1 << bit))
+
+        if payload["has_location"][row]:
+            shelter["latitude"] = lat / scale
+            shelter["longitude"] = lon / scale
+
+        shelters.append(shelter)
+
+    return {
+        "kind": payload["kind"],
+        "version": payload["version"],
+        "base": payload.get("base"),
+        "shelters": shelters,
+        "removed": _object_ids(payload.get("removed", b""))
+    }
+
+
+# ---------------------------------------------------
+# BUILD SNAPSHOT (JOB)
+# ---------------------------------------------------
+def _snapshot_path(directory, version):
+    return os.path.join(directory, f"{FILE_PREFIX}{version}{FILE_SUFFIX}")
+
+
+def iter_shelters():
+    """
+    Every shelter with the SNAPSHOT_PROJECTION fields, one batch at a
+    time. Reads the primary: a lagging secondary could miss a write
+    older than the newest one it has, and deltas from the resulting
+    version would never return it.
+    """
+
+    shelter_collection = mongo.shelters()
+    cursor = shelter_collection.find({}, SNAPSHOT_PROJECTION).batch_size(SNAPSHOT_BATCH_SIZE)
+
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def write_snapshot(shelters, directory=None, keep=None):
+    """
+    Encode shelters (any iterable of documents; consumed once) into
+    `directory`/shelters-<version>.msgpack (written atomically),
+    keeping the newest `keep` files. Returns a summary dict.
+    """
+
+    directory = directory or _settings["dir"]
+    keep = keep or _settings["keep"]
+
+    started = time.perf_counter()
+
+    rows = shelter_rows(shelters)
+    version = watermark(max((row[-1] for row in rows if row[-1]), default=None))
+
+    data = encode_rows(rows, version)
+
+    os.makedirs(directory, exist_ok=True)
+    path = _snapshot_path(directory, version)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+
+    os.replace(tmp_path, path)
+
+    for old in list_snapshots(directory)[keep:]:
+        os.remove(old[1])
+
+    return {
+        "version": version,
+        "count": len(rows),
+        "bytes": len(data),
+        "path": path,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+def build_snapshot(directory=None, keep=None):
+    """
+    Compile every shelter into a new snapshot file (the build job).
+    "seconds" in the summary covers the read as well.
+    """
+
+    started = time.perf_counter()
+    summary = write_snapshot(iter_shelters(), directory, keep)
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+
+    return summary
+
+
+def list_snapshots(directory=None):
+    """
+    [(version, path)] of snapshot files, newest first
+    """
+
+    directory = directory or _settings["dir"]
+    snapshots = []
+
+    for path in glob.glob(os.path.join(directory, f"{FILE_PREFIX}*{FILE_SUFFIX}")):
+        name = os.path.basename(path)[len(FILE_PREFIX):-len(FILE_SUFFIX)]
+
+        if name.isdigit():
+            snapshots.append((int(name), path))
+
+    return sorted(snapshots, reverse=True)
+
+
+def latest_snapshot(directory=None):
+    """
+    (version, path) of the newest snapshot, or None
+    """
+
+    snapshots = list_snapshots(directory)
+
+    return snapshots[0] if snapshots else None
+
+
+# ---------------------------------------------------
+# DELTAS
+# ---------------------------------------------------
+def build_delta(since):
+    """
+    Changes since snapshot version `since` (epoch ms): shelters with
+    updated_at >= since, plus ids deleted since, read from the primary
+    (see iter_shelters). Raises SnapshotTooOld when deletions that far
+    back are no longer recorded.
+    """
+
+    since_at = from_version(since)
+
+    if since_at < datetime.utcnow() - _settings["tombstone_retention"]:
+        raise SnapshotTooOld()
+
+    shelter_collection = mongo.shelters()
+
+    rows = shelter_rows(
+        shelter_collection
+        .find({"updated_at": {"$gte": since_at}}, SNAPSHOT_PROJECTION)
+        .sort([("updated_at", 1), ("_id", 1)])
+        .batch_size(SNAPSHOT_BATCH_SIZE)
+    )
+
+    removed = list(mongo.shelter_tombstones().find({"deleted_at": {"$gte": since_at}}, {"deleted_at": 1}))
+
+    stamps = [row[-1] for row in rows if row[-1]] + [entry["deleted_at"] for entry in removed]
+    version = watermark(max(stamps, default=None), floor=since)
+
+    return encode_rows(
+        rows,
+        version,
+        kind="delta",
+        base=since,
+        removed=[entry["_id"] for entry in removed]
+    )
+
+
+def record_deletion(shelter_id):
+    """
+    Leave a tombstone so deltas can tell offline clients about the
+    deletion. It expires with the retention window.
+    """
+
+    now = datetime.utcnow()
+
+    mongo.shelter_tombstones().replace_one(
+        {"_id": ObjectId(shelter_id)},
+        {"deleted_at": now, "expires_at": now + _settings["tombstone_retention"]},
+        upsert=True
+    )
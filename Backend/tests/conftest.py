@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from config import TestConfig  # noqa: E402
+from db import mongo  # noqa: E402
+from services import revocation_service, search_service  # noqa: E402
+from services.ngo_service import principal_cache  # noqa: E402
+
+
+# ---------------------------------------------------
+# APP + CLIENT (mongomock)
+# ---------------------------------------------------
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+
+    yield app
+
+    mongo.get_client().drop_database(TestConfig.MONGO_DB_NAME)
+    search_service.shelter_index.clear()
+    principal_cache.clear()
+    revocation_service.denylist.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+from bson import ObjectId
+
+from async_app import create_async_app
+from config import TestConfig
+from db import mongo
+from services import emergency_service, ngo_service, search_service, shelter_service
+from services.realtime_service import TILE_PRECISION, broker
+from utils.geo_helpers import geohash_encode
+from utils.response import dumps_bytes
+from utils.time_helpers import now_ms
+
+
+def _call(async_app, method, path, query_string=""):
+    payload, status = asyncio.run(async_app.dispatch(method, path, query_string))
+
+    # Decode the wire format, as a client would
+    return json.loads(dumps_bytes(payload)), status
+
+
+@pytest.fixture
+def async_app(app):
+    return create_async_app(TestConfig)
+
+
+@pytest.fixture
+def shelter_ids(app):
+    with app.app_context():
+        ngo_id = ngo_service.create_ngo({"ngo_name": "Relief", "email": "relief@example.org", "phone": "9999999999"})
+
+        return [
+            shelter_service.create_shelter(ngo_id, {
+                "name": f"Shelter {i}",
+                "total_beds": 10,
+                "available_beds": i,
+                "latitude": 40.71 + i * 0.01,
+                "longitude": -74.0
+            })
+            for i in range(3)
+        ]
+
+
+# ---------------------------------------------------
+# SAME CONTRACT AS THE FLASK ROUTES
+# ---------------------------------------------------
+def test_nearby_matches_flask_route(client, async_app, shelter_ids):
+    query_string = "lat=40.7&lng=-74.0&k=5&available_only=true"
+
+    payload, status = _call(async_app, "GET", "/public/shelters/nearby", query_string)
+
+    assert status == 200
+    assert payload == client.get(f"/public/shelters/nearby?{query_string}").json
+    assert [shelter["name"] for shelter in payload["shelters"]] == ["Shelter 1", "Shelter 2"]
+
+    assert _call(async_app, "GET", "/public/shelters/nearby", "lat=91&lng=0")[1] == 400
+
+
+def test_detail_and_emergency_status(client, async_app, shelter_ids):
+    payload, status = _call(async_app, "GET", f"/public/shelters/{shelter_ids[0]}")
+
+    assert status == 200
+    assert payload["name"] == "Shelter 0"
+    assert _call(async_app, "GET", "/public/shelters/not-an-id")[1] == 404
+
+    request_id = emergency_service.create_emergency_request({
+        "user_location_lat": 40.71,
+        "user_location_lng": -74.0
+    })
+    emergency_service.dispatcher.wait_for_idle()
+
+    payload, status = _call(async_app, "GET", f"/emergency/request/{request_id}")
+
+    assert status == 200
+    assert payload == client.get(f"/emergency/request/{request_id}").json
+
+
+def test_unknown_routes(async_app):
+    assert _call(async_app, "GET", "/shelters/add")[1] == 404
+    assert _call(async_app, "POST", "/public/shelters/nearby")[1] == 405
+
+
+# ---------------------------------------------------
+# INDEX KEPT CURRENT FROM THE CHANGE FEED
+# ---------------------------------------------------
+def test_apply_document_updates_index(async_app, shelter_ids):
+    asyncio.run(async_app.startup())
+
+    try:
+        search_service.apply_document({
+            **mongo.shelters().find_one({"_id": ObjectId(shelter_ids[0])}, search_service.INDEX_PROJECTION),
+            "available_beds": 9,
+            "emergency_mode": True,
+            "updated_at": now_ms()
+        })
+
+        payload, _ = _call(async_app, "GET", "/public/shelters/nearby", "lat=40.71&lng=-74.0&k=1&emergency_mode=1")
+
+        assert payload["shelters"][0]["_id"] == shelter_ids[0]
+        assert payload["shelters"][0]["available_beds"] == 9
+    finally:
+        asyncio.run(async_app.shutdown())
+
+
+# ---------------------------------------------------
+# LIVE BED UPDATES OVER ASGI
+# ---------------------------------------------------
+def test_stream_pushes_deltas_and_unsubscribes_on_disconnect(async_app):
+    tile = geohash_encode(40.71, -74.0, TILE_PRECISION)
+    delta = {"id": "s1", "tile": tile, "available_beds": 4, "emergency_mode": True, "version": 2}
+
+    async def session():
+        sent = []
+        disconnect = asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+            if len(sent) == 2:
+                broker.publish(delta)
+            elif len(sent) == 3:
+                disconnect.set()
+
+        scope = {"type": "http", "method": "GET", "path": "/public/shelters/stream", "query_string": b"lat=40.71&lng=-74.0"}
+        await async_app(scope, receive, send)
+
+        return sent
+
+    try:
+        sent = asyncio.run(session())
+    finally:
+        broker.stop()
+
+    assert sent[0]["status"] == 200
+    assert (b"content-type", b"text/event-stream") in sent[0]["headers"]
+    assert sent[1]["body"] == b": connected\n\n"
+    assert sent[2]["body"].decode() == f"event: beds\ndata: {json.dumps(delta, separators=(',', ':'))}\n\n"
+    assert broker.subscriber_count() == 0
+
+    assert _call(async_app, "GET", "/public/shelters/stream", "tiles=x")[1] == 400
@@ -0,0 +1,211 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from argon2 import PasswordHasher
+from flask_jwt_extended import decode_token
+
+from db import mongo
+from db.indexes import ensure_indexes
+from services import revocation_service
+from services.ngo_service import delete_ngo, principal_cache
+from utils import password
+from utils.password import PasswordPool, PasswordPoolBusy
+
+
+REGISTRATION = {
+    "ngo_name": "Auth NGO",
+    "email": "Auth@Example.org",
+    "password": "correct horse",
+    "phone": "9876543210"
+}
+
+
+@pytest.fixture
+def registered(app, client):
+    with app.app_context():
+        ensure_indexes()
+
+    response = client.post("/auth/register", json=REGISTRATION)
+    assert response.status_code == 201
+
+    return response.get_json()
+
+
+# ---------------------------------------------------
+# REGISTER / LOGIN
+# ---------------------------------------------------
+def test_register_then_login(client, registered):
+    stored = mongo.ngos().find_one({"email": "auth@example.org"})
+
+    assert stored["password"].startswith("$argon2id$")
+    assert client.post("/auth/register", json=REGISTRATION).status_code == 409
+
+    response = client.post("/auth/login", json={"email": "auth@example.org", "password": "correct horse"})
+    token = response.get_json()["access_token"]
+
+    assert response.status_code == 200
+    assert client.get("/ngo/profile", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+
+@pytest.mark.parametrize("email, secret", [
+    ("auth@example.org", "wrong horse"),
+    ("nobody@example.org", "correct horse")
+])
+def test_login_rejects_bad_credentials(client, registered, email, secret):
+    response = client.post("/auth/login", json={"email": email, "password": secret})
+
+    assert response.status_code == 401
+    assert response.get_json() == {"error": "Invalid email or password"}
+
+
+def test_login_upgrades_hash_when_costs_change(app, client, registered):
+    old_hash = mongo.ngos().find_one({"email": "auth@example.org"})["password"]
+
+    password.configure({**app.config, "ARGON2_TIME_COST": 2})
+
+    try:
+        response = client.post("/auth/login", json={"email": "auth@example.org", "password": "correct horse"})
+        new_hash = mongo.ngos().find_one({"email": "auth@example.org"})["password"]
+
+        assert response.status_code == 200
+        assert new_hash != old_hash
+        assert not password.needs_rehash(new_hash)
+    finally:
+        password.configure(app.config)
+
+
+# ---------------------------------------------------
+# STATELESS CLAIMS / REVOCATION
+# ---------------------------------------------------
+def _headers(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_token_claims_skip_principal_lookup(app, client, registered):
+    token = registered["access_token"]
+
+    with app.app_context():
+        claims = decode_token(token)
+
+    assert claims["sub"] == registered["ngo_id"]
+    assert claims["name"] == "Auth NGO"
+    assert claims["role"] == "ngo"
+
+    principal_cache.clear()
+    response = client.get("/shelters/my-shelters", headers=_headers(token))
+
+    assert response.status_code == 200
+    assert principal_cache.get(registered["ngo_id"]) is None
+
+
+def test_logout_revokes_token(client, registered):
+    token = registered["access_token"]
+
+    assert client.post("/auth/logout", headers=_headers(token)).status_code == 200
+    assert client.get("/shelters/my-shelters", headers=_headers(token)).status_code == 401
+    assert mongo.revoked_tokens().count_documents({}) == 1
+
+
+def test_deleted_ngo_tokens_are_revoked(app, client, registered):
+    with app.app_context():
+        delete_ngo(registered["ngo_id"])
+
+    assert client.get("/shelters/my-shelters", headers=_headers(registered["access_token"])).status_code == 401
+
+
+def test_denylist_picks_up_revocations_from_other_workers(app, client, registered):
+    token = registered["access_token"]
+
+    with app.app_context():
+        jti = decode_token(token)["jti"]
+
+    assert client.get("/shelters/my-shelters", headers=_headers(token)).status_code == 200
+
+    # Written by another process: only seen after the next refresh
+    mongo.revoked_tokens().insert_one({
+        "_id": revocation_service.JTI_PREFIX + jti,
+        "revoked_at": datetime.utcnow(),
+        "expires_at": datetime.utcnow() + timedelta(minutes=5)
+    })
+    revocation_service.denylist.refresh(force=True)
+
+    assert client.get("/shelters/my-shelters", headers=_headers(token)).status_code == 401
+
+
+def test_denylist_prunes_expired_entries(app):
+    denylist = revocation_service.Denylist()
+    now = datetime.utcnow()
+
+    entries = [
+        ("jti:old", now - timedelta(seconds=1)),
+        ("jti:new", now + timedelta(minutes=5)),
+        ("ngo:gone", now - timedelta(seconds=1)),
+        ("ngo:live", now + timedelta(minutes=5))
+    ]
+
+    for key, expires_at in entries:
+        denylist.add({"_id": key, "revoked_at": now - timedelta(minutes=1), "expires_at": expires_at})
+
+    with app.app_context():
+        denylist.refresh(force=True)
+
+    assert set(denylist.tokens) == {"new"}
+    assert set(denylist.ngos) == {"live"}
+
+
+# ---------------------------------------------------
+# BACKPRESSURE
+# ---------------------------------------------------
+def test_pool_rejects_when_saturated():
+    pool = PasswordPool(PasswordHasher(time_cost=1, memory_cost=64), workers=1, max_pending=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocker():
+        started.set()
+        release.wait()
+        return "done"
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(pool.submit(blocker)))
+    thread.start()
+    started.wait()
+
+    with pytest.raises(PasswordPoolBusy) as busy:
+        pool.submit(lambda: None)
+
+    release.set()
+    thread.join()
+    pool.shutdown()
+
+    assert busy.value.retry_after >= 1
+    assert results == ["done"]
+    assert pool.stats()["rejected"] == 1
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    pool = PasswordPool(PasswordHasher(time_cost=1, memory_cost=64), workers=1, max_pending=1, timeout=0.05)
+    release = threading.Event()
+    finished = threading.Event()
+
+    def blocker():
+        release.wait()
+        finished.set()
+
+    with pytest.raises(PasswordPoolBusy):
+        pool.submit(blocker)
+
+    # Still running on the pool, so it still counts
+    assert pool.stats()["pending"] == 1
+    assert pool.stats()["timed_out"] == 1
+
+    with pytest.raises(PasswordPoolBusy):
+        pool.submit(lambda: None)
+
+    release.set()
+    finished.wait()
+    pool.shutdown()
+
+    assert pool.stats()["pending"] == 0
+    assert pool.stats()["rejected"] == 1
@@ -0,0 +1,320 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from db import mongo
+from services import emergency_service, ngo_service, search_service, shelter_service
+from services.emergency_service import Dispatcher, DispatchQueue, dispatcher
+
+
+def _create_emergency_shelter(ngo_id, name, lat, lng, beds, **extra):
+    shelter_id = shelter_service.create_shelter(ngo_id, {
+        "name": name,
+        "total_beds": beds,
+        "available_beds": beds,
+        "latitude": lat,
+        "longitude": lng,
+        **extra
+    })
+    shelter_service.toggle_emergency_mode(shelter_id, True)
+
+    return shelter_id
+
+
+def _insert_queued_request(lat, lng):
+    document = {
+        "user_location_lat": lat,
+        "user_location_lng": lng,
+        "status": emergency_service.STATUS_QUEUED,
+        "shelter_id": None,
+        "ngo_id": None,
+        "created_at": datetime.utcnow()
+    }
+    mongo.emergency_requests().insert_one(document)
+
+    return document
+
+
+def _submit(client, ip="10.0.0.1", **body):
+    return client.post(
+        "/emergency/request",
+        json={"user_location_lat": 40.7127, "user_location_lng": -74.0061, **body},
+        environ_base={"REMOTE_ADDR": ip}
+    )
+
+
+@pytest.fixture
+def ngo_id(app):
+    with app.app_context():
+        return ngo_service.create_ngo({"ngo_name": "Relief", "email": "relief@example.org", "phone": "9999999999"})
+
+
+@pytest.fixture
+def auth_headers(app, ngo_id):
+    with app.app_context():
+        token = create_access_token(identity=ngo_id)
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ---------------------------------------------------
+# PRIORITY QUEUE
+# ---------------------------------------------------
+def test_queue_orders_by_priority_then_age():
+    queue = DispatchQueue()
+    now = datetime.utcnow()
+
+    queue.push({"id": "new-normal", "priority": "normal", "created_at": now})
+    queue.push({"id": "old-normal", "priority": "normal", "created_at": now - timedelta(hours=1)})
+    queue.push({"id": "new-critical", "priority": "critical", "created_at": now})
+    queue.push({"id": "new-high", "priority": "high", "created_at": now})
+
+    assert [item["id"] for item in queue.pop_batch(10)] == ["old-normal", "new-critical", "new-high", "new-normal"]
+
+
+def test_queue_skips_requests_already_waiting():
+    queue = DispatchQueue()
+    document = {"_id": "r1", "created_at": datetime.utcnow()}
+
+    assert queue.push(document)
+    assert not queue.push(dict(document))
+    assert len(queue.pop_batch(10)) == 1
+    assert queue.push(document)
+
+
+# ---------------------------------------------------
+# DISPATCH
+# ---------------------------------------------------
+def test_dispatch_assigns_nearest_open_shelter_without_overselling(app, client, ngo_id):
+    with app.app_context():
+        near = _create_emergency_shelter(ngo_id, "Near", 40.7128, -74.006, beds=3)
+        far = _create_emergency_shelter(ngo_id, "Far", 40.80, -73.95, beds=2)
+        shelter_service.create_shelter(ngo_id, {
+            "name": "Closed", "total_beds": 50, "available_beds": 50, "latitude": 40.7129, "longitude": -74.006
+        })
+
+    request_ids = [_submit(client, ip=f"10.0.0.{n}").json["request_id"] for n in range(7)]
+
+    dispatcher.wait_for_idle()
+
+    statuses = [client.get(f"/emergency/request/{request_id}").json for request_id in request_ids]
+
+    assert [status["shelter_id"] for status in statuses[:5]] == [near] * 3 + [far] * 2
+    assert [status["status"] for status in statuses[5:]] == ["unassigned", "unassigned"]
+
+    with app.app_context():
+        assert shelter_service.get_shelter_by_id(near)["available_beds"] == 0
+        assert shelter_service.get_shelter_by_id(far)["available_beds"] == 0
+
+
+def test_dispatch_respects_request_needs(app, client, ngo_id):
+    with app.app_context():
+        _create_emergency_shelter(ngo_id, "Men only", 19.07, 72.87, beds=10, gender="men")
+        family = _create_emergency_shelter(ngo_id, "Family", 19.20, 72.95, beds=10, gender="family")
+
+    response = client.post("/emergency/request", json={
+        "user_location_lat": 19.07,
+        "user_location_lng": 72.87,
+        "gender": "family",
+        "people": 4,
+        "priority": "critical"
+    })
+
+    dispatcher.wait_for_idle()
+
+    status = client.get(f"/emergency/request/{response.json['request_id']}").json
+
+    assert status["shelter_id"] == family
+
+    with app.app_context():
+        assert shelter_service.get_shelter_by_id(family)["available_beds"] == 6
+
+
+def test_invalid_request_is_rejected(client):
+    response = client.post("/emergency/request", json={"user_location_lat": 95})
+
+    assert response.status_code == 400
+    assert emergency_service.dispatcher.queue.pop_batch(1) == []
+
+
+# ---------------------------------------------------
+# RECOVERY
+# ---------------------------------------------------
+def test_dispatcher_start_recovers_requests_left_queued(app, ngo_id):
+    recovering = Dispatcher()
+
+    with app.app_context():
+        shelter_id = _create_emergency_shelter(ngo_id, "Shelter", 40.7128, -74.006, beds=2)
+        document = _insert_queued_request(40.7127, -74.0061)
+
+        recovering.start()
+
+        try:
+            deadline = time.monotonic() + 2
+
+            while time.monotonic() < deadline and emergency_service.get_emergency_request(document["_id"])["status"] == "queued":
+                time.sleep(0.01)
+        finally:
+            recovering.stop()
+
+        assert emergency_service.get_emergency_request(document["_id"])["shelter_id"] == shelter_id
+
+
+def test_recover_only_takes_requests_whose_claim_expired(app, ngo_id):
+    holder, other = Dispatcher(), Dispatcher()
+
+    with app.app_context():
+        held = _insert_queued_request(40.7127, -74.0061)
+        mongo.emergency_requests().update_one({"_id": held["_id"]}, {"$set": holder.claim_fields(datetime.utcnow())})
+        unclaimed = _insert_queued_request(40.7127, -74.0061)
+
+        assert other.recover() == 1
+        assert [document["_id"] for document in other.queue.pop_batch(10)] == [unclaimed["_id"]]
+        assert other.recover() == 0
+
+        # holder renews its claim; once it stops (worker died) the lease runs out
+        assert holder.renew_claims() == 1
+        mongo.emergency_requests().update_one(
+            {"_id": held["_id"]},
+            {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+
+        assert other.recover() == 1
+        assert emergency_service.get_emergency_request(held["_id"])["claimed_by"] == other.owner
+
+
+def test_failed_batch_is_retried_then_marked_failed(app, ngo_id, monkeypatch):
+    retrying = Dispatcher()
+    calls = []
+
+    def unavailable():
+        calls.append(1)
+        raise RuntimeError("index unavailable")
+
+    with app.app_context():
+        shelter_id = _create_emergency_shelter(ngo_id, "Shelter", 40.7128, -74.006, beds=2)
+        retried = _insert_queued_request(40.7127, -74.0061)
+        retrying.queue.push(retried)
+
+        with monkeypatch.context() as patched:
+            patched.setattr(search_service, "open_emergency_shelters", unavailable)
+
+            with pytest.raises(RuntimeError):
+                retrying.run_once()
+
+        assert retrying.run_once() == 1
+        assert emergency_service.get_emergency_request(retried["_id"])["shelter_id"] == shelter_id
+
+        given_up = _insert_queued_request(40.7127, -74.0061)
+        retrying.queue.push(given_up)
+        monkeypatch.setattr(search_service, "open_emergency_shelters", unavailable)
+
+        for _ in range(emergency_service.DISPATCH_MAX_ATTEMPTS):
+            with pytest.raises(RuntimeError):
+                retrying.run_once()
+
+        assert len(retrying.queue) == 0
+        assert emergency_service.get_emergency_request(given_up["_id"])["status"] == "failed"
+
+
+def test_beds_are_released_when_the_request_was_handled_elsewhere(app, ngo_id):
+    racing = Dispatcher()
+
+    with app.app_context():
+        shelter_id = _create_emergency_shelter(ngo_id, "Shelter", 40.7128, -74.006, beds=2)
+        document = _insert_queued_request(40.7127, -74.0061)
+        too_big = {**_insert_queued_request(40.7127, -74.0061), "people": 5}
+        racing.queue.push(document)
+        racing.queue.push(too_big)
+
+        # Another worker handled them after this one queued them
+        mongo.emergency_requests().update_many({}, {"$set": {"status": "pending"}})
+
+        racing.run_once()
+
+        assert racing.assigned == 0
+        assert racing.unassigned == 0
+        assert shelter_service.get_shelter_by_id(shelter_id)["available_beds"] == 2
+
+
+# ---------------------------------------------------
+# ABUSE LIMITS / BED HOLDS
+# ---------------------------------------------------
+def test_submissions_are_rate_limited_per_ip_and_phone(app, client):
+    app.config["EMERGENCY_RATE_LIMIT"] = 2
+
+    assert _submit(client, ip="10.0.0.1", user_phone="555-0100").status_code == 202
+    assert _submit(client, ip="10.0.0.1").status_code == 202
+
+    limited = _submit(client, ip="10.0.0.1")
+
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) > 0
+
+    # A new IP does not reset the phone number's budget
+    assert _submit(client, ip="10.0.0.2", user_phone="555-0100").status_code == 202
+    assert _submit(client, ip="10.0.0.3", user_phone="555-0100").status_code == 429
+
+
+def test_requester_cancel_releases_the_held_beds(app, client, ngo_id):
+    with app.app_context():
+        shelter_id = _create_emergency_shelter(ngo_id, "Shelter", 40.7128, -74.006, beds=5)
+
+    submitted = _submit(client, people=3).json
+    dispatcher.wait_for_idle()
+
+    url = f"/emergency/request/{submitted['request_id']}/cancel"
+
+    assert client.post(url, json={"cancel_token": "guess"}).status_code == 404
+    assert client.post(url, json={"cancel_token": submitted["cancel_token"]}).status_code == 200
+    assert client.post(url, json={"cancel_token": submitted["cancel_token"]}).status_code == 404
+    assert client.get(f"/emergency/request/{submitted['request_id']}").json["status"] == "cancelled"
+
+    with app.app_context():
+        assert shelter_service.get_shelter_by_id(shelter_id)["available_beds"] == 5
+        assert "cancel_token_hash" not in emergency_service.get_requests_for_ngo(ngo_id)[0]
+
+
+def test_ngo_accepts_or_declines_pending_requests(app, client, ngo_id, auth_headers):
+    with app.app_context():
+        near = _create_emergency_shelter(ngo_id, "Near", 40.7128, -74.006, beds=4)
+        other_ngo = ngo_service.create_ngo({"ngo_name": "Other", "email": "other@example.org", "phone": "8888888888"})
+        far = _create_emergency_shelter(other_ngo, "Far", 40.80, -73.95, beds=4)
+        other_headers = {"Authorization": f"Bearer {create_access_token(identity=other_ngo)}"}
+
+    accepted = _submit(client, ip="10.0.0.1", people=2).json["request_id"]
+    declined = _submit(client, ip="10.0.0.2", people=2).json["request_id"]
+    dispatcher.wait_for_idle()
+
+    # Only the NGO of the assigned shelter can answer
+    assert client.post(f"/emergency/requests/{accepted}/accept", headers=other_headers).status_code == 404
+    assert client.post(f"/emergency/requests/{accepted}/accept", headers=auth_headers).json["status"] == "accepted"
+    assert client.post(f"/emergency/requests/{accepted}/decline", headers=auth_headers).status_code == 404
+
+    assert client.post(f"/emergency/requests/{declined}/decline", headers=auth_headers).json["status"] == "queued"
+    dispatcher.wait_for_idle()
+
+    # Re-dispatched past the declining shelter, even though it has room again
+    assert client.get(f"/emergency/request/{declined}").json["shelter_id"] == far
+
+    with app.app_context():
+        assert shelter_service.get_shelter_by_id(near)["available_beds"] == 2
+        assert shelter_service.get_shelter_by_id(far)["available_beds"] == 2
+
+
+def test_unaccepted_holds_expire(app, client, ngo_id):
+    with app.app_context():
+        shelter_id = _create_emergency_shelter(ngo_id, "Shelter", 40.7128, -74.006, beds=4)
+
+    request_id = _submit(client, people=3).json["request_id"]
+    dispatcher.wait_for_idle()
+
+    with app.app_context():
+        assert emergency_service.expire_holds() == 0
+        assert emergency_service.expire_holds(datetime.utcnow() + timedelta(seconds=1)) == 1
+        assert emergency_service.expire_holds(datetime.utcnow() + timedelta(seconds=1)) == 0
+
+        assert emergency_service.get_emergency_request(request_id)["status"] == "expired"
+        assert shelter_service.get_shelter_by_id(shelter_id)["available_beds"] == 4
@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from db import mongo
+from services import job_service, ngo_service, shelter_service
+from services.job_handlers import HANDLERS
+from services.job_worker import JobWorker
+
+
+def _worker(**kwargs):
+    return JobWorker(lambda: ThreadPoolExecutor(max_workers=2), concurrency=2, poll_seconds=0.01, **kwargs)
+
+
+def _drain(worker, rounds=20):
+    for _ in range(rounds):
+        worker.run_once(timeout=0.05)
+
+
+def _pid(payload):
+    return {"pid": os.getpid(), **payload}
+
+
+def _flaky(payload):
+    raise RuntimeError("upstream unavailable")
+
+
+_release_stuck = threading.Event()
+
+
+def _stuck(payload):
+    _release_stuck.wait(5)
+    return {}
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    monkeypatch.setitem(HANDLERS, "pid", _pid)
+    monkeypatch.setitem(HANDLERS, "flaky", _flaky)
+    monkeypatch.setitem(HANDLERS, "stuck", _stuck)
+
+
+# ---------------------------------------------------
+# RUN / RETRY
+# ---------------------------------------------------
+def test_worker_runs_jobs_and_counts_per_type(app, handlers):
+    with app.app_context():
+        job_ids = [job_service.enqueue("pid", {"n": n}) for n in range(3)]
+        job_ids.append(job_service.enqueue("reconcile_ngo_stats"))
+
+        worker = _worker()
+        _drain(worker)
+
+        jobs = [job_service.get_job(job_id) for job_id in job_ids]
+
+    assert [job["status"] for job in jobs] == ["done"] * 4
+    assert [job["result"]["n"] for job in jobs[:3]] == [0, 1, 2]
+    assert jobs[3]["result"] == {"ngo_stats": 0}
+    assert "lease_owner" not in jobs[0]
+    assert worker.stats["pid"]["done"] == 3
+    assert worker.stats["reconcile_ngo_stats"]["done"] == 1
+    assert job_service.queue_counts() == {"pid": {"done": 3}, "reconcile_ngo_stats": {"done": 1}}
+
+
+def test_failed_jobs_back_off_then_fail(app, handlers):
+    with app.app_context():
+        job_id = job_service.enqueue("flaky", max_attempts=2)
+        worker = _worker()
+
+        _drain(worker, rounds=2)
+        retried = job_service.get_job(job_id)
+
+        assert retried["status"] == "queued"
+        assert retried["attempts"] == 1
+        assert retried["run_at"] > datetime.utcnow() + timedelta(seconds=job_service.DEFAULT_BACKOFF_SECONDS / 2 - 1)
+        assert "upstream unavailable" in retried["error"]
+
+        # Make it due now instead of waiting out the backoff
+        mongo.jobs().update_one({"_id": retried["_id"]}, {"$set": {"run_at": datetime.utcnow()}})
+        _drain(worker, rounds=2)
+
+        assert job_service.get_job(job_id)["status"] == "failed"
+        assert worker.stats["flaky"] == {"done": 0, "retry": 1, "failed": 1, "lease_lost": 0, "seconds": pytest.approx(worker.stats["flaky"]["seconds"])}
+
+
+# ---------------------------------------------------
+# LEASES
+# ---------------------------------------------------
+def test_expired_lease_is_reclaimed_and_stale_owner_cannot_finish(app, handlers):
+    with app.app_context():
+        job_id = job_service.enqueue("pid")
+
+        # A worker claims the job, then dies without heartbeating
+        dead = job_service.claim("dead-worker", lease_seconds=30)
+
+        assert job_service.heartbeat(job_id, "dead-worker", lease_seconds=30)
+        assert job_service.reap_expired() == (0, 0)
+        assert job_service.reap_expired(datetime.utcnow() + timedelta(seconds=31)) == (1, 0)
+
+        worker = _worker()
+        _drain(worker, rounds=2)
+
+        # The dead worker's late result is ignored
+        assert not job_service.complete(job_id, "dead-worker", {"stale": True})
+        assert not job_service.heartbeat(job_id, "dead-worker")
+
+        job = job_service.get_job(job_id)
+
+    assert dead["attempts"] == 1
+    assert job["status"] == "done"
+    assert job["attempts"] == 2
+    assert "stale" not in job["result"]
+
+
+def test_job_past_its_max_runtime_stops_heartbeating(app, handlers):
+    _release_stuck.clear()
+
+    with app.app_context():
+        job_id = job_service.enqueue("stuck")
+        worker = _worker(max_runtime={"stuck": 0})
+
+        worker.run_once(timeout=0.01)
+        claimed = job_service.get_job(job_id)
+
+        worker.send_heartbeats()
+
+        assert job_service.get_job(job_id)["lease_expires_at"] == claimed["lease_expires_at"]
+        assert job_service.reap_expired(claimed["lease_expires_at"] + timedelta(seconds=1)) == (1, 0)
+
+        _release_stuck.set()
+        worker.run_once(timeout=1)
+
+    assert worker.stats["stuck"]["lease_lost"] == 1
+    assert worker._overrun == set()
+
+
+def test_seed_job_reruns_replace_only_their_own_documents(app):
+    with app.app_context():
+        ngo_id = ngo_service.create_ngo({"ngo_name": "Real", "email": "real@example.org", "phone": "9999999999"})
+        shelter_service.create_shelter(ngo_id, {"name": "Real shelter", "total_beds": 10, "available_beds": 10})
+
+        first = HANDLERS["seed"]({"shelters": 20})
+        retried = HANDLERS["seed"]({"shelters": 20})
+
+        assert retried["seed_run"] == first["seed_run"]
+        assert mongo.shelters().count_documents({"seed_run": first["seed_run"]}) == 20
+        assert mongo.shelters().count_documents({"seed_run": {"$exists": False}}) == 1
+        assert mongo.ngos().count_documents({"email": "real@example.org"}) == 1
+
+
+def test_jobs_run_in_a_process_pool(app, handlers):
+    context = multiprocessing.get_context("fork")
+
+    with app.app_context():
+        job_id = job_service.enqueue("pid", {"n": 1})
+
+        worker = JobWorker(lambda: ProcessPoolExecutor(max_workers=1, mp_context=context), concurrency=1, poll_seconds=0.01)
+        _drain(worker, rounds=5)
+        worker._executor.shutdown()
+
+        job = job_service.get_job(job_id)
+
+    assert job["status"] == "done"
+    assert job["result"]["pid"] != os.getpid()
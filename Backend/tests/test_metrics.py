@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from flask_jwt_extended import create_access_token
+from prometheus_client import REGISTRY
+
+from services import metrics_service, ngo_service
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+# ---------------------------------------------------
+# REQUEST + STAGE HISTOGRAMS
+# ---------------------------------------------------
+def test_requests_are_timed_per_route_and_stage(app, client):
+    with app.app_context():
+        ngo_id = ngo_service.create_ngo({"ngo_name": "Metrics NGO", "email": "m@example.org"})
+        token = create_access_token(identity=ngo_id)
+
+    route = "/shelters/my-shelters"
+    labels = {"blueprint": "shelter_bp", "route": route, "method": "GET", "status": "200"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+    jwt_before = _sample("http_request_stage_duration_seconds_count", route=route, stage="jwt_verify")
+    misses_before = _sample("cache_requests_total", cache="principal", result="miss")
+
+    for _ in range(2):
+        assert client.get(route, headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 2
+    assert _sample("http_request_stage_duration_seconds_count", route=route, stage="jwt_verify") == jwt_before + 2
+    assert _sample("cache_requests_total", cache="principal", result="miss") == misses_before + 1
+
+    body = client.get("/metrics").get_data(as_text=True)
+
+    assert 'http_request_duration_seconds_bucket{blueprint="shelter_bp"' in body
+    assert 'route="/metrics"' not in body
+
+
+def test_unknown_routes_return_json(client):
+    response = client.get("/no-such-route")
+
+    assert response.status_code == 404
+    assert "error" in response.get_json()
+
+
+# ---------------------------------------------------
+# MONGODB COMMAND LISTENER
+# ---------------------------------------------------
+def test_command_listener_times_commands_by_collection():
+    listener = metrics_service.MongoCommandListener()
+    before = _sample("mongodb_command_duration_seconds_count", command="find", collection="shelters")
+
+    started = SimpleNamespace(command_name="find", command={"find": "shelters"}, connection_id=("h", 1), request_id=7)
+    succeeded = SimpleNamespace(command_name="find", connection_id=("h", 1), request_id=7, duration_micros=1500)
+
+    listener.started(started)
+    listener.succeeded(succeeded)
+
+    assert _sample("mongodb_command_duration_seconds_count", command="find", collection="shelters") == before + 1
+    assert not listener._collections
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from app import create_app
+from config import TestConfig
+from middleware import request_profiler
+from utils.profiler import StackSampler, to_collapsed, to_speedscope
+
+
+def _profiled_app(tmp_path, **settings):
+    config = type("ProfiledConfig", (TestConfig,), {
+        "PROFILER_ADMIN_TOKEN": "let-me-see",
+        "PROFILER_OUTPUT_DIR": str(tmp_path),
+        "PROFILER_INTERVAL_MS": 0.5,
+        **settings
+    })
+
+    return create_app(config)
+
+
+# ---------------------------------------------------
+# HOOK SELECTION
+# ---------------------------------------------------
+def test_profiler_is_not_registered_by_default(app):
+    assert all(fn.__name__ != "start_profile" for fn in app.before_request_funcs.get(None, []))
+
+
+def test_admin_header_writes_profile_and_mongo_log(tmp_path):
+    app = _profiled_app(tmp_path, PROFILER_FORMAT="collapsed")
+    client = app.test_client()
+
+    assert request_profiler.PROFILE_ID_HEADER not in client.get("/public/shelters/nearby?lat=1&lng=2").headers
+    assert request_profiler.PROFILE_ID_HEADER not in client.get(
+        "/public/shelters/nearby?lat=1&lng=2", headers={"X-Profile": "wrong"}
+    ).headers
+
+    response = client.get("/public/shelters/nearby?lat=1&lng=2", headers={"X-Profile": "let-me-see"})
+    profile_id = response.headers[request_profiler.PROFILE_ID_HEADER]
+
+    assert os.path.exists(tmp_path / f"{profile_id}.collapsed")
+
+    with open(tmp_path / f"{profile_id}.json") as f:
+        meta = json.load(f)
+
+    assert meta["route"] == "/public/shelters/nearby"
+    assert meta["status"] == 200
+    assert meta["mongo_ops"] == []
+
+
+def test_sample_rate_profiles_without_header(tmp_path):
+    app = _profiled_app(tmp_path, PROFILER_ADMIN_TOKEN="", PROFILER_SAMPLE_RATE=1.0)
+
+    profile_id = app.test_client().get("/public/shelters/nearby?lat=1&lng=2").headers[request_profiler.PROFILE_ID_HEADER]
+
+    with open(tmp_path / f"{profile_id}.speedscope.json") as f:
+        assert json.load(f)["profiles"][0]["type"] == "sampled"
+
+
+def test_only_the_newest_profiles_are_kept(tmp_path):
+    client = _profiled_app(tmp_path, PROFILER_KEEP=2).test_client()
+
+    profile_ids = [
+        client.get("/public/shelters/nearby?lat=1&lng=2", headers={"X-Profile": "let-me-see"}).headers[request_profiler.PROFILE_ID_HEADER]
+        for _ in range(3)
+    ]
+
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        f"{profile_id}{suffix}" for profile_id in profile_ids[1:] for suffix in (".json", ".speedscope.json")
+    )
+
+
+# ---------------------------------------------------
+# SAMPLER + MONGO LOG
+# ---------------------------------------------------
+def test_sampler_captures_stacks_with_mongo_leaf():
+    sampler = StackSampler(threading.get_ident(), 0.0005, marker=lambda: ("mongo find shelters", "", 0))
+    sampler.start()
+
+    deadline = time.perf_counter() + 0.05
+
+    while time.perf_counter() < deadline:
+        time.sleep(0.001)
+
+    samples = sampler.stop()
+
+    assert samples
+    assert all(stack[-1][0] == "mongo find shelters" for stack, _ in samples)
+    assert "test_sampler_captures_stacks_with_mongo_leaf" in to_collapsed(samples)
+    assert len(to_speedscope(samples, "test", sampler.elapsed)["profiles"][0]["weights"]) == len(samples)
+
+
+def test_command_listener_records_ops_of_profiled_thread():
+    listener = request_profiler.ProfileCommandListener()
+    session = request_profiler.ProfileSession(0.001)
+    session.sampler.started = time.perf_counter()
+
+    started = SimpleNamespace(command_name="find", command={"find": "shelters"}, connection_id=1, request_id=3)
+    succeeded = SimpleNamespace(command_name="find", connection_id=1, request_id=3, duration_micros=2500)
+
+    # Not profiled: ignored
+    listener.started(started)
+    listener.succeeded(succeeded)
+    assert session.mongo_ops == []
+
+    request_profiler._local.session = session
+
+    try:
+        listener.started(started)
+        assert session.current_op[0] == "mongo find shelters"
+        listener.succeeded(succeeded)
+    finally:
+        request_profiler._local.session = None
+
+    assert session.current_op is None
+    assert session.mongo_ops[0]["command"] == "mongo find shelters"
+    assert session.mongo_ops[0]["duration_ms"] == 2.5
@@ -0,0 +1,191 @@
+"""
+Query-plan regression suite.
+
+Runs every Mongo command issued by the service layer through explain()
+and fails if any of them is planned as a COLLSCAN. Needs a real mongod
+(mongomock has no query planner); set MONGO_TEST_URI to point at one.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import MongoClient, monitoring
+from pymongo.errors import PyMongoError
+
+from db import mongo
+from db.indexes import ensure_indexes
+from services import ngo_service, shelter_service, snapshot_service
+
+
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI", "mongodb://localhost:27017")
+TEST_DB_NAME = "shelter_connect_plan_test"
+
+EXPLAINABLE = {"find", "update", "delete", "findAndModify", "count", "distinct", "aggregate"}
+
+# Internal/session fields that explain() rejects inside the wrapped command
+STRIP_FIELDS = {"lsid", "$db", "$clusterTime", "txnNumber", "$readPreference", "readConcern"}
+
+# Deliberate full-collection reads (list_all_*, index rebuilds, exports)
+FULL_SCAN_FILTERS = ({},)
+
+
+class CommandRecorder(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+        self.recording = False
+
+    def started(self, event):
+        if self.recording and event.command_name in EXPLAINABLE:
+            command = {
+                key: value
+                for key, value in event.command.items()
+                if key not in STRIP_FIELDS
+            }
+            self.commands.append(command)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+recorder = CommandRecorder()
+monitoring.register(recorder)
+
+
+@pytest.fixture
+def plan_db(app):
+    probe = MongoClient(MONGO_TEST_URI, serverSelectionTimeoutMS=500)
+
+    try:
+        probe.admin.command("ping")
+    except PyMongoError:
+        pytest.skip(f"no mongod at {MONGO_TEST_URI}")
+    finally:
+        probe.close()
+
+    mongo.configure(MONGO_URI=MONGO_TEST_URI, MONGO_DB_NAME=TEST_DB_NAME)
+    mongo.get_client().drop_database(TEST_DB_NAME)
+    ensure_indexes()
+
+    yield mongo.get_db()
+
+    mongo.get_client().drop_database(TEST_DB_NAME)
+    mongo.configure(MONGO_URI=app.config["MONGO_URI"], MONGO_DB_NAME=app.config["MONGO_DB_NAME"])
+
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+
+        for value in plan.values():
+            yield from _stages(value)
+
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _stages(item)
+
+
+def _winning_plans(explained):
+    """
+    Winning plans anywhere in an explain() result
+    (aggregate nests them under $cursor / shards)
+    """
+
+    if isinstance(explained, dict):
+        for key, value in explained.items():
+            if key == "winningPlan":
+                yield value
+            else:
+                yield from _winning_plans(value)
+
+    elif isinstance(explained, list):
+        for item in explained:
+            yield from _winning_plans(item)
+
+
+def _query_filter(command):
+    if "filter" in command:
+        return command["filter"]
+
+    if "query" in command:
+        return command["query"]
+
+    for key in ("updates", "deletes"):
+        if key in command:
+            return command[key][0].get("q")
+
+    return None
+
+
+def _exercise_services():
+    """
+    Call every service function that queries MongoDB
+    """
+
+    ngo_id = ngo_service.create_ngo({
+        "ngo_name": "Plan Test NGO",
+        "email": "plans@example.org",
+        "phone": "9999999999"
+    })
+
+    shelter_id = shelter_service.create_shelter(ngo_id, {
+        "name": "Plan Test Shelter",
+        "total_beds": 10,
+        "available_beds": 5,
+        "latitude": 19.07,
+        "longitude": 72.87
+    })
+
+    ngo_service.get_ngo_by_email("plans@example.org")
+    ngo_service.get_ngo_by_id(ngo_id)
+    ngo_service.principal_cache.clear()
+    ngo_service.get_ngo_principal(ngo_id)
+    ngo_service.update_ngo_profile(ngo_id, {"phone": "8888888888"})
+
+    shelter_service.get_shelter_by_id(shelter_id)
+    shelter_service.get_shelters_by_ngo(ngo_id)
+    shelter_service.get_shelters_by_ngo(ngo_id, after=shelter_id, view="card")
+    shelter_service.list_all_shelters(after=shelter_id)
+    shelter_service.update_shelter(shelter_id, {"name": "Renamed Shelter"})
+    shelter_service.update_available_beds(shelter_id, 4)
+    shelter_service.toggle_emergency_mode(shelter_id, True)
+    shelter_service.delete_shelter(shelter_id)
+    snapshot_service.build_delta(snapshot_service.to_version(datetime.utcnow() - timedelta(minutes=1)))
+
+    ngo_service.delete_ngo(ngo_id)
+
+
+def test_service_queries_use_indexes(app, plan_db):
+    with app.app_context():
+        recorder.commands = []
+        recorder.recording = True
+
+        try:
+            _exercise_services()
+        finally:
+            recorder.recording = False
+
+        assert recorder.commands, "no service queries were recorded"
+
+        collscans = []
+
+        for command in recorder.commands:
+            if _query_filter(command) in FULL_SCAN_FILTERS:
+                continue
+
+            explained = plan_db.command("explain", command, verbosity="queryPlanner")
+
+            stages = {
+                stage
+                for plan in _winning_plans(explained)
+                for stage in _stages(plan)
+            }
+
+            if "COLLSCAN" in stages:
+                collscans.append(command)
+
+        assert not collscans, f"queries without index: {collscans}"
@@ -0,0 +1,35 @@
+from bson import ObjectId
+
+from db import mongo
+from db.seed import seed
+
+
+def test_seed_generates_consistent_dataset(app):
+    report = seed(200, rng_seed=1)
+
+    assert report["ngos"]["count"] == 10
+    assert report["shelters"]["count"] == 200
+    assert report["emergency_requests"]["count"] == 40
+
+    ngo_ids = {str(ngo["_id"]) for ngo in mongo.ngos().find({}, {"_id": 1})}
+
+    for shelter in mongo.shelters().find():
+        lng, lat = shelter["location"]["coordinates"]
+
+        assert shelter["ngo_id"] in ngo_ids
+        assert 0 <= shelter["available_beds"] <= shelter["total_beds"]
+        assert 5 < lat < 35 and 65 < lng < 95
+
+    for request in mongo.emergency_requests().find({"status": "assigned"}):
+        shelter = mongo.shelters().find_one({"_id": ObjectId(request["shelter_id"])})
+
+        assert shelter["ngo_id"] == request["ngo_id"]
+
+
+def test_seed_is_deterministic(app):
+    seed(50, rng_seed=3)
+    first = [shelter["name"] for shelter in mongo.shelters().find()]
+
+    seed(50, rng_seed=3, drop=True)
+
+    assert [shelter["name"] for shelter in mongo.shelters().find()] == first
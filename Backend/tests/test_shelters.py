@@ -0,0 +1,779 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import Decimal128, ObjectId
+from flask_jwt_extended import create_access_token
+
+from db import mongo
+from routes import public_routes
+from services import (
+    cache_service,
+    dashboard_service,
+    ngo_service,
+    realtime_service,
+    search_service,
+    shelter_service,
+    snapshot_service
+)
+from schemas.shelter_schema import (
+    BedReservationSchema,
+    BedUpdateSchema,
+    BulkBedUpdateSchema,
+    EmergencyToggleSchema,
+    UpdateShelterSchema
+)
+from utils.cache import LocalCacheBackend, RedisCacheBackend
+from utils.geo_helpers import geohash_encode, geohash_neighbors
+from utils.time_helpers import now_ms
+from utils.validators import compile_fast_path
+
+
+WRITERS = 200
+
+
+@pytest.fixture
+def ngo_id(app):
+    with app.app_context():
+        return ngo_service.create_ngo({
+            "ngo_name": "Test NGO",
+            "email": "ngo@example.org",
+            "phone": "9999999999"
+        })
+
+
+@pytest.fixture
+def auth_headers(app, ngo_id):
+    with app.app_context():
+        token = create_access_token(identity=ngo_id)
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def shelter_id(app, ngo_id):
+    with app.app_context():
+        return shelter_service.create_shelter(ngo_id, {
+            "name": "Harbor Haven",
+            "total_beds": 150,
+            "available_beds": 100,
+            "latitude": 40.7128,
+            "longitude": -74.006
+        })
+
+
+def _run_concurrently(app, target, count=WRITERS):
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def worker(index):
+        with app.app_context():
+            barrier.wait()
+            results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+# ---------------------------------------------------
+# ATOMIC RESERVE / RELEASE
+# ---------------------------------------------------
+def test_concurrent_reservations_never_oversell(app, shelter_id):
+    results = _run_concurrently(app, lambda: shelter_service.reserve_beds(shelter_id))
+
+    granted = [result for result in results if result]
+
+    with app.app_context():
+        shelter = shelter_service.get_shelter_by_id(shelter_id)
+
+    assert len(granted) == 100
+    assert shelter["available_beds"] == 0
+    assert shelter["version"] == 100
+    assert sorted(result["available_beds"] for result in granted) == list(range(100))
+
+
+def test_concurrent_releases_stop_at_total_beds(app, shelter_id):
+    results = _run_concurrently(app, lambda: shelter_service.release_beds(shelter_id))
+
+    with app.app_context():
+        shelter = shelter_service.get_shelter_by_id(shelter_id)
+
+    assert sum(1 for result in results if result) == 50
+    assert shelter["available_beds"] == 150
+
+
+def test_mixed_writers_lose_no_updates(app, shelter_id):
+    def reserve_then_release():
+        reserved = shelter_service.reserve_beds(shelter_id)
+
+        if reserved:
+            shelter_service.release_beds(shelter_id)
+
+        return reserved
+
+    results = _run_concurrently(app, reserve_then_release)
+
+    with app.app_context():
+        shelter = shelter_service.get_shelter_by_id(shelter_id)
+
+    reserved = sum(1 for result in results if result)
+
+    assert shelter["available_beds"] == 100
+    assert shelter["version"] == 2 * reserved
+
+
+def test_only_the_owning_ngo_can_reserve_or_release(app, client, auth_headers, shelter_id):
+    with app.app_context():
+        other_ngo = ngo_service.create_ngo({"ngo_name": "Other NGO", "email": "other@example.org", "phone": "8888888888"})
+        other_headers = {"Authorization": f"Bearer {create_access_token(identity=other_ngo)}"}
+
+    for path in ("reserve-beds", "release-beds"):
+        response = client.post(f"/shelters/{path}/{shelter_id}", json={"count": 1}, headers=other_headers)
+
+        assert response.status_code == 404
+
+    assert client.post(f"/shelters/reserve-beds/{shelter_id}", json={"count": 1}, headers=auth_headers).status_code == 200
+
+    with app.app_context():
+        assert shelter_service.get_shelter_by_id(shelter_id)["available_beds"] == 99
+
+
+# ---------------------------------------------------
+# UPDATE BEDS WITH ETAG PRECONDITION
+# ---------------------------------------------------
+def test_update_beds_requires_matching_version(client, auth_headers, shelter_id):
+    response = client.get(f"/shelters/{shelter_id}", headers=auth_headers)
+    etag = response.headers["ETag"]
+
+    first = client.patch(
+        f"/shelters/update-beds/{shelter_id}",
+        json={"available_beds": 90},
+        headers={**auth_headers, "If-Match": etag}
+    )
+    stale = client.patch(
+        f"/shelters/update-beds/{shelter_id}",
+        json={"available_beds": 80},
+        headers={**auth_headers, "If-Match": etag}
+    )
+
+    assert first.status_code == 200
+    assert first.json["available_beds"] == 90
+    assert first.headers["ETag"] != etag
+
+    assert stale.status_code == 412
+    assert stale.json["available_beds"] == 90
+
+
+def test_update_beds_rejects_more_than_total(client, auth_headers, shelter_id):
+    response = client.patch(
+        f"/shelters/update-beds/{shelter_id}",
+        json={"available_beds": 151},
+        headers=auth_headers
+    )
+
+    assert response.status_code == 400
+
+
+# ---------------------------------------------------
+# REQUEST VALIDATION
+# ---------------------------------------------------
+@pytest.mark.parametrize("schema, payload", [
+    (BedUpdateSchema(), {"available_beds": 4}),
+    (BedReservationSchema(), {}),
+    (EmergencyToggleSchema(), {"status": False}),
+    (UpdateShelterSchema(), {"name": "Harbor", "latitude": 40, "gender": "women"}),
+    (UpdateShelterSchema(), {"total_beds": 5, "available_beds": 5}),
+    (BulkBedUpdateSchema(), {"updates": [{"shelter_id": "a" * 24, "available_beds": 0}]})
+])
+def test_fast_path_matches_marshmallow(schema, payload):
+    assert compile_fast_path(schema)(payload) == schema.load(payload)
+
+
+@pytest.mark.parametrize("payload", [
+    {"available_beds": -1},
+    {"available_beds": "4"},
+    {"available_beds": True},
+    {"available_beds": 4, "total_beds": 9},
+    {},
+    []
+])
+def test_fast_path_defers_anything_unusual(payload):
+    assert compile_fast_path(BedUpdateSchema())(payload) is None
+
+
+def test_fast_path_defers_schema_validator_failures():
+    assert compile_fast_path(UpdateShelterSchema())({"total_beds": 4, "available_beds": 5}) is None
+
+
+def test_routes_reject_invalid_bodies(client, auth_headers, shelter_id):
+    response = client.patch(f"/shelters/update-beds/{shelter_id}", headers=auth_headers, json={"available_beds": -3})
+
+    assert response.status_code == 400
+    assert "available_beds" in response.json["details"]
+
+    response = client.patch(f"/shelters/toggle-emergency/{shelter_id}", headers=auth_headers, json={"status": "maybe"})
+
+    assert response.status_code == 400
+
+    response = client.put(f"/shelters/update/{shelter_id}", headers=auth_headers, json={"emergency_mode": True})
+
+    assert response.status_code == 400
+    assert "emergency_mode" in response.json["details"]
+
+
+def test_update_keeps_available_beds_within_total(app, client, auth_headers, shelter_id):
+    def edit(body, target=shelter_id):
+        return client.put(f"/shelters/update/{target}", headers=auth_headers, json=body)
+
+    # Both counts: rejected by the schema
+    response = edit({"total_beds": 10, "available_beds": 20})
+
+    assert response.status_code == 400
+    assert "available_beds" in response.json["details"]
+
+    # One count: checked against the stored other one (150 total, 100 available)
+    assert edit({"available_beds": 151}).status_code == 400
+    assert edit({"total_beds": 99}).status_code == 400
+    assert edit({"total_beds": 99}, target=str(ObjectId())).status_code == 404
+
+    with app.app_context():
+        unchanged = shelter_service.get_shelter_by_id(shelter_id)
+
+    assert (unchanged["total_beds"], unchanged["available_beds"]) == (150, 100)
+
+    assert edit({"total_beds": 100}).status_code == 200
+    assert edit({"available_beds": 100}).status_code == 200
+    assert edit({"total_beds": 20, "available_beds": 20}).status_code == 200
+
+    with app.app_context():
+        updated = shelter_service.get_shelter_by_id(shelter_id)
+
+    assert (updated["total_beds"], updated["available_beds"]) == (20, 20)
+
+
+# ---------------------------------------------------
+# COALESCED BED UPDATES
+# ---------------------------------------------------
+def test_coalesced_updates_ack_every_caller_with_final_value(app, shelter_id):
+    shelter_service.configure_bed_updates("wait", window_ms=50)
+    coalescer = shelter_service.bed_update_coalescer
+    results = []
+
+    def writer(count):
+        with app.app_context():
+            results.append(shelter_service.update_available_beds(shelter_id, count))
+
+    try:
+        threads = [threading.Thread(target=writer, args=(count % 100,)) for count in range(WRITERS)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        final = shelter_service.get_shelter_by_id(shelter_id)
+        stats = coalescer.stats()
+    finally:
+        shelter_service.configure_bed_updates("off")
+
+    assert stats["requests"] == WRITERS
+    assert stats["writes"] < WRITERS
+    assert stats["collapsed"] == WRITERS - stats["writes"]
+    assert final["version"] == stats["writes"]
+
+    # Callers merged into the same write all see that write's result
+    by_version = {}
+
+    for result in results:
+        by_version.setdefault(result["version"], set()).add(result["available_beds"])
+
+    assert all(len(counts) == 1 for counts in by_version.values())
+    assert by_version[final["version"]] == {final["available_beds"]}
+
+
+def test_write_behind_flushes_on_stop_and_skips_values_over_total(app, shelter_id):
+    coalescer = shelter_service.BedUpdateCoalescer(window=60, wait=False)
+
+    assert coalescer.submit(shelter_id, 7)["queued"]
+    coalescer.submit(shelter_id, 151)
+
+    coalescer.stop()
+
+    assert shelter_service.get_shelter_by_id(shelter_id)["available_beds"] == 7
+    assert coalescer.stats() == {"requests": 2, "writes": 1, "collapsed": 1, "failed": 0, "pending": 0}
+
+
+# ---------------------------------------------------
+# BULK BED UPDATES
+# ---------------------------------------------------
+def test_bulk_update_beds_reports_per_item(app, client, auth_headers, ngo_id, shelter_id):
+    with app.app_context():
+        other_ngo = ngo_service.create_ngo({"ngo_name": "Other", "email": "o@example.org", "phone": "1111111111"})
+        foreign_id = shelter_service.create_shelter(other_ngo, {"name": "Foreign", "total_beds": 10, "available_beds": 1})
+
+    response = client.post("/shelters/bulk-update-beds", headers=auth_headers, json={
+        "updates": [
+            {"shelter_id": shelter_id, "available_beds": 42},
+            {"shelter_id": foreign_id, "available_beds": 5},
+            {"shelter_id": "0" * 24, "available_beds": 5}
+        ]
+    })
+
+    assert response.status_code == 200
+    assert response.json["updated"] == 1
+    assert [result["status"] for result in response.json["results"]] == ["updated", "not_found", "not_found"]
+
+    with app.app_context():
+        assert shelter_service.get_shelter_by_id(shelter_id)["available_beds"] == 42
+        assert shelter_service.get_shelter_by_id(foreign_id)["available_beds"] == 1
+
+    rejected = client.post("/shelters/bulk-update-beds", headers=auth_headers, json={
+        "updates": [{"shelter_id": shelter_id, "available_beds": 500}]
+    })
+
+    assert rejected.json["results"][0]["status"] == "rejected"
+
+    invalid = client.post("/shelters/bulk-update-beds", headers=auth_headers, json={
+        "updates": [{"shelter_id": shelter_id, "available_beds": -1}]
+    })
+
+    assert invalid.status_code == 400
+
+
+# ---------------------------------------------------
+# PAGINATED LISTING
+# ---------------------------------------------------
+def test_my_shelters_pages_with_keyset_cursor(app, client, auth_headers, ngo_id):
+    with app.app_context():
+        created = [
+            shelter_service.create_shelter(ngo_id, {"name": f"Shelter {i}", "total_beds": 5, "available_beds": 5})
+            for i in range(5)
+        ]
+
+    seen = []
+    cursor = None
+
+    while True:
+        params = {"limit": 2}
+
+        if cursor:
+            params["cursor"] = cursor
+
+        response = client.get("/shelters/my-shelters", headers=auth_headers, query_string=params)
+        page = response.json
+
+        assert len(page["shelters"]) <= 2
+        assert "created_at" not in page["shelters"][0]
+
+        seen.extend(shelter["_id"] for shelter in page["shelters"])
+        cursor = page["next_cursor"]
+
+        if not cursor:
+            break
+
+    assert seen == created
+
+    detail = client.get("/shelters/my-shelters", headers=auth_headers, query_string={"view": "detail"})
+
+    assert "created_at" in detail.json["shelters"][0]
+
+
+# ---------------------------------------------------
+# JSON ENCODING OF RAW DOCUMENTS
+# ---------------------------------------------------
+def test_responses_encode_mongo_types(app, client, auth_headers, shelter_id):
+    with app.app_context():
+        shelter = shelter_service.get_shelter_by_id(shelter_id)
+
+        body = json.loads(app.json.response({
+            "shelter": shelter,
+            "price": Decimal128("12.50")
+        }).get_data())
+
+    assert body["shelter"]["_id"] == shelter_id
+    assert body["shelter"]["created_at"] == shelter["created_at"].isoformat()
+    assert body["price"] == "12.50"
+
+    assert client.get(f"/shelters/{shelter_id}", headers=auth_headers).json["_id"] == shelter_id
+
+
+# ---------------------------------------------------
+# STREAMING EXPORT
+# ---------------------------------------------------
+def test_export_streams_ndjson_and_filters_by_updated_since(app, client, auth_headers, shelter_id, ngo_id):
+    response = client.get("/shelters/export", headers=auth_headers)
+    lines = response.get_data(as_text=True).splitlines()
+
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line)["_id"] for line in lines] == [shelter_id]
+
+    since = response.headers["X-Export-Started-At"]
+
+    with app.app_context():
+        changed_id = shelter_service.create_shelter(ngo_id, {"name": "Later", "total_beds": 1, "available_beds": 1})
+
+    incremental = client.get(
+        "/shelters/export",
+        query_string={"updated_since": since, "format": "json"},
+        headers=auth_headers
+    )
+
+    exported = [shelter["_id"] for shelter in incremental.json]
+
+    # A shelter written in the same millisecond as the watermark may repeat
+    assert exported[-1] == changed_id
+    assert set(exported) <= {shelter_id, changed_id}
+
+
+def test_export_requires_auth_and_is_rate_limited(app, client, auth_headers, shelter_id):
+    app.config["EXPORT_RATE_LIMIT"] = 2
+
+    assert client.get("/shelters/export").status_code == 401
+    assert client.get("/public/shelters/export", headers=auth_headers).status_code == 404
+
+    statuses = [client.get("/shelters/export", headers=auth_headers).status_code for _ in range(3)]
+    limited = client.get("/shelters/export", headers=auth_headers)
+
+    assert statuses == [200, 200, 429]
+    assert 0 < int(limited.headers["Retry-After"]) <= 3600
+
+
+# ---------------------------------------------------
+# PUBLIC READ CACHE
+# ---------------------------------------------------
+def _redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+
+    return RedisCacheBackend(client=fakeredis.FakeRedis(), ttl=60)
+
+
+@pytest.fixture(params=["local", "redis"])
+def cache_backend(request, app):
+    if request.param == "redis":
+        backend = _redis_backend()
+    else:
+        backend = LocalCacheBackend(ttl=60)
+
+    cache_service.set_backend(backend)
+
+    return backend
+
+
+def test_public_reads_are_cached_and_invalidated_on_write(client, auth_headers, shelter_id, cache_backend):
+    nearby = {"lat": 40.7128, "lng": -74.006, "available_only": "true"}
+
+    assert client.get(f"/public/shelters/{shelter_id}").json["available_beds"] == 100
+    assert client.get("/public/shelters/nearby", query_string=nearby).json["shelters"][0]["available_beds"] == 100
+
+    client.get(f"/public/shelters/{shelter_id}")
+    client.get("/public/shelters/nearby", query_string=nearby)
+
+    assert cache_backend.stats()["hits"] == 2
+
+    client.patch(f"/shelters/update-beds/{shelter_id}", json={"available_beds": 0}, headers=auth_headers)
+
+    assert client.get(f"/public/shelters/{shelter_id}").json["available_beds"] == 0
+    assert client.get("/public/shelters/nearby", query_string=nearby).json["shelters"] == []
+
+
+def test_tiled_search_revalidates_without_mongo(client, auth_headers, shelter_id, monkeypatch):
+    redirect = client.get("/public/shelters/search", query_string={"lat": 40.7128, "lng": -74.006, "pet_friendly": "no", "available_only": "true"})
+    tile = geohash_encode(40.7128, -74.006, 5)
+
+    assert redirect.status_code == 302
+    assert redirect.headers["Location"].endswith(f"/public/shelters/tiles/{tile}?available_only=1")
+
+    url = f"/public/shelters/tiles/{tile}?available_only=1"
+
+    # Last-Modified is only sent once the shelter's second has ended
+    monkeypatch.setattr(public_routes, "now_ms", lambda: datetime.utcnow() + timedelta(seconds=2))
+
+    first = client.get(url)
+    etag = first.headers["ETag"]
+
+    assert [shelter["_id"] for shelter in first.json["shelters"]] == [shelter_id]
+    assert "public" in first.headers["Cache-Control"]
+    assert first.headers["Last-Modified"]
+
+    def no_mongo():
+        raise AssertionError("revalidation must not read MongoDB")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(mongo, "shelters", no_mongo)
+        patched.setattr(mongo, "shelters_for_search", no_mongo)
+
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+        assert client.get(url, headers={"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+
+    client.patch(f"/shelters/update-beds/{shelter_id}", json={"available_beds": 0}, headers=auth_headers)
+
+    # a stale ETag is not rescued by a still-matching If-Modified-Since
+    stale = client.get(url, headers={"If-None-Match": etag, "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+
+    assert stale.status_code == 200
+
+    changed = client.get(url, headers={"If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json["shelters"] == []
+    assert client.get("/public/shelters/tiles/zzz").status_code == 400
+
+
+def test_last_modified_rounds_up_and_waits_for_the_second_to_end():
+    changed = datetime(2026, 1, 1, 12, 0, 0, 250000)
+
+    assert public_routes.http_last_modified(changed, datetime(2026, 1, 1, 12, 0, 0, 900000)) is None
+    assert public_routes.http_last_modified(changed, datetime(2026, 1, 1, 12, 0, 1)) == datetime(2026, 1, 1, 12, 0, 1, tzinfo=timezone.utc)
+    assert public_routes.http_last_modified(changed.replace(microsecond=0), changed) == datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert public_routes.http_last_modified(None, changed) is None
+
+
+def test_offline_snapshot_and_delta(app, client, auth_headers, ngo_id, shelter_id, tmp_path, monkeypatch):
+    monkeypatch.setitem(snapshot_service._settings, "dir", str(tmp_path))
+
+    assert client.get("/public/shelters/snapshot").status_code == 404
+
+    with app.app_context():
+        doomed_id = shelter_service.create_shelter(ngo_id, {"name": "Pier 9", "total_beds": 10, "available_beds": 10})
+        built = snapshot_service.build_snapshot()
+
+    response = client.get("/public/shelters/snapshot")
+    snapshot = snapshot_service.decode_shelters(response.data)
+    shelters = {shelter["_id"]: shelter for shelter in snapshot["shelters"]}
+
+    assert response.headers["X-Snapshot-Version"] == str(built["version"])
+    assert client.get("/public/shelters/snapshot", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+    assert shelters[shelter_id]["available_beds"] == 100
+    assert shelters[shelter_id]["latitude"] == pytest.approx(40.7128, abs=1e-5)
+    assert shelters[shelter_id]["longitude"] == pytest.approx(-74.006, abs=1e-5)
+    assert "latitude" not in shelters[doomed_id]
+
+    time.sleep(0.002)
+    client.patch(f"/shelters/update-beds/{shelter_id}", json={"available_beds": 3}, headers=auth_headers)
+
+    with app.app_context():
+        shelter_service.delete_shelter(doomed_id)
+
+    delta = snapshot_service.decode_shelters(
+        client.get("/public/shelters/snapshot/delta", query_string={"since": built["version"]}).data
+    )
+
+    assert delta["base"] == built["version"]
+    assert delta["version"] > built["version"]
+    assert [(shelter["_id"], shelter["available_beds"]) for shelter in delta["shelters"]] == [(shelter_id, 3)]
+    assert delta["removed"] == [doomed_id]
+    assert client.get("/public/shelters/snapshot/delta", query_string={"since": 1}).status_code == 410
+
+
+def test_snapshot_delta_returns_writes_that_committed_out_of_order(app, client, shelter_id, tmp_path, monkeypatch):
+    monkeypatch.setitem(snapshot_service._settings, "dir", str(tmp_path))
+
+    with app.app_context():
+        newest = mongo.shelters().find_one({"_id": ObjectId(shelter_id)})["updated_at"]
+        built = snapshot_service.build_snapshot()
+
+        # Stamped before the newest write, committed after the build read
+        late_id = mongo.shelters().insert_one({
+            "name": "Late",
+            "location": {"type": "Point", "coordinates": [-74.0, 40.71]},
+            "available_beds": 7,
+            "updated_at": newest - timedelta(seconds=2)
+        }).inserted_id
+
+    snapshot = snapshot_service.decode_shelters(client.get("/public/shelters/snapshot").data)
+    delta = snapshot_service.decode_shelters(
+        client.get("/public/shelters/snapshot/delta", query_string={"since": built["version"]}).data
+    )
+
+    assert built["version"] == snapshot_service.to_version(newest) - 5000
+    assert abs(snapshot["shelters"][0]["updated_at"] - newest) < timedelta(seconds=1)
+    assert str(late_id) in {shelter["_id"] for shelter in delta["shelters"]}
+
+
+# ---------------------------------------------------
+# LIVE BED UPDATES
+# ---------------------------------------------------
+def test_polling_feed_pushes_bed_deltas_to_tile_subscribers(app, shelter_id):
+    broker = realtime_service.BedUpdateBroker(
+        feed_factory=lambda publish: realtime_service.ChangeFeed(publish, poll_interval=0.02)
+    )
+
+    here = broker.subscribe(geohash_neighbors(geohash_encode(40.7128, -74.006, realtime_service.TILE_PRECISION)))
+    elsewhere = broker.subscribe([geohash_encode(19.07, 72.87, realtime_service.TILE_PRECISION)])
+
+    try:
+        time.sleep(0.05)
+
+        with app.app_context():
+            shelter_service.update_available_beds(shelter_id, 7)
+            shelter_service.update_shelter(shelter_id, {"name": "Renamed"})
+
+        deltas = []
+        deadline = time.monotonic() + 2
+
+        # mongomock writes are not atomic, so a poll may catch a half-applied update first
+        while time.monotonic() < deadline and not any(delta["available_beds"] == 7 for delta in deltas):
+            deltas.extend(here.drain(timeout=0.1)[0])
+
+        assert broker._feed.mode == "polling"
+        assert deltas[-1]["id"] == shelter_id
+        assert deltas[-1]["available_beds"] == 7
+        assert elsewhere.drain(timeout=0.1) == ([], False)
+    finally:
+        broker.stop()
+
+
+def test_index_follows_writes_made_by_other_workers(app, shelter_id, monkeypatch):
+    monkeypatch.setitem(search_service._settings, "live_updates", True)
+    monkeypatch.setitem(search_service._settings, "refresh_seconds", 0.05)
+
+    tile = geohash_encode(40.7128, -74.006, search_service.SEARCH_TILE_PRECISION)
+
+    try:
+        with app.app_context():
+            assert len(search_service.find_shelters_in_tile(tile)) == 1
+
+            # Written by "another worker": straight to Mongo, not through this index
+            mongo.shelters().update_one({"_id": ObjectId(shelter_id)}, {"$set": {"available_beds": 3}})
+            other_id = mongo.shelters().insert_one({
+                "name": "Pier House",
+                "location": {"type": "Point", "coordinates": [-74.0061, 40.7129]},
+                "available_beds": 9
+            }).inserted_id
+
+            # A removal stamp left from before the reload
+            search_service.shelter_index.remove(shelter_id)
+
+            deadline = time.monotonic() + 2
+
+            while time.monotonic() < deadline and len(search_service.find_shelters_in_tile(tile)) < 2:
+                time.sleep(0.02)
+
+            shelters = {shelter["_id"]: shelter for shelter in search_service.find_shelters_in_tile(tile)}
+
+        assert shelters[shelter_id]["available_beds"] == 3
+        assert shelters[str(other_id)]["available_beds"] == 9
+        assert search_service.shelter_index._tile_removed == {}
+    finally:
+        search_service.stop_live_updates()
+
+
+def test_index_feed_applies_full_documents_and_deletions(app, ngo_id, shelter_id):
+    tile = geohash_encode(40.7128, -74.006, search_service.SEARCH_TILE_PRECISION)
+    feed = search_service.IndexFeed(poll_interval=0.02)
+
+    def wait_for(condition):
+        deadline = time.monotonic() + 2
+
+        while time.monotonic() < deadline and not condition():
+            time.sleep(0.02)
+
+        return condition()
+
+    with app.app_context():
+        doomed_id = shelter_service.create_shelter(ngo_id, {
+            "name": "Doomed", "total_beds": 5, "available_beds": 5, "latitude": 40.7129, "longitude": -74.0061
+        })
+        digest, _ = search_service.tile_version(tile)
+        feed.start()
+
+        try:
+            # Written by "another worker": straight to Mongo, not through this index
+            mongo.shelters().update_one(
+                {"_id": ObjectId(shelter_id)},
+                {"$set": {"name": "Renamed", "pet_friendly": True, "updated_at": now_ms()}}
+            )
+            mongo.shelters().delete_one({"_id": ObjectId(doomed_id)})
+            snapshot_service.record_deletion(doomed_id)
+
+            assert wait_for(lambda: [shelter["name"] for shelter in search_service.find_shelters_in_tile(tile)] == ["Renamed"])
+            assert search_service.find_shelters_in_tile(tile, pet_friendly=True)
+            assert search_service.tile_version(tile)[0] != digest
+
+            # An older document never replaces a newer entry
+            stale = {**mongo.shelters().find_one({"_id": ObjectId(shelter_id)}), "name": "Old", "updated_at": datetime(2020, 1, 1)}
+
+            assert not search_service.apply_document(stale)
+        finally:
+            feed.stop()
+
+
+# ---------------------------------------------------
+# NGO DASHBOARD AGGREGATES
+# ---------------------------------------------------
+def test_dashboard_aggregates_track_shelter_writes(app, client, ngo_id, auth_headers, shelter_id):
+    with app.app_context():
+        second = shelter_service.create_shelter(ngo_id, {"name": "Second", "total_beds": 50, "available_beds": 50})
+
+        shelter_service.update_available_beds(shelter_id, 90)
+        shelter_service.reserve_beds(second, 5)
+        shelter_service.release_beds(second, 2)
+        shelter_service.toggle_emergency_mode(second, True)
+        shelter_service.toggle_emergency_mode(second, True)
+        shelter_service.update_shelter(shelter_id, {"total_beds": 160})
+        shelter_service.bulk_update_available_beds(ngo_id, [{"shelter_id": second, "available_beds": 40}])
+
+        third = shelter_service.create_shelter(ngo_id, {"name": "Third", "total_beds": 10, "available_beds": 4})
+        shelter_service.delete_shelter(third)
+
+    response = client.get("/ngo/dashboard", headers=auth_headers)
+    stats = response.get_json()["stats"]
+
+    assert response.status_code == 200
+    assert {key: stats[key] for key in dashboard_service.COUNTERS} == {
+        "shelters": 2,
+        "total_beds": 210,
+        "available_beds": 130,
+        "emergency_shelters": 1
+    }
+    assert stats["occupied_beds"] == 80
+    assert stats["occupancy_rate"] == round(80 / 210, 4)
+
+    with app.app_context():
+        mongo.ngo_stats().update_one({"_id": ngo_id}, {"$inc": {"available_beds": 999}})
+        dashboard_service.reconcile()
+
+        assert dashboard_service.get_dashboard_stats(ngo_id)["available_beds"] == 130
+
+        shelter_service.delete_shelter(shelter_id)
+        shelter_service.delete_shelter(second)
+        mongo.ngo_stats().update_one({"_id": ngo_id}, {"$set": {"updated_at": datetime(2000, 1, 1)}})
+        dashboard_service.reconcile(ngo_id)
+
+        assert mongo.ngo_stats().find_one({"_id": ngo_id}) is None
+
+
+def test_bulk_update_counts_beds_changed_concurrently(app, ngo_id, shelter_id, monkeypatch):
+    with app.app_context():
+        second = shelter_service.create_shelter(ngo_id, {"name": "Second", "total_beds": 50, "available_beds": 50})
+
+        now_ms = shelter_service.now_ms
+
+        def reserve_in_between():
+            # Another request takes beds after the bulk update read its pre-images
+            monkeypatch.setattr(shelter_service, "now_ms", now_ms)
+            shelter_service.reserve_beds(second, 10)
+            return now_ms()
+
+        monkeypatch.setattr(shelter_service, "now_ms", reserve_in_between)
+        monkeypatch.setattr(dashboard_service, "reconcile", None)
+
+        results = shelter_service.bulk_update_available_beds(ngo_id, [
+            {"shelter_id": shelter_id, "available_beds": 42},
+            {"shelter_id": second, "available_beds": 45}
+        ])
+
+        assert [result["status"] for result in results] == ["updated", "updated"]
+        assert results[1]["version"] == shelter_service.get_shelter_by_id(second)["version"]
+        assert dashboard_service.get_dashboard_stats(ngo_id)["available_beds"] == 42 + 45
@@ -0,0 +1,208 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+# ---------------------------------------------------
+# TTL + LRU CACHE
+# ---------------------------------------------------
+class TTLCache:
+    """
+    Thread-safe, size-bounded cache with per-entry expiry.
+
+    - Least recently used entries are evicted once max_size is reached
+    - Entries older than ttl seconds are treated as misses
+    - hits / misses counters for monitoring
+    """
+
+    def __init__(self, max_size=1024, ttl=30.0, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+
+            if item is not None:
+                value, expires_at = item
+
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                del self._data[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+
+# ---------------------------------------------------
+# RESPONSE CACHE BACKENDS
+# ---------------------------------------------------
+# Both backends expose the same interface:
+#   get / set(ttl) / delete / incr / get_counter / clear / stats
+# Counters never expire; they version groups of keys.
+
+class LocalCacheBackend:
+    """
+    In-process LRU backend. Invalidation only reaches this worker,
+    so other workers rely on the TTL.
+    """
+
+    def __init__(self, max_size=10000, ttl=5.0):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self._counters = {}
+
+        # Expiring counters (rate limit windows), kept apart from the hit stats
+        self._windows = TTLCache(max_size=max_size, ttl=ttl)
+        self._counter_lock = threading.Lock()
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._cache.set(key, value, ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._cache.invalidate(key)
+
+    def incr(self, key, ttl=None):
+        with self._counter_lock:
+            if ttl is not None:
+                count = (self._windows.get(key) or 0) + 1
+                self._windows.set(key, count, ttl)
+                return count
+
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key):
+        return self._counters.get(key, 0)
+
+    def clear(self):
+        self._cache.clear()
+        self._windows.clear()
+
+        with self._counter_lock:
+            self._counters.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class RedisCacheBackend:
+    """
+    Shared backend: one cache for every worker and host, so write
+    invalidation is global. Values are pickled.
+
+    Pass `client` to use an existing (or fake) Redis client.
+    """
+
+    def __init__(self, url=None, client=None, prefix="shelter-connect:", ttl=5.0):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+
+        self._client = client
+        self._prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        return self._prefix + key
+
+    def get(self, key):
+        raw = self._client.get(self._key(key))
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return pickle.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        ttl_ms = int((self.ttl if ttl is None else ttl) * 1000)
+
+        self._client.set(
+            self._key(key),
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            px=max(ttl_ms, 1)
+        )
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*(self._key(key) for key in keys))
+
+    def incr(self, key, ttl=None):
+        if ttl is None:
+            return int(self._client.incr(self._key(key)))
+
+        pipeline = self._client.pipeline()
+        pipeline.incr(self._key(key))
+        pipeline.expire(self._key(key), max(int(ttl), 1))
+
+        return int(pipeline.execute()[0])
+
+    def get_counter(self, key):
+        raw = self._client.get(self._key(key))
+
+        return int(raw) if raw is not None else 0
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self._prefix + "*"))
+
+        if keys:
+            self._client.delete(*keys)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,325 @@
+import math
+
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+
+# Length of one degree of latitude in km
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+# ---------------------------------------------------
+# HAVERSINE DISTANCE
+# ---------------------------------------------------
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between two points in kilometers
+    (same formula as calculateDistance on the frontend)
+    """
+
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+
+    a = (
+        math.sin(d_lat / 2) ** 2
+        + math.cos(math.radians(lat1))
+        * math.cos(math.radians(lat2))
+        * math.sin(d_lon / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# ---------------------------------------------------
+# GEOJSON HELPERS
+# ---------------------------------------------------
+def make_point(latitude, longitude):
+    """
+    Build a GeoJSON Point (Mongo stores [longitude, latitude])
+    """
+
+    return {
+        "type": "Point",
+        "coordinates": [float(longitude), float(latitude)]
+    }
+
+
+def point_lat_lon(location):
+    """
+    Extract (latitude, longitude) from a GeoJSON Point.
+    Returns None if the location is missing or malformed.
+    """
+
+    if not location:
+        return None
+
+    coordinates = location.get("coordinates")
+
+    if not coordinates or len(coordinates) != 2:
+        return None
+
+    longitude, latitude = coordinates
+
+    return float(latitude), float(longitude)
+
+
+# ---------------------------------------------------
+# COLUMN-ORIENTED SHELTER COORDINATES
+# ---------------------------------------------------
+def shelter_columns(shelters):
+    """
+    Convert shelter documents into parallel arrays
+    (ids, latitudes, longitudes) for the batch kernels.
+    Shelters without a location are skipped.
+    """
+
+    ids = []
+    lats = []
+    lons = []
+
+    for shelter in shelters:
+        coordinates = point_lat_lon(shelter.get("location"))
+
+        if coordinates is None:
+            continue
+
+        ids.append(str(shelter["_id"]))
+        lats.append(coordinates[0])
+        lons.append(coordinates[1])
+
+    return ids, np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64)
+
+
+# ---------------------------------------------------
+# BATCH DISTANCE KERNELS
+# ---------------------------------------------------
+def haversine_matrix(origin_lats, origin_lons, lats, lons):
+    """
+    Haversine distance (km) from every origin to every shelter.
+    Returns an array of shape (n_origins, n_shelters).
+    """
+
+    o_lat = np.radians(np.atleast_1d(np.asarray(origin_lats, dtype=np.float64)))[:, None]
+    o_lon = np.radians(np.atleast_1d(np.asarray(origin_lons, dtype=np.float64)))[:, None]
+    s_lat = np.radians(np.asarray(lats, dtype=np.float64))[None, :]
+    s_lon = np.radians(np.asarray(lons, dtype=np.float64))[None, :]
+
+    a = (
+        np.sin((s_lat - o_lat) * 0.5) ** 2
+        + np.cos(o_lat) * np.cos(s_lat) * np.sin((s_lon - o_lon) * 0.5) ** 2
+    )
+
+    np.clip(a, 0.0, 1.0, out=a)
+
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a, out=a), out=a)
+
+
+def equirectangular_matrix(origin_lats, origin_lons, lats, lons):
+    """
+    Equirectangular approximation of the distance matrix (km).
+    Cheaper than haversine and accurate to well under 1% at city scale.
+    """
+
+    o_lat = np.radians(np.atleast_1d(np.asarray(origin_lats, dtype=np.float64)))[:, None]
+    o_lon = np.radians(np.atleast_1d(np.asarray(origin_lons, dtype=np.float64)))[:, None]
+    s_lat = np.radians(np.asarray(lats, dtype=np.float64))[None, :]
+    s_lon = np.radians(np.asarray(lons, dtype=np.float64))[None, :]
+
+    d_lon = s_lon - o_lon
+
+    # Wrap longitude differences across the antimeridian
+    d_lon = (d_lon + np.pi) % (2.0 * np.pi) - np.pi
+
+    x = d_lon * np.cos((s_lat + o_lat) * 0.5)
+    y = s_lat - o_lat
+
+    return EARTH_RADIUS_KM * np.hypot(x, y)
+
+
+DISTANCE_KERNELS = {
+    "haversine": haversine_matrix,
+    "equirectangular": equirectangular_matrix
+}
+
+# Upper bound on distance-matrix cells computed at once (~32 MB of float64)
+MAX_BATCH_CELLS = 4_000_000
+
+
+# ---------------------------------------------------
+# RANK SHELTERS FOR MANY ORIGINS
+# ---------------------------------------------------
+def rank_nearest(origin_lats, origin_lons, lats, lons, k=10, mask=None, method="haversine"):
+    """
+    k nearest shelters for each origin.
+
+    mask is an optional boolean array over shelters (e.g. open shelters
+    with free beds); masked-out shelters are never returned.
+
+    Returns (indices, distances), each of shape (n_origins, k), sorted
+    nearest first. Slots beyond the number of eligible shelters hold
+    index -1 and distance inf.
+    """
+
+    kernel = DISTANCE_KERNELS[method]
+
+    origin_lats = np.atleast_1d(np.asarray(origin_lats, dtype=np.float64))
+    origin_lons = np.atleast_1d(np.asarray(origin_lons, dtype=np.float64))
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+
+    n_origins = origin_lats.shape[0]
+    n_shelters = lats.shape[0]
+
+    indices = np.full((n_origins, k), -1, dtype=np.int64)
+    distances = np.full((n_origins, k), np.inf, dtype=np.float64)
+
+    if n_origins == 0 or n_shelters == 0 or k <= 0:
+        return indices, distances
+
+    if mask is not None:
+        mask = np.asarray(mask, dtype=bool)
+
+    take = min(k, n_shelters)
+    chunk = max(1, MAX_BATCH_CELLS // n_shelters)
+
+    for start in range(0, n_origins, chunk):
+        stop = min(start + chunk, n_origins)
+
+        matrix = kernel(origin_lats[start:stop], origin_lons[start:stop], lats, lons)
+
+        if mask is not None:
+            matrix[:, ~mask] = np.inf
+
+        if take < n_shelters:
+            part = np.argpartition(matrix, take - 1, axis=1)[:, :take]
+        else:
+            part = np.broadcast_to(np.arange(n_shelters), (stop - start, n_shelters))
+
+        part_dist = np.take_along_axis(matrix, part, axis=1)
+        order = np.argsort(part_dist, axis=1)
+
+        best = np.take_along_axis(part, order, axis=1)
+        best_dist = np.take_along_axis(part_dist, order, axis=1)
+
+        best[np.isinf(best_dist)] = -1
+
+        indices[start:stop, :take] = best
+        distances[start:stop, :take] = best_dist
+
+    return indices, distances
+
+
+# ---------------------------------------------------
+# GEOHASH TILES
+# ---------------------------------------------------
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude, longitude, precision=5):
+    """
+    Geohash of a point (precision 5 is a ~4.9 x 4.9 km tile)
+    """
+
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_lo = mid
+            else:
+                bits <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+
+        even = not even
+        bit_count += 1
+
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_bounds(geohash):
+    """
+    (lat_lo, lat_hi, lon_lo, lon_hi) of a geohash tile
+    """
+
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+
+    for char in geohash:
+        value = GEOHASH_ALPHABET.index(char)
+
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+
+                if bit:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+
+            even = not even
+
+    return lat_lo, lat_hi, lon_lo, lon_hi
+
+
+def geohash_neighbors(geohash):
+    """
+    The tile itself plus its (up to) 8 surrounding tiles
+    """
+
+    lat_lo, lat_hi, lon_lo, lon_hi = geohash_bounds(geohash)
+
+    lat_step = lat_hi - lat_lo
+    lon_step = lon_hi - lon_lo
+    center_lat = (lat_lo + lat_hi) / 2
+    center_lon = (lon_lo + lon_hi) / 2
+
+    tiles = []
+
+    for d_lat in (-1, 0, 1):
+        lat = center_lat + d_lat * lat_step
+
+        if lat < -90 or lat > 90:
+            continue
+
+        for d_lon in (-1, 0, 1):
+            lon = (center_lon + d_lon * lon_step + 180.0) % 360.0 - 180.0
+            tile = geohash_encode(lat, lon, len(geohash))
+
+            if tile not in tiles:
+                tiles.append(tile)
+
+    return tiles
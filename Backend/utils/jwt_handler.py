@@ -0,0 +1,33 @@
+from flask_jwt_extended import create_access_token
+
+from constants.roles import NGO
+
+
+# ---------------------------------------------------
+# TOKEN ISSUING
+# ---------------------------------------------------
+def create_ngo_token(ngo_id, ngo_name):
+    """
+    Access token for an authenticated NGO (identity = NGO id).
+
+    Carries what protected routes need (name, role), so verifying it
+    needs no database read. Lifetime comes from JWT_ACCESS_TOKEN_EXPIRES;
+    revocation is checked by services/revocation_service.
+    """
+
+    return create_access_token(
+        identity=str(ngo_id),
+        additional_claims={"name": ngo_name, "role": NGO}
+    )
+
+
+def principal_from_claims(claims):
+    """
+    g.ngo for a verified token, or None for tokens issued without
+    the NGO claims (those fall back to a principal lookup)
+    """
+
+    if "name" not in claims or "role" not in claims:
+        return None
+
+    return {"id": claims["sub"], "ngo_name": claims["name"], "role": claims["role"]}
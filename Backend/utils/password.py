@@ -0,0 +1,243 @@
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
+
+
+# OWASP minimum for argon2id: 19 MiB, 2 passes, 1 lane (~20-30 ms per
+# verify on one core). Raise the costs as hardware allows; existing
+# hashes are upgraded on the next successful login.
+DEFAULT_TIME_COST = 2
+DEFAULT_MEMORY_COST_KIB = 19456
+DEFAULT_PARALLELISM = 1
+
+DEFAULT_MAX_PENDING = 64
+DEFAULT_TIMEOUT_SECONDS = 10
+
+
+class PasswordPoolBusy(Exception):
+    """
+    Too many hashes queued; retry after `retry_after` seconds
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"password pool busy, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+# ---------------------------------------------------
+# BOUNDED HASHING POOL
+# ---------------------------------------------------
+class PasswordPool:
+    """
+    Runs argon2 hashing / verification on a fixed set of threads.
+
+    argon2-cffi releases the GIL inside the C hash, so `workers` threads
+    use that many cores while the request thread only waits. At most
+    `max_pending` jobs may be queued or running; past that, submit()
+    raises PasswordPoolBusy with a Retry-After estimated from the queue
+    depth and the recent average job time, instead of queueing logins
+    that would time out anyway.
+
+    A job counts until it finishes, not until its caller stops waiting:
+    a hash already running when the caller times out cannot be
+    cancelled and still occupies a core.
+    """
+
+    def __init__(self, hasher, workers=None, max_pending=DEFAULT_MAX_PENDING, timeout=DEFAULT_TIMEOUT_SECONDS):
+        self.hasher = hasher
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self.pending = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.average_seconds = None
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def _get_executor(self):
+        # A pool inherited across fork has no threads in the child
+        pid = os.getpid()
+
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password")
+                    self._executor_pid = pid
+
+        return self._executor
+
+    def retry_after(self):
+        average = self.average_seconds or 0.05
+        return max(1, math.ceil(self.pending * average / self.workers))
+
+    def submit(self, fn, *args):
+        """
+        Run fn(*args) on the pool and wait for its result
+        """
+
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy(self.retry_after())
+
+            self.pending += 1
+
+        try:
+            future = self._get_executor().submit(self._timed, fn, *args)
+        except BaseException:
+            self._finished()
+            raise
+
+        # Released when the job is done (or cancelled before it started)
+        future.add_done_callback(self._finished)
+
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            # Only drops the job if it has not started; a running hash
+            # keeps its slot until it completes
+            future.cancel()
+
+            with self._lock:
+                self.timed_out += 1
+
+            raise PasswordPoolBusy(self.retry_after())
+
+    def _finished(self, future=None):
+        with self._lock:
+            self.pending -= 1
+
+    def _timed(self, fn, *args):
+        started = time.perf_counter()
+
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+
+            # Exponentially weighted, so the estimate follows load changes
+            with self._lock:
+                previous = self.average_seconds
+                self.average_seconds = elapsed if previous is None else previous * 0.9 + elapsed * 0.1
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "average_ms": round(self.average_seconds * 1000, 2) if self.average_seconds else None
+        }
+
+    def shutdown(self):
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=True)
+
+        self._executor = None
+
+
+# ---------------------------------------------------
+# MODULE API
+# ---------------------------------------------------
+_hasher = PasswordHasher(
+    time_cost=DEFAULT_TIME_COST,
+    memory_cost=DEFAULT_MEMORY_COST_KIB,
+    parallelism=DEFAULT_PARALLELISM
+)
+_pool = PasswordPool(_hasher)
+
+
+def init_app(app):
+    configure(app.config)
+
+
+def configure(config):
+    """
+    Set argon2 costs and pool limits from a config mapping
+    (ARGON2_* and PASSWORD_POOL_* keys)
+    """
+
+    global _hasher, _pool
+
+    _hasher = PasswordHasher(
+        time_cost=config.get("ARGON2_TIME_COST", DEFAULT_TIME_COST),
+        memory_cost=config.get("ARGON2_MEMORY_COST_KIB", DEFAULT_MEMORY_COST_KIB),
+        parallelism=config.get("ARGON2_PARALLELISM", DEFAULT_PARALLELISM)
+    )
+
+    previous, _pool = _pool, PasswordPool(
+        _hasher,
+        workers=config.get("PASSWORD_POOL_WORKERS"),
+        max_pending=config.get("PASSWORD_POOL_MAX_PENDING", DEFAULT_MAX_PENDING),
+        timeout=config.get("PASSWORD_POOL_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS)
+    )
+
+    previous.shutdown()
+
+
+def get_pool():
+    return _pool
+
+
+def _verify(password_hash, password):
+    try:
+        return _hasher.verify(password_hash, password)
+    except (VerifyMismatchError, VerificationError, InvalidHashError):
+        return False
+
+
+def hash_password(password):
+    """
+    argon2id hash with the configured costs (runs on the pool)
+    """
+
+    return _pool.submit(_hasher.hash, password)
+
+
+def verify_password(password_hash, password):
+    """
+    True if password matches. Runs on the pool; raises
+    PasswordPoolBusy when the pool is saturated.
+    """
+
+    if not password_hash:
+        return False
+
+    return _pool.submit(_verify, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """
+    True when the hash was made with other costs than the current ones
+    """
+
+    return _hasher.check_needs_rehash(password_hash)
+
+
+# Verified against when the email is unknown, so a miss costs the same
+# as a wrong password and does not reveal which emails are registered
+_dummy_hash = None
+
+
+def dummy_hash():
+    """
+    Made on the pool like any other hash (raises PasswordPoolBusy when
+    it is saturated), once per process and cost change
+    """
+
+    global _dummy_hash
+
+    if _dummy_hash is None or needs_rehash(_dummy_hash):
+        _dummy_hash = _pool.submit(_hasher.hash, "not-a-real-password")
+
+    return _dummy_hash
@@ -0,0 +1,157 @@
+import os
+import sys
+import threading
+import time
+
+
+# ---------------------------------------------------
+# STACK SAMPLER
+# ---------------------------------------------------
+# Samples one thread's Python stack from a helper thread every
+# `interval` seconds, using sys._current_frames(). Nothing is hooked
+# into the sampled thread, so an idle sampler costs nothing.
+#
+# The sampler needs the GIL to take a sample: while the sampled thread
+# runs pure Python the effective rate is bounded by
+# sys.getswitchinterval() (5 ms by default); blocked in I/O (MongoDB),
+# it is sampled at the full rate.
+
+def _frame_key(frame):
+    code = frame.f_code
+    return (code.co_name, code.co_filename, code.co_firstlineno)
+
+
+class StackSampler:
+    """
+    Collects (stack, weight) samples for one thread between start()
+    and stop(). A stack is a tuple of frame keys, root first.
+
+    `marker()` may return an extra leaf frame to append to each sample
+    (e.g. the MongoDB command in flight), or None.
+    """
+
+    def __init__(self, thread_id, interval=0.002, marker=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.marker = marker
+
+        self.samples = []
+        self.started = None
+        self.elapsed = None
+
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self.elapsed = time.perf_counter() - self.started
+
+        return self.samples
+
+    def _run(self):
+        last = self.started
+
+        while not self._stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+
+            if frame is None:
+                return
+
+            stack = []
+
+            while frame is not None:
+                stack.append(_frame_key(frame))
+                frame = frame.f_back
+
+            stack.reverse()
+
+            if self.marker is not None:
+                leaf = self.marker()
+
+                if leaf is not None:
+                    stack.append(leaf)
+
+            now = time.perf_counter()
+            self.samples.append((tuple(stack), now - last))
+            last = now
+
+
+# ---------------------------------------------------
+# OUTPUT FORMATS
+# ---------------------------------------------------
+def _frame_name(key):
+    name, filename, line = key
+
+    if not filename:
+        return name
+
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def to_collapsed(samples):
+    """
+    Brendan Gregg's collapsed-stack format, one "a;b;c count" line per
+    distinct stack (input for flamegraph.pl, speedscope, inferno).
+    Counts are sample counts.
+    """
+
+    counts = {}
+
+    for stack, _ in samples:
+        counts[stack] = counts.get(stack, 0) + 1
+
+    return "".join(
+        ";".join(_frame_name(key) for key in stack) + f" {count}\n"
+        for stack, count in counts.items()
+    )
+
+
+def to_speedscope(samples, name, elapsed):
+    """
+    speedscope "sampled" profile, weighted by the time between samples
+    """
+
+    frames = []
+    index = {}
+    stacks = []
+
+    for stack, _ in samples:
+        encoded = []
+
+        for key in stack:
+            position = index.get(key)
+
+            if position is None:
+                position = index[key] = len(frames)
+                frame_name, filename, line = key
+                frames.append({"name": frame_name, "file": filename, "line": line} if filename else {"name": frame_name})
+
+            encoded.append(position)
+
+        stacks.append(encoded)
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "shelter-connect",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": elapsed,
+            "samples": stacks,
+            "weights": [weight for _, weight in samples]
+        }]
+    }
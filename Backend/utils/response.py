@@ -0,0 +1,80 @@
+import json
+from datetime import date, datetime
+
+from bson import Decimal128, ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+
+# ---------------------------------------------------
+# JSON SERIALIZATION HELPERS
+# ---------------------------------------------------
+def json_default(value):
+    """
+    json.dumps `default=` hook for Mongo documents
+    """
+
+    if isinstance(value, ObjectId):
+        return str(value)
+
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+
+    if isinstance(value, Decimal128):
+        # String keeps the exact decimal value
+        return str(value.to_decimal())
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_bytes(value):
+    """
+    Compact UTF-8 JSON for Mongo documents.
+
+    Uses orjson when installed: datetimes are encoded natively (same
+    ISO-8601 text as json_default) and only ObjectId / Decimal128 go
+    through the Python hook. Values orjson rejects (non-str dict keys,
+    such as marshmallow's per-item errors) fall back to json.dumps.
+    """
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=json_default)
+        except TypeError:
+            pass
+
+    return json.dumps(value, default=json_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+# ---------------------------------------------------
+# FLASK JSON PROVIDER
+# ---------------------------------------------------
+class MongoJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes Mongo documents as they come out of
+    the driver, so services return documents without patching _id.
+
+    jsonify() / returned dicts go through dumps_bytes; keys keep
+    their insertion order.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault("default", json_default)
+            return json.dumps(obj, **kwargs)
+
+        return dumps_bytes(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            body = json.dumps(obj, default=json_default, indent=2).encode()
+        else:
+            body = dumps_bytes(obj)
+
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
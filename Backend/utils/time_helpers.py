@@ -0,0 +1,15 @@
+from datetime import datetime
+
+
+# ---------------------------------------------------
+# TIMESTAMPS
+# ---------------------------------------------------
+def now_ms():
+    """
+    utcnow truncated to the millisecond precision Mongo stores, so
+    in-memory copies (search index, watermarks) and the database agree
+    """
+
+    now = datetime.utcnow()
+
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
@@ -0,0 +1,288 @@
+import math
+from functools import wraps
+
+from flask import g, jsonify, request
+from marshmallow import RAISE, ValidationError, fields, missing, validate
+
+
+# Marker for a value the fast path cannot accept as-is
+_REJECT = object()
+
+# Schema instances shared by every route, keyed by (class, options)
+_schemas = {}
+
+
+# ---------------------------------------------------
+# PRECOMPILED FAST PATH
+# ---------------------------------------------------
+# A schema made only of plain fields (Int, Float, Boolean, Str, Nested,
+# List) with Range / Length / Regexp / OneOf validators is compiled into
+# a small checker function once, at import.
+#
+# The checker only accepts payloads that are unambiguously valid (exact
+# JSON types, no coercion) and returns exactly what schema.load would.
+# Anything else returns None and goes through marshmallow, which also
+# produces the error messages. Per-item @validates_schema hooks run on
+# the checked result; one that raises sends the payload to marshmallow.
+
+def _range_check(validator):
+    low, high = validator.min, validator.max
+    low_inclusive, high_inclusive = validator.min_inclusive, validator.max_inclusive
+
+    def check(value):
+        if low is not None and (value < low if low_inclusive else value <= low):
+            return False
+
+        if high is not None and (value > high if high_inclusive else value >= high):
+            return False
+
+        return True
+
+    return check
+
+
+def _length_check(validator):
+    low, high, equal = validator.min, validator.max, validator.equal
+
+    def check(value):
+        size = len(value)
+
+        if equal is not None:
+            return size == equal
+
+        return (low is None or size >= low) and (high is None or size <= high)
+
+    return check
+
+
+def _compile_validators(field):
+    checks = []
+
+    for validator in field.validators:
+        kind = type(validator)
+
+        if kind is validate.Range:
+            checks.append(_range_check(validator))
+        elif kind is validate.Length:
+            checks.append(_length_check(validator))
+        elif kind is validate.Regexp:
+            match = validator.regex.match
+            checks.append(lambda value, match=match: match(value) is not None)
+        elif kind is validate.OneOf:
+            choices = tuple(validator.choices)
+            checks.append(lambda value, choices=choices: value in choices)
+        else:
+            return None
+
+    return checks
+
+
+def _int(value):
+    return value if type(value) is int else _REJECT
+
+
+def _float(value):
+    if type(value) in (int, float) and math.isfinite(value):
+        return float(value)
+
+    return _REJECT
+
+
+def _bool(value):
+    return value if type(value) is bool else _REJECT
+
+
+def _str(value):
+    return value if type(value) is str else _REJECT
+
+
+SCALAR_CONVERTERS = {
+    fields.Integer: _int,
+    fields.Float: _float,
+    fields.Boolean: _bool,
+    fields.String: _str
+}
+
+
+def _compile_field(field):
+    checks = _compile_validators(field)
+
+    if checks is None:
+        return None
+
+    kind = type(field)
+
+    if kind in SCALAR_CONVERTERS:
+        convert = SCALAR_CONVERTERS[kind]
+
+    elif kind is fields.Nested:
+        load = compile_fast_path(field.schema)
+
+        if load is None:
+            return None
+
+        def convert(value):
+            loaded = load(value)
+            return _REJECT if loaded is None else loaded
+
+    elif kind is fields.List:
+        inner = _compile_field(field.inner)
+
+        if inner is None:
+            return None
+
+        def convert(value):
+            if type(value) is not list:
+                return _REJECT
+
+            loaded = [inner(item) for item in value]
+            return _REJECT if _REJECT in loaded else loaded
+
+    else:
+        return None
+
+    if not checks:
+        return convert
+
+    def check(value):
+        loaded = convert(value)
+
+        if loaded is _REJECT or not all(passes(loaded) for passes in checks):
+            return _REJECT
+
+        return loaded
+
+    return check
+
+
+def compile_fast_path(schema):
+    """
+    Compile a schema instance into load(data) -> dict | None.
+    Returns None when the schema uses anything the fast path does not
+    model (hooks other than per-item validates_schema, data_key, other
+    field types or validators).
+    """
+
+    if schema.unknown != RAISE or schema.partial:
+        return None
+
+    schema_validators = []
+
+    for tag, hooks in schema._hooks.items():
+        for attr_name, hook_many, hook_kwargs in hooks:
+            if tag != "validates_schema" or hook_many or hook_kwargs.get("pass_original"):
+                return None
+
+            schema_validators.append(getattr(schema, attr_name))
+
+    specs = []
+
+    for name, field in schema.load_fields.items():
+        if field.data_key is not None or field.attribute is not None:
+            return None
+
+        checker = _compile_field(field)
+
+        if checker is None:
+            return None
+
+        specs.append((name, checker, field.required, field.load_default))
+
+    known = frozenset(name for name, _, _, _ in specs)
+
+    def load_one(data):
+        if type(data) is not dict or not known.issuperset(data):
+            return None
+
+        result = {}
+
+        for name, checker, required, default in specs:
+            if name in data:
+                value = checker(data[name])
+
+                if value is _REJECT:
+                    return None
+
+                result[name] = value
+
+            elif required:
+                return None
+
+            elif default is not missing:
+                result[name] = default() if callable(default) else default
+
+        for validator in schema_validators:
+            try:
+                validator(result, partial=None, many=False, unknown=RAISE)
+            except ValidationError:
+                return None
+
+        return result
+
+    if not schema.many:
+        return load_one
+
+    def load_many(data):
+        if type(data) is not list:
+            return None
+
+        loaded = [load_one(item) for item in data]
+
+        return None if None in loaded else loaded
+
+    return load_many
+
+
+# ---------------------------------------------------
+# ROUTE DECORATOR
+# ---------------------------------------------------
+def get_schema(schema_class, **options):
+    """
+    Shared schema instance for a class and options (built once)
+    """
+
+    key = (schema_class, tuple(sorted(options.items())))
+    schema = _schemas.get(key)
+
+    if schema is None:
+        schema = _schemas[key] = schema_class(**options)
+
+    return schema
+
+
+def validate_body(schema_class, error="Invalid request body", fast=True, **options):
+    """
+    Validate the JSON body before the view runs and expose the loaded
+    data as g.data. Invalid bodies get a 400 with marshmallow's messages.
+
+    The schema instance and its fast-path checker are built when the
+    route module is imported, not per request. Pass fast=False to always
+    run the full marshmallow load.
+    """
+
+    schema = get_schema(schema_class, **options)
+    fast_load = compile_fast_path(schema) if fast else None
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            payload = request.get_json(silent=True)
+
+            if payload is None:
+                payload = {}
+
+            data = fast_load(payload) if fast_load is not None else None
+
+            if data is None:
+                try:
+                    data = schema.load(payload)
+                except ValidationError as e:
+                    return jsonify({"error": error, "details": e.messages}), 400
+
+            g.data = data
+
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,100 @@
+# Background job worker (index migrations, seeding, rollups, snapshots, exports)
+# python worker.py [--processes 4] [--types build_snapshot,export_shelters] [--metrics-port 9101]
+#
+# Jobs run in a process pool, never in the web workers; queue them with
+# job_service.enqueue or scripts/enqueue_job.py.
+import argparse
+import logging
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from app import create_app
+from config import Config
+from services.job_handlers import run_job
+from services.job_worker import JobWorker
+
+
+logger = logging.getLogger("worker")
+
+# The Flask app of a pool process (settings, app context for handlers)
+_pool_app = None
+
+
+def _init_pool_process(config_class):
+    global _pool_app
+
+    _pool_app = create_app(config_class)
+
+
+def run_in_app(job_type, payload):
+    with _pool_app.app_context():
+        return run_job(job_type, payload)
+
+
+def make_executor(app, processes):
+    """
+    (executor factory, job target). A process pool for real MongoDB;
+    mongomock lives in one process's memory, so offline it is a
+    thread pool instead.
+    """
+
+    if app.config["MONGO_URI"].startswith("mongomock://"):
+        logger.warning("mongomock: running jobs in threads, not processes")
+        return lambda: ThreadPoolExecutor(max_workers=processes, thread_name_prefix="job"), run_job
+
+    # spawn: the pool must not fork this process's heartbeat thread
+    context = multiprocessing.get_context("spawn")
+
+    def factory():
+        return ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_pool_process,
+            initargs=(Config,)
+        )
+
+    return factory, run_in_app
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, help="default: JOB_WORKER_PROCESSES")
+    parser.add_argument("--types", help="comma separated job types to run (default: all)")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    app = create_app()
+    processes = args.processes or app.config["JOB_WORKER_PROCESSES"]
+
+    if args.metrics_port:
+        from prometheus_client import start_http_server
+
+        start_http_server(args.metrics_port)
+
+    factory, target = make_executor(app, processes)
+
+    worker = JobWorker(
+        factory,
+        concurrency=processes,
+        job_types=args.types.split(",") if args.types else None,
+        target=target,
+        lease_seconds=app.config["JOB_LEASE_SECONDS"],
+        heartbeat_seconds=app.config["JOB_HEARTBEAT_SECONDS"],
+        poll_seconds=app.config["JOB_POLL_SECONDS"],
+        max_runtime=app.config["JOB_MAX_RUNTIME_BY_TYPE"],
+        default_max_runtime=app.config["JOB_MAX_RUNTIME_SECONDS"]
+    )
+
+    # Finish the jobs in flight, then exit
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+
+    with app.app_context():
+        worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,5 @@
 # Production entry
+# gunicorn wsgi:app
+from app import create_app
+
+app = create_app()